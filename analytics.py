@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Pick Analytics
+Pick popularity, consensus and head-to-head agreement per week
+
+Three summary tables are refreshed for the affected weeks in the same
+transaction as every pick write:
+
+    WeekTeamPickCount   users per (week, match, team)
+    WeekUserPick        the pick of each user in a week
+    WeekPickAgreement   one row per pair of users with a pick in a week
+
+so the analytics endpoints and the consensus of the pick matrix read
+counts, per-user picks and pairwise agreement instead of aggregating the
+pick table per request. Picks only become
+visible once their match has kicked off; until then they are reported as
+hidden counts. The tables can be rebuilt from the pick table with:
+
+    python analytics.py rebuild
+"""
+
+import sys
+from datetime import datetime
+from sqlalchemy import case, delete, func, insert
+from app import app, db, Match, Pick, WeekTeamPickCount, WeekUserPick, WeekPickAgreement
+from leaderboard import get_leaderboard_snapshot
+from team_registry import team_registry
+
+
+def _week_picks(weeks=None):
+    """(user_id, week, match_id, chosen_team_id, start_time) of all picks, optionally for some weeks"""
+    query = db.session.query(
+        Pick.user_id, Match.week, Pick.match_id, Pick.chosen_team_id, Match.start_time
+    ).join(Match, Pick.match_id == Match.id)
+    if weeks is not None:
+        query = query.filter(Match.week.in_(weeks))
+    return query.order_by(Match.week, Pick.user_id, Pick.id).all()
+
+
+def refresh_week_analytics(weeks):
+    """Recompute the summary rows of some weeks (the caller commits the session)"""
+    weeks = sorted(set(weeks))
+    if not weeks:
+        return
+
+    counts = {}
+    picks_by_week = {}
+    for user_id, week, match_id, chosen_team_id, start_time in _week_picks(weeks):
+        key = (week, match_id, chosen_team_id)
+        counts[key] = counts.get(key, 0) + 1
+        # Only one pick per week is allowed; keep the first if legacy data has more
+        picks_by_week.setdefault(week, {}).setdefault(user_id, (match_id, chosen_team_id, start_time))
+
+    agreements = []
+    for week, picks in picks_by_week.items():
+        users = sorted(picks)
+        for index, user_id in enumerate(users):
+            _, team_id, start_time = picks[user_id]
+            for other_user_id in users[index + 1:]:
+                _, other_team_id, other_start_time = picks[other_user_id]
+                agreements.append({
+                    'week': week,
+                    'user_id': user_id,
+                    'other_user_id': other_user_id,
+                    'agreed': team_id == other_team_id,
+                    'revealed_at': max(start_time, other_start_time)
+                })
+
+    db.session.execute(delete(WeekTeamPickCount).where(WeekTeamPickCount.week.in_(weeks)))
+    db.session.execute(delete(WeekUserPick).where(WeekUserPick.week.in_(weeks)))
+    db.session.execute(delete(WeekPickAgreement).where(WeekPickAgreement.week.in_(weeks)))
+    if counts:
+        db.session.execute(insert(WeekTeamPickCount), [
+            {'week': week, 'match_id': match_id, 'team_id': team_id, 'pick_count': count}
+            for (week, match_id, team_id), count in counts.items()
+        ])
+    if picks_by_week:
+        db.session.execute(insert(WeekUserPick), [
+            {'week': week, 'user_id': user_id, 'match_id': match_id, 'team_id': team_id, 'revealed_at': start_time}
+            for week, picks in picks_by_week.items()
+            for user_id, (match_id, team_id, start_time) in picks.items()
+        ])
+    if agreements:
+        db.session.execute(insert(WeekPickAgreement), agreements)
+
+
+def rebuild_analytics():
+    """Recompute the summary tables for every week and commit"""
+    weeks = [week for (week,) in db.session.query(Match.week).distinct().all()]
+    refresh_week_analytics(weeks)
+    db.session.commit()
+    return len(weeks)
+
+
+def _pick_result(is_completed, winner_team_id, chosen_team_id):
+    if not is_completed:
+        return 'pending'
+    return 'correct' if chosen_team_id == winner_team_id else 'incorrect'
+
+
+def _summarize_week(week, completed, picks, counts, users):
+    """Week payload from revealed picks [(user_id, match_id, team_id, result)] and counts"""
+    revealed = {}
+    hidden_picks = 0
+    for match_id, team_id, pick_count, is_revealed, is_completed, winner_team_id in counts:
+        if not is_revealed:
+            hidden_picks += pick_count
+            continue
+        team = team_registry.get(team_id)
+        revealed[team_id] = {
+            'team_id': team_id,
+            'team': team.to_dict() if team else None,
+            'match_id': match_id,
+            'picks': pick_count,
+            'result': _pick_result(is_completed, winner_team_id, team_id)
+        }
+
+    total = sum(team['picks'] for team in revealed.values())
+    top = max((team['picks'] for team in revealed.values()), default=0)
+    teams = sorted(revealed.values(), key=lambda team: (-team['picks'], team['team_id']))
+    for team in teams:
+        team['share'] = round(team['picks'] / total, 4)
+        team['consensus'] = team['picks'] == top
+
+    user_picks = {user_id: (match_id, team_id, result) for user_id, match_id, team_id, result in picks}
+    entries = []
+    for user in users:
+        pick = user_picks.get(user['id'])
+        entry = {'user_id': user['id'], 'username': user['username'], 'team_id': None}
+        if pick:
+            match_id, team_id, result = pick
+            picks_for_team = revealed[team_id]['picks'] if team_id in revealed else 0
+            entry.update({
+                'match_id': match_id,
+                'team_id': team_id,
+                'result': result,
+                'consensus': picks_for_team == top,
+                'contrarian': picks_for_team == 1 and total > 1
+            })
+        entries.append(entry)
+
+    contrarian = sum(1 for team in teams if team['picks'] == 1) if total > 1 else 0
+    return {
+        'week': week,
+        'completed': completed,
+        'picks': total,
+        'hidden_picks': hidden_picks,
+        'teams': teams,
+        'consensus_team_ids': [team['team_id'] for team in teams if team['consensus']],
+        'consensus_rate': round(top / total, 4) if total else None,
+        'contrarian_rate': round(contrarian / total, 4) if total else None,
+        'users': entries
+    }
+
+
+def _load_weeks(weeks, now):
+    """Completion, revealed picks and pick counts of some weeks (None for all) from the summary tables,
+    three queries in total"""
+    query = db.session.query(Match.week, func.min(case((Match.is_completed == True, 1), else_=0)))  # noqa: E712
+    if weeks is not None:
+        query = query.filter(Match.week.in_(weeks))
+    completed = {week: bool(all_completed) for week, all_completed in query.group_by(Match.week).all()}
+
+    query = db.session.query(
+        WeekUserPick.user_id, WeekUserPick.week, WeekUserPick.match_id, WeekUserPick.team_id,
+        Match.is_completed, Match.winner_team_id
+    ).join(Match, WeekUserPick.match_id == Match.id).filter(WeekUserPick.revealed_at <= now)
+    if weeks is not None:
+        query = query.filter(WeekUserPick.week.in_(weeks))
+    picks = {}
+    for user_id, week, match_id, team_id, is_completed, winner_team_id in query.all():
+        picks.setdefault(week, []).append((user_id, match_id, team_id, _pick_result(is_completed, winner_team_id, team_id)))
+
+    query = db.session.query(
+        WeekTeamPickCount.week, WeekTeamPickCount.match_id, WeekTeamPickCount.team_id, WeekTeamPickCount.pick_count,
+        Match.start_time <= now, Match.is_completed, Match.winner_team_id
+    ).join(Match, WeekTeamPickCount.match_id == Match.id)
+    if weeks is not None:
+        query = query.filter(WeekTeamPickCount.week.in_(weeks))
+    counts = {}
+    for week, *row in query.all():
+        counts.setdefault(week, []).append(row)
+    return completed, picks, counts
+
+
+def revealed_consensus(now, weeks=None):
+    """{week: [team_id, ...]} most picked teams among picks revealed at now, from WeekTeamPickCount"""
+    query = db.session.query(
+        WeekTeamPickCount.week, WeekTeamPickCount.team_id, func.sum(WeekTeamPickCount.pick_count)
+    ).join(Match, WeekTeamPickCount.match_id == Match.id).filter(Match.start_time <= now)
+    if weeks is not None:
+        query = query.filter(WeekTeamPickCount.week.in_(weeks))
+
+    counts = {}
+    for week, team_id, pick_count in query.group_by(WeekTeamPickCount.week, WeekTeamPickCount.team_id).all():
+        counts.setdefault(week, {})[team_id] = pick_count
+    consensus = {}
+    for week, teams in counts.items():
+        top = max(teams.values())
+        if top:
+            consensus[week] = sorted(team_id for team_id, count in teams.items() if count == top)
+    return consensus
+
+
+def agreement_matrix(through_week, now):
+    """Season-to-date agreement between every pair of users, counting revealed weeks only"""
+    rows = db.session.query(
+        WeekPickAgreement.user_id,
+        WeekPickAgreement.other_user_id,
+        func.sum(case((WeekPickAgreement.agreed, 1), else_=0)),
+        func.count()
+    ).filter(
+        WeekPickAgreement.week <= through_week,
+        WeekPickAgreement.revealed_at <= now
+    ).group_by(WeekPickAgreement.user_id, WeekPickAgreement.other_user_id).all()
+
+    user_ids = [entry['id'] for entry in get_leaderboard_snapshot().by_user_id()]
+    index = {user_id: position for position, user_id in enumerate(user_ids)}
+    agreed = [[0] * len(user_ids) for _ in user_ids]
+    compared = [[0] * len(user_ids) for _ in user_ids]
+    for user_id, other_user_id, agreed_weeks, compared_weeks in rows:
+        if user_id not in index or other_user_id not in index:
+            continue
+        a, b = index[user_id], index[other_user_id]
+        agreed[a][b] = agreed[b][a] = int(agreed_weeks or 0)
+        compared[a][b] = compared[b][a] = compared_weeks
+    return {'user_ids': user_ids, 'agreed': agreed, 'compared': compared}
+
+
+def week_analytics(week, now=None):
+    """Popularity, consensus and agreement payload of one week"""
+    now = now or datetime.utcnow()
+    users = get_leaderboard_snapshot().entries
+    completed, picks, counts = _load_weeks([week], now)
+    data = _summarize_week(week, completed.get(week, False), picks.get(week, []), counts.get(week, []), users)
+    data['agreement'] = agreement_matrix(week, now)
+    return data
+
+
+def season_analytics(now=None):
+    """Week payloads (without agreement matrices) of every week, newest first"""
+    now = now or datetime.utcnow()
+    users = get_leaderboard_snapshot().entries
+    completed, picks, counts = _load_weeks(None, now)
+    return {
+        'users': [{'id': user['id'], 'username': user['username']} for user in users],
+        'weeks': [
+            _summarize_week(week, completed[week], picks.get(week, []), counts.get(week, []), users)
+            for week in sorted(completed, reverse=True)
+        ]
+    }
+
+
+def main():
+    """Command line entry point"""
+    command = sys.argv[1] if len(sys.argv) > 1 else 'rebuild'
+    if command != 'rebuild':
+        print(f"Unknown command: {command}")
+        print("Usage: python analytics.py rebuild")
+        sys.exit(1)
+
+    with app.app_context():
+        weeks = rebuild_analytics()
+        print(f"Rebuilt pick analytics for {weeks} weeks")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,27 @@ from flask import Flask, request, jsonify, session, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 import os
+import sys
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 import json
+from database import configure_database
+
+# Helper modules do `from app import ...`; when this file runs as a script make
+# them share this module instead of importing a second copy of the app
+sys.modules.setdefault('app', sys.modules[__name__])
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='static')
 app.config['SECRET_KEY'] = 'nfl-pickem-secret-key'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///nfl_pickem.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# SQLite URI, WAL/pragma settings and pool size (see database.py)
+configure_database(app)
+
+# Largest number of picks accepted by /api/picks/batch (one per week)
+MAX_BATCH_PICKS = 18
+
 # Enable CORS
 CORS(app, supports_credentials=True)
 
@@ -42,11 +53,9 @@ class User(db.Model):
         }
     
     def get_score(self):
-        score = 0
-        for pick in Pick.query.filter_by(user_id=self.id).all():
-            if pick.is_correct:
-                score += 1
-        return score
+        # Scores are materialized in UserScore and kept up to date by scoring.py
+        user_score = UserScore.query.get(self.id)
+        return user_score.score if user_score else 0
 
 class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -63,6 +72,12 @@ class Team(db.Model):
         }
 
 class Match(db.Model):
+    __table_args__ = (
+        db.Index('ix_match_week_status', 'week', 'status'),
+        db.Index('ix_match_status', 'status'),
+        db.Index('ix_match_start_time', 'start_time'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     week = db.Column(db.Integer, nullable=False)
     home_team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
@@ -96,58 +111,35 @@ class Match(db.Model):
     
     @property
     def is_game_started(self):
-        """Check if the game has started (in Vienna timezone)"""
-        from datetime import datetime
-        import pytz
-        
-        vienna_tz = pytz.timezone('Europe/Vienna')
-        now_vienna = datetime.now(vienna_tz)
-        
-        # Convert start_time to Vienna timezone if it's not already
-        if self.start_time.tzinfo is None:
-            # Assume UTC if no timezone info
-            utc_tz = pytz.UTC
-            start_time_utc = utc_tz.localize(self.start_time)
-        else:
-            start_time_utc = self.start_time
-            
-        start_time_vienna = start_time_utc.astimezone(vienna_tz)
-        
-        return now_vienna >= start_time_vienna
+        """Check if the game has started (against the clock of the current request)"""
+        from match_times import is_started
+        return is_started(self.start_time)
     
     @property
     def start_time_vienna(self):
-        """Get start time in Vienna timezone"""
-        import pytz
-        
-        vienna_tz = pytz.timezone('Europe/Vienna')
-        
-        if self.start_time.tzinfo is None:
-            # Assume UTC if no timezone info
-            utc_tz = pytz.UTC
-            start_time_utc = utc_tz.localize(self.start_time)
-        else:
-            start_time_utc = self.start_time
-            
-        return start_time_utc.astimezone(vienna_tz)
+        """Get start time in Vienna timezone (cached per kickoff)"""
+        from match_times import start_vienna
+        return start_vienna(self.start_time)
     
     @winner.setter
     def winner(self, team_name):
         if team_name:
-            team = Team.query.filter_by(name=team_name).first()
+            from team_registry import team_registry
+            team = team_registry.by_name(team_name)
             if team:
                 self.winner_team_id = team.id
                 self.is_completed = True
                 self.status = 'completed'
     
     def to_dict(self):
+        from match_times import start_vienna_iso
         return {
             'id': self.id,
             'week': self.week,
             'home_team': self.home_team.to_dict(),
             'away_team': self.away_team.to_dict(),
             'start_time': self.start_time.isoformat(),
-            'start_time_vienna': self.start_time_vienna.isoformat(),
+            'start_time_vienna': start_vienna_iso(self.start_time),
             'is_completed': self.is_completed,
             'is_game_started': self.is_game_started,
             'home_score': self.home_score,
@@ -159,6 +151,11 @@ class Match(db.Model):
         }
 
 class Pick(db.Model):
+    __table_args__ = (
+        db.Index('uq_pick_user_match', 'user_id', 'match_id', unique=True),
+        db.Index('ix_pick_match', 'match_id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     match_id = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=False)
@@ -184,6 +181,10 @@ class Pick(db.Model):
         }
 
 class EliminatedTeam(db.Model):
+    __table_args__ = (
+        db.Index('uq_eliminated_team_user_team', 'user_id', 'team_id', unique=True),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
@@ -199,6 +200,10 @@ class EliminatedTeam(db.Model):
         }
 
 class TeamWinnerUsage(db.Model):
+    __table_args__ = (
+        db.Index('ix_team_winner_usage_user_team', 'user_id', 'team_id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
@@ -217,6 +222,10 @@ class TeamWinnerUsage(db.Model):
 
 class TeamLoserUsage(db.Model):
     """Tracks teams that have been picked as losers (automatically when picking a winner)"""
+    __table_args__ = (
+        db.Index('ix_team_loser_usage_user_team', 'user_id', 'team_id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
@@ -236,7 +245,103 @@ class TeamLoserUsage(db.Model):
             'match': self.match.to_dict()
         }
 
+class UserScore(db.Model):
+    """Materialized season score per user (maintained by scoring.py)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    score = db.Column(db.Integer, nullable=False, default=0, index=True)
+    correct_picks = db.Column(db.Integer, nullable=False, default=0)
+    incorrect_picks = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    user = db.relationship('User')
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'score': self.score,
+            'correct_picks': self.correct_picks,
+            'incorrect_picks': self.incorrect_picks,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class UserWeekScore(db.Model):
+    """Materialized per-week score breakdown (maintained by scoring.py)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    week = db.Column(db.Integer, primary_key=True)
+    correct_picks = db.Column(db.Integer, nullable=False, default=0)
+    incorrect_picks = db.Column(db.Integer, nullable=False, default=0)
+    
+    user = db.relationship('User')
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'week': self.week,
+            'correct_picks': self.correct_picks,
+            'incorrect_picks': self.incorrect_picks
+        }
+
+class WeekTeamPickCount(db.Model):
+    """Number of users picking a team in a match (maintained by analytics.py)"""
+    week = db.Column(db.Integer, primary_key=True)
+    match_id = db.Column(db.Integer, db.ForeignKey('match.id'), primary_key=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
+    pick_count = db.Column(db.Integer, nullable=False, default=0)
+
+class WeekPickAgreement(db.Model):
+    """Whether two users with a pick in a week chose the same team (maintained by analytics.py)"""
+    week = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)  # user_id < other_user_id
+    other_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    agreed = db.Column(db.Boolean, nullable=False, default=False)
+    revealed_at = db.Column(db.DateTime, nullable=False)  # later kickoff of the two picks
+
+class WeekUserPick(db.Model):
+    """The pick of a user in a week, one row per user and week (maintained by analytics.py)"""
+    week = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    match_id = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    revealed_at = db.Column(db.DateTime, nullable=False)  # kickoff of the picked match
+
+class DataVersion(db.Model):
+    """Change counter per data scope (maintained by data_version.py)"""
+    scope = db.Column(db.String(20), primary_key=True)  # picks, results, picks:<user_id>
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'scope': self.scope,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
 # API Routes
+def parse_id(value):
+    """Integer id from a JSON value (int or digit string), else None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+def feasibility_warning(user_id, state):
+    """{'warning': ...} if no legal path through the season remains after a pick save"""
+    try:
+        from feasibility import check_user_feasibility
+        result = check_user_feasibility(user_id, state)
+        if result.feasible is False:
+            return {
+                'warning': 'With this pick no legal pick remains for every remaining week',
+                'feasibility': result.to_dict()
+            }
+    except Exception as e:
+        print(f"Error checking feasibility: {e}")
+    return {}
+
 @app.route('/api/auth/login', methods=['POST'])
 def login():
     try:
@@ -292,10 +397,14 @@ def get_current_user():
 @app.route('/api/teams', methods=['GET'])
 def get_teams():
     try:
-        teams = Team.query.all()
-        return jsonify({
-            'teams': [team.to_dict() for team in teams]
-        }), 200
+        from team_registry import team_registry
+        
+        # Teams never change during a season: serve the pre-serialized body
+        payload, etag = team_registry.payload()
+        response = app.response_class(payload, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response.make_conditional(request)
     except Exception as e:
         print(f"Error in get_teams: {e}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
@@ -305,14 +414,23 @@ def get_matches():
     try:
         week = request.args.get('week', type=int)
         
-        if week:
-            matches = Match.query.filter_by(week=week).all()
-        else:
-            matches = Match.query.all()
-            
-        return jsonify({
-            'matches': [match.to_dict() for match in matches]
-        }), 200
+        def build_payload():
+            if week:
+                matches = Match.query.filter_by(week=week).all()
+            else:
+                matches = Match.query.all()
+                
+            from serializers import serialize_matches
+            return {
+                'matches': serialize_matches(matches)
+            }
+        
+        # is_game_started flips at kickoff, so the latest passed kickoff is part of the version
+        from data_version import RESULTS, conditional_json
+        last_kickoff = db.session.query(db.func.max(Match.start_time)).filter(
+            Match.start_time <= datetime.utcnow()
+        ).scalar()
+        return conditional_json(build_payload, [RESULTS], as_of=last_kickoff)
     except Exception as e:
         print(f"Error in get_matches: {e}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
@@ -320,9 +438,10 @@ def get_matches():
 @app.route('/api/current-week', methods=['GET'])
 def get_current_week():
     try:
-        # For simplicity, we'll return week 2 as the current week
+        # Resolved from the schedule (see week_calendar.py)
+        from week_calendar import week_calendar
         return jsonify({
-            'current_week': 2
+            'current_week': week_calendar.current_week()
         }), 200
     except Exception as e:
         print(f"Error in get_current_week: {e}")
@@ -338,17 +457,28 @@ def handle_picks():
             if not user_id:
                 return jsonify({'error': 'User ID required'}), 400
                 
-            query = Pick.query.filter_by(user_id=user_id)
+            # include_score=0 skips the nested user score
+            include_user_score = request.args.get('include_score', 1, type=int) != 0
             
-            if week:
-                # Join with Match to filter by week
-                picks = query.join(Match).filter(Match.week == week).all()
-            else:
-                picks = query.all()
+            def build_payload():
+                from serializers import pick_query, serialize_picks
+                query = pick_query().filter(Pick.user_id == user_id)
                 
-            return jsonify({
-                'picks': [pick.to_dict() for pick in picks]
-            }), 200
+                if week:
+                    # Join with Match to filter by week
+                    picks = query.join(Pick.match).filter(Match.week == week).all()
+                else:
+                    picks = query.all()
+                    
+                return {
+                    'picks': serialize_picks(picks, include_user_score=include_user_score)
+                }
+            
+            from data_version import PICKS, RESULTS, conditional_json
+            last_kickoff = db.session.query(db.func.max(Match.start_time)).filter(
+                Match.start_time <= datetime.utcnow()
+            ).scalar()
+            return conditional_json(build_payload, [PICKS, RESULTS], as_of=last_kickoff)
         
         elif request.method == 'POST':
             user_id = session.get('user_id')
@@ -361,166 +491,133 @@ def handle_picks():
             
             if not match_id or not chosen_team_id:
                 return jsonify({'error': 'Match ID and chosen team ID required'}), 400
+            match_id = parse_id(match_id)
+            chosen_team_id = parse_id(chosen_team_id)
+            if match_id is None or chosen_team_id is None:
+                return jsonify({'error': 'Match ID and chosen team ID must be integers'}), 400
                 
-            # Check if match exists
+            # All rules are checked against the user's season state loaded in one query
+            from pick_rules import PickRejected, PickRuleEngine
             match = Match.query.get(match_id)
-            if not match:
-                return jsonify({'error': 'Match not found'}), 404
+            engine = PickRuleEngine.load(user_id)
+            try:
+                updated = engine.evaluate(match, chosen_team_id)
+            except PickRejected as rejected:
+                return jsonify({'error': rejected.message}), rejected.status
             
-            # Check if game has already started (Backend validation)
-            if match.is_game_started:
-                return jsonify({'error': 'Game has already started. Picks are no longer allowed.'}), 400
-                
-            # Check if team exists
-            team = Team.query.get(chosen_team_id)
-            if not team:
-                return jsonify({'error': 'Team not found'}), 404
-                
-            # Check if match is completed
-            if match.is_completed:
-                return jsonify({'error': 'Cannot pick for completed match'}), 400
-                
-            # Check if team is part of the match
-            if team.id != match.home_team_id and team.id != match.away_team_id:
-                return jsonify({'error': 'Team is not part of this match'}), 400
-                
-            # NEW RULE: Check if user already has a pick for this WEEK (only one pick per week allowed)
-            existing_week_pick = Pick.query.join(Match).filter(
-                Pick.user_id == user_id,
-                Match.week == match.week
-            ).first()
+            engine.apply()
+            from analytics import refresh_week_analytics
+            refresh_week_analytics([match.week])
+            from data_version import PICKS, bump_data_version, user_scope
+            bump_data_version(PICKS)
+            bump_data_version(user_scope(PICKS, user_id))
+            db.session.commit()
             
-            if existing_week_pick and existing_week_pick.match_id != match_id:
-                return jsonify({'error': f'You already have a pick for week {match.week}. Only one pick per week is allowed.'}), 400
-                
-            # Check if chosen team is eliminated for this user
-            eliminated = EliminatedTeam.query.filter_by(user_id=user_id, team_id=team.id).first()
-            if eliminated:
-                return jsonify({'error': 'Team is already eliminated for this user'}), 400
-                
-            # Check team winner usage limit (max 2 times per season)
-            team_usage = TeamWinnerUsage.query.filter_by(user_id=user_id, team_id=team.id).first()
-            if team_usage and team_usage.usage_count >= 2:
-                return jsonify({'error': 'Team has already been picked as winner 2 times this season'}), 400
-                
-            # NEW RULE: Check if the opposing team has been picked as loser before
-            opposing_team_id = match.away_team_id if team.id == match.home_team_id else match.home_team_id
-            loser_usage = TeamLoserUsage.query.filter_by(user_id=user_id, team_id=opposing_team_id).first()
-            if loser_usage:
-                opposing_team = Team.query.get(opposing_team_id)
-                return jsonify({'error': f'{opposing_team.name} has already been picked as loser this season and cannot be picked as loser again'}), 400
-            if team.id != match.home_team_id and team.id != match.away_team_id:
-                return jsonify({'error': 'Team is not part of this match'}), 400
-                
-            # Check if user already has a pick for this match (for updates)
-            existing_pick = Pick.query.filter_by(user_id=user_id, match_id=match_id).first()
+            from availability import update_availability
+            update_availability(user_id, engine.state)
             
-            if existing_pick:
-                # Update existing pick
-                old_team_id = existing_pick.chosen_team_id
-                old_opposing_team_id = match.away_team_id if old_team_id == match.home_team_id else match.home_team_id
-                
-                # If changing pick, we need to update usage counts
-                if old_team_id != chosen_team_id:
-                    # Remove old winner usage
-                    old_team_usage = TeamWinnerUsage.query.filter_by(user_id=user_id, team_id=old_team_id).first()
-                    if old_team_usage and old_team_usage.usage_count > 0:
-                        old_team_usage.usage_count -= 1
-                        if old_team_usage.usage_count == 0:
-                            db.session.delete(old_team_usage)
-                    
-                    # Remove old loser usage
-                    old_loser_usage = TeamLoserUsage.query.filter_by(user_id=user_id, team_id=old_opposing_team_id, match_id=match_id).first()
-                    if old_loser_usage:
-                        db.session.delete(old_loser_usage)
-                        
-                        # Remove old elimination (if it was only from this loser usage)
-                        remaining_loser_usage = TeamLoserUsage.query.filter_by(user_id=user_id, team_id=old_opposing_team_id).count()
-                        if remaining_loser_usage == 0:  # No other loser usages
-                            old_elimination = EliminatedTeam.query.filter_by(user_id=user_id, team_id=old_opposing_team_id).first()
-                            if old_elimination:
-                                db.session.delete(old_elimination)
-                    
-                    # Add new winner usage
-                    new_team_usage = TeamWinnerUsage.query.filter_by(user_id=user_id, team_id=chosen_team_id).first()
-                    if new_team_usage:
-                        new_team_usage.usage_count += 1
-                    else:
-                        new_team_usage = TeamWinnerUsage(user_id=user_id, team_id=chosen_team_id, usage_count=1)
-                        db.session.add(new_team_usage)
-                    
-                    # Add new loser usage (automatically when picking winner)
-                    new_opposing_team_id = match.away_team_id if chosen_team_id == match.home_team_id else match.home_team_id
-                    new_loser_usage = TeamLoserUsage(
-                        user_id=user_id, 
-                        team_id=new_opposing_team_id, 
-                        week=match.week,
-                        match_id=match_id
-                    )
-                    db.session.add(new_loser_usage)
-                    
-                    # ELIMINATE NEW OPPOSING TEAM: New opposing team is eliminated (1x as loser)
-                    existing_new_elimination = EliminatedTeam.query.filter_by(user_id=user_id, team_id=new_opposing_team_id).first()
-                    if not existing_new_elimination:
-                        new_elimination = EliminatedTeam(user_id=user_id, team_id=new_opposing_team_id)
-                        db.session.add(new_elimination)
-                    
-                    # Check if new chosen team should be eliminated (2x as winner)
-                    if new_team_usage and new_team_usage.usage_count >= 2:
-                        existing_chosen_elimination = EliminatedTeam.query.filter_by(user_id=user_id, team_id=chosen_team_id).first()
-                        if not existing_chosen_elimination:
-                            chosen_elimination = EliminatedTeam(user_id=user_id, team_id=chosen_team_id)
-                            db.session.add(chosen_elimination)
+            from serializers import pick_query, serialize_pick
+            pick = pick_query().filter(Pick.user_id == user_id, Pick.match_id == match_id).first()
+            response = {
+                'message': 'Pick updated successfully' if updated else 'Pick created successfully',
+                'pick': serialize_pick(pick)
+            }
+            response.update(feasibility_warning(user_id, engine.state))
+            return jsonify(response), 200 if updated else 201
+    except Exception as e:
+        print(f"Error in handle_picks: {e}")
+        return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
+@app.route('/api/picks/batch', methods=['POST'])
+def handle_pick_batch():
+    """Validate several picks (e.g. future weeks) together and save them atomically"""
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'Not authenticated'}), 401
+            
+        data = request.get_json(silent=True) or {}
+        entries = data.get('picks')
+        if not isinstance(entries, list) or not entries:
+            return jsonify({'error': 'List of picks required'}), 400
+        if len(entries) > MAX_BATCH_PICKS:
+            return jsonify({'error': f'At most {MAX_BATCH_PICKS} picks per request'}), 400
+            
+        batch = []
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict) or not entry.get('match_id') or not entry.get('chosen_team_id'):
+                return jsonify({'error': 'Match ID and chosen team ID required', 'index': index}), 400
+            match_id = parse_id(entry['match_id'])
+            chosen_team_id = parse_id(entry['chosen_team_id'])
+            if match_id is None or chosen_team_id is None:
+                return jsonify({'error': 'Match ID and chosen team ID must be integers', 'index': index}), 400
+            batch.append((match_id, chosen_team_id))
                 
-                # Update existing pick
-                existing_pick.chosen_team_id = chosen_team_id
-                db.session.commit()
+        # One query for the matches, one for the season state
+        match_ids = {match_id for match_id, _ in batch}
+        matches = {match.id: match for match in Match.query.filter(Match.id.in_(match_ids)).all()}
+        
+        from pick_rules import PickRejected, PickRuleEngine
+        engine = PickRuleEngine.load(user_id)
+        
+        # Each pick is validated against the state including the earlier picks of the batch
+        for index, (match_id, chosen_team_id) in enumerate(batch):
+            try:
+                engine.evaluate(matches.get(match_id), chosen_team_id)
+            except PickRejected as rejected:
                 return jsonify({
-                    'message': 'Pick updated successfully',
-                    'pick': existing_pick.to_dict()
-                }), 200
-            else:
-                # Create new pick
-                pick = Pick(user_id=user_id, match_id=match_id, chosen_team_id=chosen_team_id)
-                db.session.add(pick)
-                
-                # Update team winner usage count
-                if team_usage:
-                    team_usage.usage_count += 1
-                else:
-                    team_usage = TeamWinnerUsage(user_id=user_id, team_id=chosen_team_id, usage_count=1)
-                    db.session.add(team_usage)
-                
-                # NEW RULE: Automatically add loser usage for opposing team
-                opposing_team_id = match.away_team_id if chosen_team_id == match.home_team_id else match.home_team_id
-                loser_usage = TeamLoserUsage(
-                    user_id=user_id, 
-                    team_id=opposing_team_id, 
-                    week=match.week,
-                    match_id=match_id
-                )
-                db.session.add(loser_usage)
+                    'error': rejected.message,
+                    'index': index,
+                    'match_id': match_id
+                }), rejected.status
                 
-                # ELIMINATE TEAM: Opposing team is eliminated (1x as loser)
-                existing_elimination = EliminatedTeam.query.filter_by(user_id=user_id, team_id=opposing_team_id).first()
-                if not existing_elimination:
-                    elimination = EliminatedTeam(user_id=user_id, team_id=opposing_team_id)
-                    db.session.add(elimination)
-                
-                # Check if chosen team should be eliminated (2x as winner)
-                if team_usage and team_usage.usage_count >= 2:
-                    existing_chosen_elimination = EliminatedTeam.query.filter_by(user_id=user_id, team_id=chosen_team_id).first()
-                    if not existing_chosen_elimination:
-                        chosen_elimination = EliminatedTeam(user_id=user_id, team_id=chosen_team_id)
-                        db.session.add(chosen_elimination)
-                
-                db.session.commit()
-                return jsonify({
-                    'message': 'Pick created successfully',
-                    'pick': pick.to_dict()
-                }), 201
+        engine.apply()
+        from analytics import refresh_week_analytics
+        refresh_week_analytics({match.week for match in matches.values()})
+        from data_version import PICKS, bump_data_version, user_scope
+        bump_data_version(PICKS)
+        bump_data_version(user_scope(PICKS, user_id))
+        db.session.commit()
+        
+        from availability import update_availability
+        update_availability(user_id, engine.state)
+        
+        from serializers import pick_query, serialize_picks
+        picks = pick_query().filter(Pick.user_id == user_id, Pick.match_id.in_(match_ids)).all()
+        response = {
+            'message': 'Picks saved successfully',
+            'picks': serialize_picks(picks)
+        }
+        response.update(feasibility_warning(user_id, engine.state))
+        return jsonify(response), 200
     except Exception as e:
-        print(f"Error in handle_picks: {e}")
+        db.session.rollback()
+        print(f"Error in handle_pick_batch: {e}")
+        return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
+@app.route('/api/dashboard', methods=['GET'])
+def get_dashboard():
+    """Current week, score, rank, opponents, recent picks and eliminated teams of a user"""
+    try:
+        user_id = request.args.get('user_id', type=int)
+        
+        if not user_id:
+            return jsonify({'error': 'User ID required'}), 400
+            
+        if db.session.get(User, user_id) is None:
+            return jsonify({'error': 'User not found'}), 404
+            
+        from dashboard import build_dashboard
+        from data_version import PICKS, RESULTS, conditional_json
+        from week_calendar import week_calendar
+        current_week = week_calendar.current_week()
+        return conditional_json(
+            lambda: build_dashboard(user_id, current_week),
+            [PICKS, RESULTS],
+            variant=current_week
+        )
+    except Exception as e:
+        print(f"Error in get_dashboard: {e}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
 @app.route('/api/picks/score', methods=['GET'])
@@ -531,27 +628,28 @@ def get_user_scores():
         if not user_id:
             return jsonify({'error': 'User ID required'}), 400
             
+        from leaderboard import get_leaderboard_snapshot
+        snapshot = get_leaderboard_snapshot()
+        
         # Get the user
-        user = User.query.get(user_id)
+        user = snapshot.get(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
             
-        # Get all other users
-        other_users = User.query.filter(User.id != user_id).all()
-        
         return jsonify({
             'user': {
-                'id': user.id,
-                'username': user.username,
-                'score': user.get_score()
+                'id': user['id'],
+                'username': user['username'],
+                'score': user['score']
             },
             'opponents': [
                 {
-                    'id': other_user.id,
-                    'username': other_user.username,
-                    'score': other_user.get_score()
+                    'id': other['id'],
+                    'username': other['username'],
+                    'score': other['score']
                 }
-                for other_user in other_users
+                for other in snapshot.by_user_id()
+                if other['id'] != user_id
             ]
         }), 200
     except Exception as e:
@@ -571,11 +669,14 @@ def get_recent_picks():
         if not user:
             return jsonify({'error': 'User not found'}), 404
             
+        from team_registry import team_registry
+        
         # Get recent picks (last 2 weeks)
         recent_picks = []
         
         # Get current week
-        current_week = 2  # Hardcoded for simplicity
+        from week_calendar import week_calendar
+        current_week = week_calendar.current_week() or 0
         
         # Get picks for current week and previous week
         for week in range(current_week, 0, -1):
@@ -585,10 +686,11 @@ def get_recent_picks():
             ).all()
             
             for pick in picks:
+                chosen_team = team_registry.get(pick.chosen_team_id)
                 recent_picks.append({
                     'week': pick.match.week,
-                    'team': pick.chosen_team.name,
-                    'team_logo': pick.chosen_team.logo_url,
+                    'team': chosen_team.name,
+                    'team_logo': chosen_team.logo_url,
                     'is_completed': pick.match.is_completed,
                     'is_correct': pick.is_correct
                 })
@@ -600,6 +702,71 @@ def get_recent_picks():
         print(f"Error in get_recent_picks: {e}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
+@app.route('/api/picks/availability', methods=['GET'])
+def get_team_availability():
+    """Eliminated, winner-usage and loser-usage state of all teams in one response"""
+    try:
+        user_id = request.args.get('user_id', type=int)
+        
+        if not user_id:
+            return jsonify({'error': 'User ID required'}), 400
+            
+        from availability import get_availability
+        
+        if db.session.get(User, user_id) is None:
+            return jsonify({'error': 'User not found'}), 404
+            
+        data = get_availability(user_id).to_dict()
+        data['user_id'] = user_id
+        return jsonify(data), 200
+    except Exception as e:
+        print(f"Error in get_team_availability: {e}")
+        return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
+@app.route('/api/picks/feasibility', methods=['GET'])
+def get_pick_feasibility():
+    """Whether a legal pick remains possible for every remaining week, with a sample path"""
+    try:
+        user_id = request.args.get('user_id', type=int)
+        
+        if not user_id:
+            return jsonify({'error': 'User ID required'}), 400
+            
+        user = User.query.get(user_id)
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+            
+        from feasibility import check_user_feasibility
+        return jsonify(check_user_feasibility(user_id).to_dict()), 200
+    except Exception as e:
+        print(f"Error in get_pick_feasibility: {e}")
+        return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
+@app.route('/api/picks/matrix', methods=['GET'])
+def get_pick_matrix():
+    """All users' picks of all weeks as one grid; unrevealed picks are withheld here"""
+    try:
+        hide_current = request.args.get('hide_current', '1') not in ('0', 'false')
+        
+        from pick_matrix import build_pick_matrix
+        from data_version import PICKS, RESULTS, conditional_json
+        from week_calendar import week_calendar
+        current_week = week_calendar.current_week()
+        
+        # Picks are revealed at kickoff, so the latest passed kickoff is part of the version
+        last_kickoff = db.session.query(db.func.max(Match.start_time)).filter(
+            Match.start_time <= datetime.utcnow()
+        ).scalar()
+        return conditional_json(
+            lambda: build_pick_matrix(current_week, hide_current=hide_current),
+            [PICKS, RESULTS],
+            as_of=last_kickoff,
+            variant=current_week
+        )
+    except Exception as e:
+        print(f"Error in get_pick_matrix: {e}")
+        return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
 @app.route('/api/picks/eliminated', methods=['GET'])
 def get_eliminated_teams():
     try:
@@ -613,11 +780,13 @@ def get_eliminated_teams():
         if not user:
             return jsonify({'error': 'User not found'}), 404
             
+        from team_registry import team_registry
+        
         # Get eliminated teams
         eliminated_teams = EliminatedTeam.query.filter_by(user_id=user_id).all()
         
         return jsonify({
-            'eliminated_teams': [team.team.to_dict() for team in eliminated_teams]
+            'eliminated_teams': [team_registry.get(eliminated.team_id).to_dict() for eliminated in eliminated_teams]
         }), 200
     except Exception as e:
         print(f"Error in get_eliminated_teams: {e}")
@@ -645,7 +814,8 @@ def get_team_winner_usage():
             usage_dict[usage.team_id] = usage.usage_count
             
         # Get all teams and add usage count
-        all_teams = Team.query.all()
+        from team_registry import team_registry
+        all_teams = team_registry.all()
         team_status = []
         
         for team in all_teams:
@@ -687,9 +857,11 @@ def get_team_loser_usage():
         # Get teams used as losers
         loser_usage = TeamLoserUsage.query.filter_by(user_id=user_id).all()
         
+        from team_registry import team_registry
+        
         loser_teams = []
         for usage in loser_usage:
-            loser_teams.append(usage.team.to_dict())
+            loser_teams.append(team_registry.get(usage.team_id).to_dict())
         
         return jsonify({
             'loser_teams': loser_teams
@@ -701,37 +873,69 @@ def get_team_loser_usage():
 @app.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
     try:
-        users = User.query.all()
-        
-        # Calculate scores and sort by score (descending)
-        leaderboard = []
-        for user in users:
-            score = user.get_score()
-            leaderboard.append({
-                'id': user.id,
-                'username': user.username,
-                'score': score
-            })
-            
-        leaderboard.sort(key=lambda x: x['score'], reverse=True)
+        from leaderboard import get_leaderboard_snapshot
+        from data_version import RESULTS, conditional_json
         
-        # Add emojis for first and last place (if not tied)
-        if len(leaderboard) > 1:
-            # Check if first place is not tied
-            if leaderboard[0]['score'] > leaderboard[1]['score']:
-                leaderboard[0]['emoji'] = '💪'
-                
-            # Check if last place is not tied
-            if leaderboard[-1]['score'] < leaderboard[-2]['score']:
-                leaderboard[-1]['emoji'] = '💩'
-        
-        return jsonify({
-            'leaderboard': leaderboard
-        }), 200
+        # Scores, ranks and first/last place emojis come from one cached query;
+        # its digest covers users added or renamed without a results change
+        snapshot = get_leaderboard_snapshot()
+        return conditional_json(lambda: {
+            'leaderboard': snapshot.to_list()
+        }, [RESULTS], variant=snapshot.digest)
     except Exception as e:
         print(f"Error in get_leaderboard: {e}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
+@app.route('/api/analytics/week/<int:week>', methods=['GET'])
+def get_week_analytics(week):
+    """Pick counts, consensus / contrarian rates and head-to-head agreement of a week"""
+    try:
+        from analytics import week_analytics
+        from data_version import PICKS, RESULTS, conditional_json
+        
+        # Picks are revealed at kickoff, so the latest passed kickoff is part of the version
+        last_kickoff = db.session.query(db.func.max(Match.start_time)).filter(
+            Match.start_time <= datetime.utcnow()
+        ).scalar()
+        return conditional_json(lambda: week_analytics(week), [PICKS, RESULTS], as_of=last_kickoff)
+    except Exception as e:
+        print(f"Error in get_week_analytics: {e}")
+        return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
+@app.route('/api/analytics/weeks', methods=['GET'])
+def get_season_analytics():
+    """Revealed picks and consensus of every week in one response (all-picks page)"""
+    try:
+        from analytics import season_analytics
+        from data_version import PICKS, RESULTS, conditional_json
+        
+        last_kickoff = db.session.query(db.func.max(Match.start_time)).filter(
+            Match.start_time <= datetime.utcnow()
+        ).scalar()
+        return conditional_json(season_analytics, [PICKS, RESULTS], as_of=last_kickoff)
+    except Exception as e:
+        print(f"Error in get_season_analytics: {e}")
+        return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
+@app.route('/api/simulations/standings', methods=['GET'])
+def get_simulated_standings():
+    """Monte Carlo finishing-position probabilities for every user"""
+    try:
+        from simulation import DEFAULT_POLICY, POLICIES
+        policy = request.args.get('policy', DEFAULT_POLICY)
+
+        if policy not in POLICIES:
+            return jsonify({'error': f"Unknown policy. Use one of: {', '.join(POLICIES)}"}), 400
+
+        import simulation
+        from data_version import PICKS, RESULTS, conditional_json
+
+        # Recomputed only when picks or results change
+        return conditional_json(lambda: simulation.get_simulated_standings(policy).to_dict(), [PICKS, RESULTS])
+    except Exception as e:
+        print(f"Error in get_simulated_standings: {e}")
+        return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
 # Get user rank
 @app.route('/api/user/rank', methods=['GET'])
 def get_user_rank():
@@ -741,32 +945,10 @@ def get_user_rank():
         if not user_id:
             return jsonify({'error': 'User ID is required'}), 400
             
-        # Get all users and calculate scores
-        users = User.query.all()
-        
-        # Calculate scores and sort by score (descending)
-        leaderboard = []
-        for user in users:
-            score = user.get_score()
-            leaderboard.append({
-                'id': user.id,
-                'username': user.username,
-                'score': score
-            })
-            
-        leaderboard.sort(key=lambda x: x['score'], reverse=True)
+        from leaderboard import get_leaderboard_snapshot
         
-        # Find the user's rank (handle ties correctly)
-        user_rank = None
-        current_rank = 1
-        for i, user in enumerate(leaderboard):
-            # If this user has a lower score than the previous user, update rank
-            if i > 0 and leaderboard[i]['score'] < leaderboard[i-1]['score']:
-                current_rank = i + 1
-            
-            if user['id'] == int(user_id):
-                user_rank = current_rank
-                break
+        # Ranks are computed in SQL (ties share a rank: 1,1,1,4)
+        user_rank = get_leaderboard_snapshot().rank_of(int(user_id))
                 
         if user_rank is None:
             return jsonify({'error': 'User not found'}), 404
@@ -784,7 +966,8 @@ def get_scheduler_status():
     """Get current scheduler status"""
     try:
         # Get current week info
-        current_week = 2  # This could be dynamic
+        from week_calendar import week_calendar
+        current_week = week_calendar.current_week()
         
         # Get completed matches count
         completed_matches = Match.query.filter_by(status='completed').count()
@@ -803,10 +986,43 @@ def get_scheduler_status():
 
 @app.route('/api/scheduler/manual-update', methods=['POST'])
 def manual_update():
-    """Manually trigger an update for a specific week"""
+    """Manually trigger an update for a week, or resync a range of weeks.
+
+    Body: {"week": 3}, {"weeks": "1-18"} / {"weeks": [3, 5]} or
+    {"from_week": 1, "to_week": 18}. Ranges are fetched concurrently and
+    written in one transaction.
+    """
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
+        
+        if 'weeks' in data or 'from_week' in data or 'to_week' in data:
+            from async_fetcher import MAX_RESYNC_WEEKS, parse_week_range, resync_weeks
+            from week_calendar import week_calendar
+            
+            max_week = week_calendar.max_week() or MAX_RESYNC_WEEKS
+            if 'weeks' in data:
+                spec = data['weeks'] if isinstance(data['weeks'], list) else [data['weeks']]
+            else:
+                spec = [f"{data.get('from_week', 1)}-{data.get('to_week') or max_week}"]
+            if len(spec) > MAX_RESYNC_WEEKS:
+                return jsonify({'error': f'At most {MAX_RESYNC_WEEKS} weeks per resync'}), 400
+            try:
+                weeks = parse_week_range(spec, max_week)
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': 'Invalid week range', 'details': str(e)}), 400
+            
+            summary = resync_weeks(weeks)
+            return jsonify({
+                'success': not summary['failed'],
+                'weeks': weeks,
+                'updated': summary['weeks'],
+                'failed': summary['failed']
+            }), 200 if not summary['failed'] else 502
+        
         week = data.get('week', 2)
+        from week_calendar import week_calendar
+        if not isinstance(week, int) or not 1 <= week <= (week_calendar.max_week() or 18):
+            return jsonify({'error': 'Invalid week'}), 400
         
         # Import and run the ESPN integration
         from espn_integration import ESPNIntegration
@@ -837,15 +1053,20 @@ def get_match_results():
     try:
         week = request.args.get('week', type=int)
         
-        query = Match.query
-        if week:
-            query = query.filter_by(week=week)
-        
-        matches = query.filter_by(status='completed').all()
+        def build_payload():
+            query = Match.query
+            if week:
+                query = query.filter_by(week=week)
+            
+            matches = query.filter_by(status='completed').all()
+            
+            from serializers import serialize_matches
+            return {
+                'matches': serialize_matches(matches)
+            }
         
-        return jsonify({
-            'matches': [match.to_dict() for match in matches]
-        }), 200
+        from data_version import RESULTS, conditional_json
+        return conditional_json(build_payload, [RESULTS])
     except Exception as e:
         print(f"Error in get_match_results: {e}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
@@ -860,7 +1081,45 @@ def serve_static(path):
 
 # Initialize database
 with app.app_context():
+    # Bring an existing database up to the current schema (indexes, constraints)
+    from database import sqlite_database_path
+    db_path = sqlite_database_path(db.engine.url, app.instance_path)
+    try:
+        from migrations import migrate_database
+        migrate_database(db_path)
+    except Exception as e:
+        print(f"Error migrating database: {e}")
+    
     db.create_all()
+    
+    # Load the team registry once; teams do not change during a season
+    try:
+        from team_registry import team_registry
+        team_registry.load()
+    except Exception as e:
+        print(f"Error loading team registry: {e}")
+    
+    # Week boundaries for the current-week lookups
+    try:
+        from week_calendar import week_calendar
+        week_calendar.load()
+    except Exception as e:
+        print(f"Error loading week calendar: {e}")
+    
+    # Materialized scores and pick analytics are kept up to date by every
+    # writer. They are only rebuilt here when missing or left empty (e.g. just
+    # created by db.create_all()), so importing this module does not rewrite
+    # them; "python scoring.py rebuild" / "python analytics.py rebuild" force it
+    try:
+        from migrations import derived_tables_stale
+        if derived_tables_stale(db_path):
+            from scoring import rebuild_user_scores
+            from analytics import rebuild_analytics
+            rebuild_user_scores()
+            rebuild_analytics()
+    except Exception as e:
+        print(f"Error rebuilding derived tables: {e}")
+        db.session.rollback()
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -26,11 +26,16 @@ try:
 except ImportError as e:
     logging.error(f"Error importing from db_backup: {str(e)}")
     
+    # Database file behind PICKEM_DATABASE_URI
+    try:
+        from database import DATABASE_PATH as DB_PATH
+    except ImportError:
+        DB_PATH = 'instance/nfl_pickem.db'
+    
     # Define fallback functions
     def check_db_exists():
         """Check if the database exists."""
-        db_path = 'instance/nfl_pickem.db'
-        return os.path.exists(db_path)
+        return bool(DB_PATH) and os.path.exists(DB_PATH)
     
     def create_backup():
         """Create a backup of the database."""
@@ -39,13 +44,12 @@ except ImportError as e:
             if not os.path.exists('db_backups'):
                 os.makedirs('db_backups')
             
-            db_path = 'instance/nfl_pickem.db'
-            if os.path.exists(db_path):
+            if check_db_exists():
                 import shutil
                 from datetime import datetime
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 backup_path = os.path.join('db_backups', f'nfl_pickem_{timestamp}.db')
-                shutil.copy2(db_path, backup_path)
+                shutil.copy2(DB_PATH, backup_path)
                 logging.info(f"Created backup at {backup_path}")
                 return True
             return False
@@ -72,13 +76,18 @@ except ImportError as e:
             # Get the newest backup
             latest_backup = os.path.join('db_backups', backups[0])
             
-            # Ensure instance directory exists
-            if not os.path.exists('instance'):
-                os.makedirs('instance')
+            if not DB_PATH:
+                logging.warning("The configured database is not a SQLite file")
+                return False
+            
+            # Ensure the database directory exists
+            db_dir = os.path.dirname(DB_PATH)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir)
             
             # Copy the backup to the database location
             import shutil
-            shutil.copy2(latest_backup, 'instance/nfl_pickem.db')
+            shutil.copy2(latest_backup, DB_PATH)
             logging.info(f"Restored from backup: {latest_backup}")
             return True
         except Exception as e:
@@ -97,6 +106,29 @@ except ImportError as e:
                 logging.error(f"Backup service error: {str(e)}")
                 time.sleep(60)
 
+def migrate_database():
+    """Apply pending schema migrations before the app creates its tables."""
+    try:
+        from migrations import migrate_database as apply_migrations, derived_tables_stale
+        old_version, new_version, report = apply_migrations()
+        if old_version is not None and old_version != new_version:
+            logging.info(f"Migrated database schema from version {old_version} to {new_version}")
+            logging.info(f"Query plans before/after migration:\n{report}")
+            rebuild_materialized_tables()
+        elif old_version is not None and derived_tables_stale():
+            rebuild_materialized_tables()
+        return True
+    except Exception as e:
+        logging.error(f"Database migration failed: {str(e)}")
+        return False
+
+def rebuild_materialized_tables():
+    """Recompute scores and pick analytics from the pick and match tables."""
+    for script in ('scoring.py', 'analytics.py'):
+        result = subprocess.run([sys.executable, script, 'rebuild'])
+        if result.returncode != 0:
+            logging.error(f"{script} rebuild failed with exit code {result.returncode}")
+
 def start_backup_service():
     """Start the backup service in a separate thread."""
     backup_thread = threading.Thread(target=run_backup_service)
@@ -127,6 +159,9 @@ def main():
         # Create a backup of the existing database before starting
         create_backup()
     
+    # Add indexes/constraints to an existing database (after the backup above)
+    migrate_database()
+    
     # Start the backup service
     start_backup_service()
     
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Async Fetcher
+Fetches many weeks of results concurrently and writes them in one transaction
+
+Re-verifying a season used to mean 18 serial process_weekly_update calls.
+Here every requested week is fetched at once on an asyncio loop, with at
+most MAX_CONCURRENT_FETCHES requests in flight and no more than
+HOST_REQUESTS_PER_SECOND started against any one host. The requests
+themselves go through the results provider in worker threads, so they keep
+the on-disk HTTP cache and its 304 revalidation. All fetched weeks are then
+written with a single commit; final results from ESPN replace stored ones.
+
+    python async_fetcher.py 1-18        resync weeks 1 to 18
+    python async_fetcher.py 3 5 7       resync individual weeks
+"""
+
+import asyncio
+import logging
+import sys
+from urllib.parse import urlparse
+from app import app, db
+from result_writer import write_week_results
+from results_provider import get_results_provider
+
+MAX_CONCURRENT_FETCHES = 6
+HOST_REQUESTS_PER_SECOND = 5
+
+# Most weeks one resync may cover (a regular season)
+MAX_RESYNC_WEEKS = 18
+
+logger = logging.getLogger(__name__)
+
+
+class HostRateLimiter:
+    """Spaces out request starts per host"""
+
+    def __init__(self, requests_per_second=HOST_REQUESTS_PER_SECOND):
+        self.interval = 1.0 / requests_per_second
+        self._next_start = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+def _week_host(provider, week):
+    """Host a provider asks first for a week (the primary one of a fallback chain)"""
+    providers = getattr(provider, 'providers', None)
+    if providers:
+        provider = providers[0]
+    return urlparse(provider.week_url(week)).netloc
+
+
+async def fetch_weeks_async(provider, weeks, max_concurrent=MAX_CONCURRENT_FETCHES,
+                            requests_per_second=HOST_REQUESTS_PER_SECOND):
+    """{week: [GameResult] or the exception that fetching it raised}"""
+    semaphore = asyncio.Semaphore(max_concurrent)
+    limiter = HostRateLimiter(requests_per_second)
+
+    async def fetch(week):
+        async with semaphore:
+            await limiter.wait(_week_host(provider, week))
+            try:
+                return week, await asyncio.to_thread(provider.fetch_week, week)
+            except Exception as e:
+                return week, e
+
+    return dict(await asyncio.gather(*(fetch(week) for week in weeks)))
+
+
+def fetch_weeks(provider, weeks, **kwargs):
+    """Blocking wrapper around fetch_weeks_async"""
+    return asyncio.run(fetch_weeks_async(provider, weeks, **kwargs))
+
+
+def resync_weeks(weeks, provider=None):
+    """Fetch the weeks concurrently and write all results in one commit.
+
+    Returns {'weeks': {week: ResultDiff.to_dict()}, 'failed': {week: error}}.
+    """
+    provider = provider or get_results_provider()
+    weeks = sorted(set(weeks))
+    fetched = fetch_weeks(provider, weeks)
+
+    summary = {'weeks': {}, 'failed': {}}
+    with app.app_context():
+        try:
+            for week in weeks:
+                games = fetched[week]
+                if isinstance(games, Exception):
+                    logger.error(f"Fetching week {week} failed: {games}")
+                    summary['failed'][week] = str(games)
+                    continue
+                diff = write_week_results(week, games, overwrite_completed=True, commit=False)
+                summary['weeks'][week] = diff.to_dict()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    return summary
+
+
+def parse_week_range(values, max_week):
+    """Week numbers from arguments like ['1-18'] or ['3', '5', '7'].
+
+    Raises ValueError for weeks outside 1..max_week and for more than
+    MAX_RESYNC_WEEKS weeks.
+    """
+    weeks = set()
+    for value in values:
+        start, _, end = str(value).partition('-')
+        first, last = int(start), int(end or start)
+        if first < 1 or last < first or last > max_week:
+            raise ValueError(f"Invalid week range: {value} (weeks are 1-{max_week})")
+        weeks.update(range(first, last + 1))
+    if len(weeks) > MAX_RESYNC_WEEKS:
+        raise ValueError(f"At most {MAX_RESYNC_WEEKS} weeks per resync")
+    return sorted(weeks)
+
+
+def season_max_week():
+    """Last week of the schedule"""
+    from week_calendar import week_calendar
+
+    with app.app_context():
+        return week_calendar.max_week() or MAX_RESYNC_WEEKS
+
+
+def main():
+    """Command line entry point"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        weeks = parse_week_range(sys.argv[1:], season_max_week())
+    except ValueError as e:
+        print(e)
+        weeks = []
+    if not weeks:
+        print("Usage: python async_fetcher.py WEEK[-WEEK] [WEEK[-WEEK] ...]")
+        sys.exit(1)
+
+    summary = resync_weeks(weeks)
+    for week, diff in summary['weeks'].items():
+        print(f"Week {week}: {diff['updated']} matches updated, {diff['completed']} completed")
+        for change in diff['changes']:
+            print(f"  {change['matchup']}: {change['changes']}")
+    for week, error in summary['failed'].items():
+        print(f"Week {week}: failed ({error})")
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
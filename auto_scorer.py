@@ -4,15 +4,14 @@ NFL PickEm Auto Scorer
 Safely updates scores without interfering with existing functionality
 """
 
-import requests
-from bs4 import BeautifulSoup
-import re
-from datetime import datetime
 import logging
 import time
 import schedule
 import threading
-from app import app, db, Match, Pick, User, Team
+from app import app
+from result_writer import write_week_results
+from week_calendar import week_calendar
+from results_provider import get_results_provider
 
 # Configure logging
 logging.basicConfig(
@@ -27,54 +26,18 @@ logger = logging.getLogger(__name__)
 
 class SafeAutoScorer:
     def __init__(self):
-        self.base_url = "https://www.espn.com/nfl/schedule"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        self.current_week = 2  # Start with Week 2
+        self.provider = get_results_provider()
+        
+    @property
+    def current_week(self):
+        """Week to score, resolved from the schedule so a restart cannot reset it"""
+        with app.app_context():
+            return week_calendar.week_to_score() or 1
         
     def get_espn_results(self, week):
-        """Safely get NFL results from ESPN"""
+        """Safely get completed GameResults from ESPN (JSON scoreboard, HTML page as fallback)"""
         try:
-            url = f"{self.base_url}/_/week/{week}"
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Look for completed games with final scores
-            completed_games = []
-            game_elements = soup.find_all('a', href=re.compile(r'/nfl/game/'))
-            
-            for element in game_elements:
-                text = element.get_text(strip=True)
-                
-                # Match pattern: "TEAM1 XX, TEAM2 YY"
-                score_pattern = r'([A-Z]{2,4})\s+(\d+),\s+([A-Z]{2,4})\s+(\d+)'
-                match = re.search(score_pattern, text)
-                
-                if match:
-                    away_abbr = match.group(1)
-                    away_score = int(match.group(2))
-                    home_abbr = match.group(3)
-                    home_score = int(match.group(4))
-                    
-                    # Determine winner
-                    if home_score > away_score:
-                        winner_abbr = home_abbr
-                    elif away_score > home_score:
-                        winner_abbr = away_abbr
-                    else:
-                        winner_abbr = None  # Tie
-                    
-                    completed_games.append({
-                        'away_team_abbr': away_abbr,
-                        'home_team_abbr': home_abbr,
-                        'away_score': away_score,
-                        'home_score': home_score,
-                        'winner_abbr': winner_abbr
-                    })
+            completed_games = self.provider.completed_games(week)
             
             logger.info(f"Found {len(completed_games)} completed games for Week {week}")
             return completed_games
@@ -83,96 +46,30 @@ class SafeAutoScorer:
             logger.error(f"Error getting ESPN results: {e}")
             return []
     
-    def map_espn_to_team_name(self, espn_abbr):
-        """Map ESPN abbreviations to our team names"""
-        mapping = {
-            'ATL': 'Atlanta Falcons',
-            'TB': 'Tampa Bay Buccaneers',
-            'DEN': 'Denver Broncos',
-            'TEN': 'Tennessee Titans',
-            'CIN': 'Cincinnati Bengals',
-            'CLE': 'Cleveland Browns',
-            'WSH': 'Washington Commanders',
-            'NYG': 'New York Giants',
-            'KC': 'Kansas City Chiefs',
-            'LAC': 'Los Angeles Chargers',
-            'PHI': 'Philadelphia Eagles',
-            'DAL': 'Dallas Cowboys',
-            'BUF': 'Buffalo Bills',
-            'MIA': 'Miami Dolphins',
-            'NE': 'New England Patriots',
-            'NYJ': 'New York Jets',
-            'PIT': 'Pittsburgh Steelers',
-            'BAL': 'Baltimore Ravens',
-            'IND': 'Indianapolis Colts',
-            'HOU': 'Houston Texans',
-            'JAX': 'Jacksonville Jaguars',
-            'LV': 'Las Vegas Raiders',
-            'SF': 'San Francisco 49ers',
-            'SEA': 'Seattle Seahawks',
-            'LAR': 'Los Angeles Rams',
-            'ARI': 'Arizona Cardinals',
-            'NO': 'New Orleans Saints',
-            'CAR': 'Carolina Panthers',
-            'GB': 'Green Bay Packers',
-            'MIN': 'Minnesota Vikings',
-            'CHI': 'Chicago Bears',
-            'DET': 'Detroit Lions'
-        }
-        return mapping.get(espn_abbr, espn_abbr)
-    
     def update_week_results(self, week):
         """Safely update results for a specific week"""
         logger.info(f"Starting safe update for Week {week}")
         
         try:
             # Get ESPN results
-            espn_results = self.get_espn_results(week)
-            if not espn_results:
+            completed_games = self.provider.completed_games(week)
+            if not completed_games:
                 logger.warning(f"No ESPN results found for Week {week}")
                 return False
             
             # Check if we have enough games (NFL typically has 16 games per week)
-            if len(espn_results) < 14:  # Allow some flexibility
-                logger.info(f"Week {week} not complete yet ({len(espn_results)} games)")
+            if len(completed_games) < 14:  # Allow some flexibility
+                logger.info(f"Week {week} not complete yet ({len(completed_games)} games)")
                 return False
             
-            updated_count = 0
-            
             with app.app_context():
-                for game in espn_results:
-                    try:
-                        # Map team names
-                        away_team_name = self.map_espn_to_team_name(game['away_team_abbr'])
-                        home_team_name = self.map_espn_to_team_name(game['home_team_abbr'])
-                        winner_name = self.map_espn_to_team_name(game['winner_abbr']) if game['winner_abbr'] else None
-                        
-                        # Find the match in our database
-                        match = Match.query.filter_by(
-                            week=week,
-                            away_team_id=Team.query.filter_by(name=away_team_name).first().id if Team.query.filter_by(name=away_team_name).first() else None,
-                            home_team_id=Team.query.filter_by(name=home_team_name).first().id if Team.query.filter_by(name=home_team_name).first() else None
-                        ).first()
-                        
-                        if match and not match.is_completed:
-                            # Update match results
-                            if winner_name:
-                                winner_team = Team.query.filter_by(name=winner_name).first()
-                                if winner_team:
-                                    match.winner_team_id = winner_team.id
-                                    match.is_completed = True
-                                    
-                                    db.session.commit()
-                                    updated_count += 1
-                                    
-                                    logger.info(f"Updated: {away_team_name} @ {home_team_name} - Winner: {winner_name}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error updating match {game}: {e}")
-                        db.session.rollback()
+                diff = write_week_results(week, completed_games)
+            
+            for change in diff.changes:
+                logger.info(f"Updated: {change.matchup} - {change.after['away_score']}-{change.after['home_score']}")
             
-            logger.info(f"Successfully updated {updated_count} matches for Week {week}")
-            return updated_count > 0
+            logger.info(f"Successfully updated {diff.updated} matches for Week {week}")
+            return diff.updated > 0
             
         except Exception as e:
             logger.error(f"Error in update_week_results: {e}")
@@ -183,14 +80,14 @@ class SafeAutoScorer:
         logger.info("=== WEEKLY AUTO-SCORER JOB STARTED ===")
         
         try:
-            success = self.update_week_results(self.current_week)
+            week = self.current_week
+            success = self.update_week_results(week)
             
             if success:
-                logger.info(f"✅ Week {self.current_week} successfully updated!")
-                self.current_week += 1
-                logger.info(f"📅 Moving to Week {self.current_week} for next update")
+                logger.info(f"✅ Week {week} successfully updated!")
+                logger.info(f"📅 Next update: Week {self.current_week}")
             else:
-                logger.info(f"⏳ Week {self.current_week} not ready for update")
+                logger.info(f"⏳ Week {week} not ready for update")
                 
         except Exception as e:
             logger.error(f"❌ Error in weekly update job: {e}")
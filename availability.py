@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Team Availability
+Per-user team availability as 32-bit masks, kept in memory
+
+Each user's eliminated, used-once, used-twice and used-as-loser teams are
+held as one bit per team (see TeamRegistry.bit). Pick writes store the new
+masks straight from the rule engine's state, so /api/picks/availability is
+answered without touching the usage tables. Cached masks are tagged with the
+user's own picks version and the RESULTS version and reloaded once either
+moves, so writes made by another process are picked up on the next read
+while other users' picks leave them alone.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from data_version import PICKS, RESULTS, get_data_versions, user_scope
+from pick_rules import MAX_WINNER_USES, load_season_state
+from team_registry import team_registry
+
+# Seconds cached masks are trusted before they are reloaded (covers out-of-band edits)
+AVAILABILITY_CACHE_SECONDS = 300
+
+_cache_lock = threading.Lock()
+_cache = {}  # user_id: (TeamAvailability, cached_at, (user picks version, results version))
+
+
+class TeamAvailability(namedtuple('TeamAvailability', ['eliminated', 'used_once', 'used_twice', 'loser'])):
+    """Bitsets of a user's teams; a team's bit comes from the team registry"""
+    __slots__ = ()
+
+    @classmethod
+    def from_state(cls, state):
+        """Build the masks from a pick_rules.SeasonState"""
+        eliminated = used_once = used_twice = loser = 0
+        for team_id in state.eliminated:
+            eliminated |= team_registry.bit(team_id)
+        for team_id, (_, usage_count) in state.winner_usage.items():
+            if usage_count >= MAX_WINNER_USES:
+                used_twice |= team_registry.bit(team_id)
+            elif usage_count == 1:
+                used_once |= team_registry.bit(team_id)
+        for team_id, _ in state.loser_usage:
+            loser |= team_registry.bit(team_id)
+        return cls(eliminated, used_once, used_twice, loser)
+
+    def usage_count(self, team_id):
+        bit = team_registry.bit(team_id)
+        if self.used_twice & bit:
+            return 2
+        return 1 if self.used_once & bit else 0
+
+    def to_dict(self):
+        """Masks plus the decoded lists in the shapes of the team-usage, eliminated and loser-usage endpoints"""
+        team_usage = []
+        for team in team_registry.all():
+            usage_count = self.usage_count(team.id)
+            status = 'available'
+            if usage_count >= 2:
+                status = 'max_used'
+            elif usage_count == 1:
+                status = 'used_once'
+            team_usage.append({
+                'team': team.to_dict(),
+                'usage_count': usage_count,
+                'status': status
+            })
+
+        return {
+            'masks': {
+                'eliminated': self.eliminated,
+                'used_once': self.used_once,
+                'used_twice': self.used_twice,
+                'loser': self.loser
+            },
+            'team_usage': team_usage,
+            'eliminated_teams': [team.to_dict() for team in team_registry.teams_in(self.eliminated)],
+            'loser_teams': [team.to_dict() for team in team_registry.teams_in(self.loser)]
+        }
+
+
+def _data_versions(user_id):
+    picks_scope = user_scope(PICKS, user_id)
+    versions = get_data_versions([picks_scope, RESULTS])
+    return versions[picks_scope][0], versions[RESULTS][0]
+
+
+def get_availability(user_id):
+    """Return the cached TeamAvailability of a user, loading it once the data changed or it is stale"""
+    versions = _data_versions(user_id)
+    with _cache_lock:
+        cached = _cache.get(user_id)
+        if cached and cached[2] == versions and time.time() - cached[1] < AVAILABILITY_CACHE_SECONDS:
+            return cached[0]
+
+    availability = TeamAvailability.from_state(load_season_state(user_id))
+    with _cache_lock:
+        _cache[user_id] = (availability, time.time(), versions)
+    return availability
+
+
+def update_availability(user_id, state):
+    """Store the masks of a state that was just committed (call after pick writes)"""
+    availability = TeamAvailability.from_state(state)
+    # Read after the commit, so the tag includes this write's picks bump
+    versions = _data_versions(user_id)
+    with _cache_lock:
+        _cache[user_id] = (availability, time.time(), versions)
+    return availability
+
+
+def invalidate_availability(user_id=None):
+    """Drop the cached masks of one user, or of everyone"""
+    with _cache_lock:
+        if user_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(user_id, None)
@@ -0,0 +1,159 @@
+"""
+Deduplicated Backup Store for NFL PickEm App
+
+Snapshots are split into database pages. Each page is stored once under its
+SHA-256 hash, and a snapshot is a manifest listing the hashes of its pages,
+so a snapshot only costs the pages that changed since earlier ones:
+
+    db_backups/store/objects/ab/ab12...    zlib-compressed page
+    db_backups/store/snapshots/<id>.json.gz manifest
+"""
+
+import os
+import gzip
+import json
+import zlib
+import hashlib
+import logging
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 4096
+
+
+def read_page_size(path):
+    """Page size from the SQLite header (bytes 16-17, 1 means 65536)."""
+    with open(path, 'rb') as f:
+        header = f.read(100)
+    if len(header) < 100 or not header.startswith(b'SQLite format 3\0'):
+        return DEFAULT_PAGE_SIZE
+    page_size = int.from_bytes(header[16:18], 'big')
+    return 65536 if page_size == 1 else page_size
+
+
+def _write_atomic(path, data):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+class BackupStore:
+    """Content-addressed page store with one manifest per snapshot."""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.snapshots_dir = os.path.join(root, 'snapshots')
+
+    def _ensure_dirs(self):
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    def _object_path(self, page_hash):
+        return os.path.join(self.objects_dir, page_hash[:2], page_hash)
+
+    def _manifest_path(self, snapshot_id):
+        return os.path.join(self.snapshots_dir, f"{snapshot_id}.json.gz")
+
+    def _new_snapshot_id(self):
+        # Microsecond timestamps sort chronologically as plain strings
+        snapshot_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        while os.path.exists(self._manifest_path(snapshot_id)):
+            snapshot_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return snapshot_id
+
+    def put_snapshot(self, db_path, metadata=None):
+        """Store a database file as a new snapshot and return its manifest."""
+        self._ensure_dirs()
+        page_size = read_page_size(db_path)
+        pages = []
+        new_pages = 0
+
+        with open(db_path, 'rb') as f:
+            for page in iter(lambda: f.read(page_size), b''):
+                page_hash = hashlib.sha256(page).hexdigest()
+                pages.append(page_hash)
+                object_path = self._object_path(page_hash)
+                if not os.path.exists(object_path):
+                    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                    _write_atomic(object_path, zlib.compress(page))
+                    new_pages += 1
+
+        manifest = dict(metadata or {})
+        manifest.update({
+            'id': self._new_snapshot_id(),
+            'created_at': datetime.now().isoformat(),
+            'page_size': page_size,
+            'db_size': os.path.getsize(db_path),
+            'new_pages': new_pages,
+            'pages': pages
+        })
+        _write_atomic(self._manifest_path(manifest['id']), gzip.compress(json.dumps(manifest).encode('utf-8')))
+        logging.info(f"Stored snapshot {manifest['id']}: {len(pages)} pages, {new_pages} new")
+        return manifest
+
+    def list_snapshots(self):
+        """Snapshot ids, newest first."""
+        if not os.path.exists(self.snapshots_dir):
+            return []
+        ids = [f[:-len('.json.gz')] for f in os.listdir(self.snapshots_dir) if f.endswith('.json.gz')]
+        return sorted(ids, reverse=True)
+
+    def load_manifest(self, snapshot_id):
+        with open(self._manifest_path(snapshot_id), 'rb') as f:
+            return json.loads(gzip.decompress(f.read()).decode('utf-8'))
+
+    def latest_manifest(self):
+        """Manifest of the newest snapshot, or None."""
+        for snapshot_id in self.list_snapshots():
+            try:
+                return self.load_manifest(snapshot_id)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Unreadable snapshot manifest {snapshot_id}: {str(e)}")
+        return None
+
+    def restore_snapshot(self, snapshot_id, target_path):
+        """Rebuild a snapshot into target_path, checking every page against its hash."""
+        manifest = self.load_manifest(snapshot_id)
+        with open(target_path, 'wb') as out:
+            for page_hash in manifest['pages']:
+                with open(self._object_path(page_hash), 'rb') as f:
+                    page = zlib.decompress(f.read())
+                if hashlib.sha256(page).hexdigest() != page_hash:
+                    raise ValueError(f"Corrupt page {page_hash} in snapshot {snapshot_id}")
+                out.write(page)
+        return manifest
+
+    def prune(self, older_than):
+        """Delete snapshots created before a datetime and all pages no longer referenced.
+
+        The newest snapshot is always kept. Returns (snapshots removed, pages removed).
+        """
+        removed_snapshots = 0
+        referenced = set()
+        for index, snapshot_id in enumerate(self.list_snapshots()):
+            try:
+                manifest = self.load_manifest(snapshot_id)
+            except (OSError, ValueError):
+                # Unreadable manifests reference nothing we could restore anyway
+                os.remove(self._manifest_path(snapshot_id))
+                removed_snapshots += 1
+                continue
+            if index > 0 and datetime.fromisoformat(manifest['created_at']) < older_than:
+                os.remove(self._manifest_path(snapshot_id))
+                removed_snapshots += 1
+            else:
+                referenced.update(manifest['pages'])
+
+        removed_pages = 0
+        if os.path.exists(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for page_hash in os.listdir(prefix_dir):
+                    if page_hash not in referenced:
+                        os.remove(os.path.join(prefix_dir, page_hash))
+                        removed_pages += 1
+
+        if removed_snapshots:
+            logging.info(f"Pruned {removed_snapshots} snapshots and {removed_pages} unreferenced pages")
+        return removed_snapshots, removed_pages
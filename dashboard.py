@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Dashboard
+Everything the dashboard shows for one user, in one payload
+
+Replaces the current-week, score, rank, recent-picks and eliminated-teams
+requests. Scores and the rank come from the same leaderboard snapshot,
+eliminated teams from the user's cached availability masks, and recent
+picks from one query, so the page renders after a single round trip.
+"""
+
+from app import db, Match, Pick
+from availability import get_availability
+from leaderboard import get_leaderboard_snapshot, invalidate_leaderboard
+from team_registry import team_registry
+
+
+def recent_picks(user_id, current_week):
+    """Picks of the current and earlier weeks, newest week first (/api/picks/recent shape)"""
+    rows = db.session.query(
+        Match.week, Pick.chosen_team_id, Match.is_completed, Match.winner_team_id
+    ).join(Match, Pick.match_id == Match.id).filter(
+        Pick.user_id == user_id,
+        Match.week <= current_week,
+        Match.week >= 1
+    ).order_by(Match.week.desc(), Pick.id).all()
+
+    picks = []
+    for week, chosen_team_id, is_completed, winner_team_id in rows:
+        chosen_team = team_registry.get(chosen_team_id)
+        picks.append({
+            'week': week,
+            'team': chosen_team.name,
+            'team_logo': chosen_team.logo_url,
+            'is_completed': is_completed,
+            'is_correct': bool(is_completed) and chosen_team_id == winner_team_id
+        })
+    return picks
+
+
+def build_dashboard(user_id, current_week):
+    """Dashboard payload of a user, or None if the user does not exist"""
+    snapshot = get_leaderboard_snapshot()
+    user = snapshot.get(user_id)
+    if not user:
+        # Users created since the snapshot was taken are not in it yet
+        invalidate_leaderboard()
+        snapshot = get_leaderboard_snapshot()
+        user = snapshot.get(user_id)
+    if not user:
+        return None
+
+    availability = get_availability(user_id)
+    return {
+        'current_week': current_week,
+        'user': {
+            'id': user['id'],
+            'username': user['username'],
+            'score': user['score'],
+            'rank': user['rank']
+        },
+        'opponents': [
+            {
+                'id': other['id'],
+                'username': other['username'],
+                'score': other['score']
+            }
+            for other in snapshot.by_user_id()
+            if other['id'] != user_id
+        ],
+        'recent_picks': recent_picks(user_id, current_week) if current_week else [],
+        'eliminated_teams': [team.to_dict() for team in team_registry.teams_in(availability.eliminated)]
+    }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Data Versions
+Change counters that drive ETag / Last-Modified on the read endpoints
+
+Pick writes bump the 'picks' scope and the user's own 'picks:<user_id>'
+scope, match result writes bump the 'results' scope, in the same
+transaction as the change itself. Read
+endpoints derive their ETag from the versions they depend on and answer
+a matching If-None-Match / If-Modified-Since with 304 Not Modified
+without building the JSON body.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from flask import jsonify, request
+from sqlalchemy.dialects import postgresql, sqlite
+from werkzeug.http import is_resource_modified
+from app import app, db, DataVersion
+
+PICKS = 'picks'
+RESULTS = 'results'
+
+# Browsers may keep the body but have to revalidate it on every use
+CACHE_CONTROL = 'private, no-cache'
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def user_scope(scope, user_id):
+    """Per-user counterpart of a scope, e.g. 'picks:42'"""
+    return f"{scope}:{user_id}"
+
+
+def bump_data_version(scope, modified_at=None):
+    """Increment the version of a scope (the caller commits the session).
+
+    A single INSERT ... ON CONFLICT DO UPDATE, so processes creating the
+    first row of a scope at the same time cannot collide.
+    """
+    modified_at = modified_at or datetime.utcnow()
+    insert = _UPSERT_INSERTS[db.engine.dialect.name]
+    db.session.execute(
+        insert(DataVersion)
+        .values(scope=scope, version=1, updated_at=modified_at)
+        .on_conflict_do_update(
+            index_elements=[DataVersion.scope],
+            set_={'version': DataVersion.version + 1, 'updated_at': modified_at}
+        )
+    )
+
+
+def get_data_versions(scopes):
+    """Return {scope: (version, updated_at)} for the given scopes in one query"""
+    rows = db.session.query(DataVersion.scope, DataVersion.version, DataVersion.updated_at).filter(
+        DataVersion.scope.in_(scopes)
+    ).all()
+    versions = {scope: (0, None) for scope in scopes}
+    for scope, version, updated_at in rows:
+        versions[scope] = (version, updated_at)
+    return versions
+
+
+def _as_utc(value):
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def conditional_json(build_payload, scopes, as_of=None, variant=None):
+    """Serve build_payload() as JSON unless the client's copy is still current.
+
+    `scopes` are the data versions the payload depends on. `as_of` is an
+    optional naive UTC timestamp for time-dependent output (e.g. the latest
+    kickoff that has passed) and is folded into both validators. `variant`
+    is any other value the payload depends on (e.g. the current week) and
+    only changes the ETag.
+    """
+    versions = get_data_versions(scopes)
+
+    tag_source = '|'.join(
+        [request.full_path] +
+        [f"{scope}={versions[scope][0]}" for scope in sorted(scopes)] +
+        [as_of.isoformat() if as_of else ''] +
+        [str(variant) if variant is not None else '']
+    )
+    etag = hashlib.sha1(tag_source.encode('utf-8')).hexdigest()
+
+    timestamps = [updated_at for _, updated_at in versions.values() if updated_at]
+    if as_of:
+        timestamps.append(as_of)
+    last_modified = _as_utc(max(timestamps)) if timestamps else None
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(build_payload())
+
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Database Bootstrap
+SQLite connection settings shared by the web app, scheduler and scorers
+
+Every connection is switched to WAL mode so readers never block on a writer
+(and vice versa), and waits for a lock instead of failing immediately with
+'database is locked'. All settings can be overridden with environment
+variables:
+
+    PICKEM_DATABASE_URI        SQLAlchemy URI (default sqlite:///nfl_pickem.db)
+    PICKEM_SQLITE_JOURNAL_MODE journal mode (default WAL)
+    PICKEM_SQLITE_SYNCHRONOUS  synchronous level (default NORMAL)
+    PICKEM_SQLITE_CACHE_KB     page cache size in KiB (default 16384)
+    PICKEM_SQLITE_MMAP_MB      memory-mapped I/O size in MiB (default 64)
+    PICKEM_SQLITE_BUSY_MS      busy timeout in milliseconds (default 15000)
+    PICKEM_DB_POOL_SIZE        pooled connections (default 10)
+    PICKEM_DB_MAX_OVERFLOW     extra connections under load (default 20)
+    PICKEM_DB_POOL_TIMEOUT     seconds to wait for a pooled connection (default 30)
+"""
+
+import os
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine import Engine
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+
+DATABASE_URI = os.environ.get('PICKEM_DATABASE_URI', 'sqlite:///nfl_pickem.db')
+JOURNAL_MODE = os.environ.get('PICKEM_SQLITE_JOURNAL_MODE', 'WAL').upper()
+SYNCHRONOUS = os.environ.get('PICKEM_SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+CACHE_KB = _env_int('PICKEM_SQLITE_CACHE_KB', 16384)
+MMAP_MB = _env_int('PICKEM_SQLITE_MMAP_MB', 64)
+BUSY_TIMEOUT_MS = _env_int('PICKEM_SQLITE_BUSY_MS', 15000)
+POOL_SIZE = _env_int('PICKEM_DB_POOL_SIZE', 10)
+MAX_OVERFLOW = _env_int('PICKEM_DB_MAX_OVERFLOW', 20)
+POOL_TIMEOUT = _env_int('PICKEM_DB_POOL_TIMEOUT', 30)
+
+
+def apply_sqlite_pragmas(connection):
+    """Apply the journal, sync, cache and lock settings to a sqlite3 connection"""
+    cursor = connection.cursor()
+    cursor.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    cursor.execute(f'PRAGMA journal_mode = {JOURNAL_MODE}')
+    cursor.execute(f'PRAGMA synchronous = {SYNCHRONOUS}')
+    # Negative cache_size is in KiB rather than pages
+    cursor.execute(f'PRAGMA cache_size = -{CACHE_KB}')
+    cursor.execute(f'PRAGMA mmap_size = {MMAP_MB * 1024 * 1024}')
+    cursor.close()
+
+
+def connect_sqlite(path, **kwargs):
+    """Open a plain sqlite3 connection with the shared settings (for scripts and backups)"""
+    connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, **kwargs)
+    apply_sqlite_pragmas(connection)
+    return connection
+
+
+@event.listens_for(Engine, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        apply_sqlite_pragmas(dbapi_connection)
+
+
+def sqlite_database_path(url, instance_path='instance'):
+    """File of a SQLite database URL, or None for other backends and in-memory databases.
+
+    Relative paths live in the instance folder, as with Flask-SQLAlchemy.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    if os.path.isabs(url.database):
+        return url.database
+    return os.path.join(instance_path, url.database)
+
+
+# File behind PICKEM_DATABASE_URI for scripts that open it directly
+# (migrations, backups); None unless it is a SQLite file
+DATABASE_PATH = sqlite_database_path(DATABASE_URI)
+
+
+def configure_database(app):
+    """Set the database URI and engine options on a Flask app before SQLAlchemy(app)"""
+    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
+    if DATABASE_URI.startswith('sqlite') and ':memory:' not in DATABASE_URI:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': POOL_SIZE,
+            'max_overflow': MAX_OVERFLOW,
+            'pool_timeout': POOL_TIMEOUT,
+            'connect_args': {
+                'timeout': BUSY_TIMEOUT_MS / 1000,
+                # Pooled connections are handed to whichever request thread needs one
+                'check_same_thread': False
+            }
+        }
@@ -3,15 +3,27 @@ Database Backup Module for NFL PickEm App
 
 This module provides functions to backup and restore the SQLite database,
 ensuring data persistence even when the server restarts.
+
+Snapshots go into a deduplicated page store (see backup_store.py), so every
+5-minute snapshot of a season can be kept and restored. Each manifest
+records the database file it was taken of; the unchanged check, listing and
+restore only look at snapshots of the configured database:
+
+    python db_backup.py                 # run the backup service
+    python db_backup.py list            # list snapshots, newest first
+    python db_backup.py restore [id]    # restore the newest valid (or a given) snapshot
 """
 
 import os
 import sqlite3
 import shutil
+import hashlib
 import json
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
+from database import DATABASE_PATH, connect_sqlite
+from backup_store import BackupStore
 
 # Configure logging
 logging.basicConfig(
@@ -21,10 +33,24 @@ logging.basicConfig(
 )
 
 # Constants
-DB_PATH = 'instance/nfl_pickem.db'
+DB_PATH = DATABASE_PATH  # None when PICKEM_DATABASE_URI is not a SQLite file
 BACKUP_DIR = 'db_backups'
 BACKUP_INTERVAL = 300  # 5 minutes in seconds
-BACKUP_COUNT = 5  # Keep 5 recent backups
+BACKUP_COUNT = 5  # Full-copy backups from before the page store to keep
+BACKUP_RETENTION_DAYS = 200  # Keep a whole season of snapshots
+PRUNE_INTERVAL = 24 * 3600  # Seconds between snapshot retention passes
+BACKUP_PAGES_PER_STEP = 64  # Pages copied per step of the online backup
+BACKUP_STEP_SLEEP = 0.01  # Seconds to yield to writers between steps
+METRICS_PATH = os.path.join(BACKUP_DIR, 'backup_metrics.json')
+STORE_DIR = os.path.join(BACKUP_DIR, 'store')
+
+# Snapshots (and the full copies before them) taken before manifests
+# recorded their source database were of the default file
+LEGACY_SOURCE = os.path.abspath('instance/nfl_pickem.db')
+
+# Deduplicated page store holding one manifest per snapshot
+backup_store = BackupStore(STORE_DIR)
+_last_prune = 0.0
 
 def ensure_backup_dir():
     """Ensure the backup directory exists."""
@@ -32,33 +58,110 @@ def ensure_backup_dir():
         os.makedirs(BACKUP_DIR)
         logging.info(f"Created backup directory: {BACKUP_DIR}")
 
+def online_backup(source_path, target_path):
+    """Copy a live database page by page with the sqlite3 backup API.
+    
+    Each step copies BACKUP_PAGES_PER_STEP pages and then sleeps, so the
+    app's writers are never locked out for the whole copy. Writes made by
+    other connections during the backup make SQLite restart it, so the
+    result is always a consistent snapshot.
+    """
+    source = connect_sqlite(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(
+            target,
+            pages=BACKUP_PAGES_PER_STEP,
+            progress=lambda status, remaining, total: time.sleep(BACKUP_STEP_SLEEP)
+        )
+        # Backups are single files: don't carry the WAL flag over from the live database
+        target.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        target.close()
+        source.close()
+
+def verify_backup(path):
+    """Return True if the file is a readable SQLite database that passes integrity_check."""
+    try:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            result = conn.execute('PRAGMA integrity_check').fetchone()
+            tables = conn.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+        finally:
+            conn.close()
+        return result is not None and result[0] == 'ok' and tables > 0
+    except sqlite3.Error as e:
+        logging.warning(f"Backup {path} failed verification: {str(e)}")
+        return False
+
+def content_hash(path):
+    """SHA-256 of a database file, ignoring header fields that change without data changes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        header = bytearray(f.read(100))
+        # File change counter (24-27) and version-valid-for / SQLite version (92-99)
+        header[24:28] = b'\0' * 4
+        header[92:100] = b'\0' * 8
+        digest.update(header)
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def record_backup_decision(decision, reason):
+    """Count taken/skipped/failed backups in the metrics file."""
+    try:
+        ensure_backup_dir()
+        metrics = {}
+        if os.path.exists(METRICS_PATH):
+            with open(METRICS_PATH) as f:
+                metrics = json.load(f)
+        metrics[decision] = metrics.get(decision, 0) + 1
+        metrics['last_decision'] = decision
+        metrics['last_reason'] = reason
+        metrics['last_checked_at'] = datetime.now().isoformat()
+        if decision == 'taken':
+            metrics['last_taken_at'] = metrics['last_checked_at']
+        with open(METRICS_PATH, 'w') as f:
+            json.dump(metrics, f)
+    except Exception as e:
+        logging.error(f"Could not record backup metrics: {str(e)}")
+    logging.info(f"Backup {decision}: {reason}")
+
 def create_backup():
-    """Create a backup of the SQLite database."""
+    """Create a backup snapshot of the SQLite database unless nothing changed since the last one."""
     try:
         ensure_backup_dir()
         
         # Check if database exists
-        if not os.path.exists(DB_PATH):
+        if not DB_PATH or not os.path.exists(DB_PATH):
             logging.warning(f"Database not found at {DB_PATH}, skipping backup")
             return False
         
-        # Create timestamp for backup filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_path = os.path.join(BACKUP_DIR, f'nfl_pickem_{timestamp}.db')
-        
-        # Copy the database file
-        shutil.copy2(DB_PATH, backup_path)
-        logging.info(f"Database backup created: {backup_path}")
+        # Copy into a temporary file and only store it once it verifies
+        temp_path = os.path.join(BACKUP_DIR, 'snapshot.db.tmp')
+        online_backup(DB_PATH, temp_path)
+        if not verify_backup(temp_path):
+            os.remove(temp_path)
+            logging.error("Backup failed integrity check, discarded")
+            record_backup_decision('failed', 'integrity check failed')
+            return False
         
-        # Create metadata file with timestamp
-        metadata = {
-            'timestamp': timestamp,
-            'created_at': datetime.now().isoformat(),
-            'db_size': os.path.getsize(backup_path)
-        }
+        # Skip the backup if the content matches the newest snapshot of this database
+        backup_hash = content_hash(temp_path)
+        latest = next((manifest for _, manifest in database_snapshots()), None)
+        if latest and latest.get('content_hash') == backup_hash:
+            os.remove(temp_path)
+            record_backup_decision('skipped', f"content unchanged since snapshot {latest['id']}")
+            return True
         
-        with open(f"{backup_path}.meta", 'w') as f:
-            json.dump(metadata, f)
+        # Only pages that no earlier snapshot contains are written
+        manifest = backup_store.put_snapshot(temp_path, {
+            'integrity': 'ok',
+            'content_hash': backup_hash,
+            'source': database_source()
+        })
+        os.remove(temp_path)
+        record_backup_decision('taken', f"snapshot {manifest['id']} ({manifest['new_pages']} new pages)")
         
         # Clean up old backups
         cleanup_old_backups()
@@ -66,71 +169,129 @@ def create_backup():
         return True
     except Exception as e:
         logging.error(f"Backup failed: {str(e)}")
+        record_backup_decision('failed', str(e))
         return False
 
-def cleanup_old_backups():
-    """Keep only the most recent backups."""
+def cleanup_old_backups(force=False):
+    """Drop snapshots past the retention period and old full-copy backups."""
+    global _last_prune
     try:
         ensure_backup_dir()
         
-        # Get all backup files
-        backups = [f for f in os.listdir(BACKUP_DIR) if f.endswith('.db')]
-        
-        # Sort by creation time (newest first)
-        backups.sort(key=lambda x: os.path.getctime(os.path.join(BACKUP_DIR, x)), reverse=True)
+        # Pruning reads every manifest, so it runs at most once per PRUNE_INTERVAL
+        if force or time.time() - _last_prune >= PRUNE_INTERVAL:
+            backup_store.prune(datetime.now() - timedelta(days=BACKUP_RETENTION_DAYS))
+            _last_prune = time.time()
         
-        # Remove old backups
+        # Full copies from before the page store
+        backups = list_backups()
         if len(backups) > BACKUP_COUNT:
-            for old_backup in backups[BACKUP_COUNT:]:
-                old_path = os.path.join(BACKUP_DIR, old_backup)
+            for old_path in backups[BACKUP_COUNT:]:
                 os.remove(old_path)
                 # Also remove metadata file if it exists
                 meta_path = f"{old_path}.meta"
                 if os.path.exists(meta_path):
                     os.remove(meta_path)
-                logging.info(f"Removed old backup: {old_backup}")
+                logging.info(f"Removed old backup: {os.path.basename(old_path)}")
     except Exception as e:
         logging.error(f"Cleanup failed: {str(e)}")
 
+def list_backups():
+    """Get the paths of all full-copy backup files, newest first."""
+    ensure_backup_dir()
+    backups = [f for f in os.listdir(BACKUP_DIR) if f.endswith('.db')]
+    
+    # Sort by creation time (newest first)
+    backups.sort(key=lambda x: os.path.getctime(os.path.join(BACKUP_DIR, x)), reverse=True)
+    return [os.path.join(BACKUP_DIR, backup) for backup in backups]
+
 def get_latest_backup():
-    """Get the path to the latest backup file."""
+    """Get the path to the newest full-copy backup file that passes verification."""
     try:
-        ensure_backup_dir()
-        
-        # Get all backup files
-        backups = [f for f in os.listdir(BACKUP_DIR) if f.endswith('.db')]
+        backups = list_backups()
         
         if not backups:
-            logging.warning("No backups found")
             return None
         
-        # Sort by creation time (newest first)
-        backups.sort(key=lambda x: os.path.getctime(os.path.join(BACKUP_DIR, x)), reverse=True)
+        for backup_path in backups:
+            if verify_backup(backup_path):
+                return backup_path
+            logging.warning(f"Skipping backup that failed verification: {backup_path}")
         
-        # Return the newest backup
-        return os.path.join(BACKUP_DIR, backups[0])
+        return None
     except Exception as e:
         logging.error(f"Failed to get latest backup: {str(e)}")
         return None
 
-def restore_from_backup():
-    """Restore the database from the latest backup."""
+def database_source():
+    """Absolute path of the configured database, as recorded in snapshot manifests."""
+    return os.path.abspath(DB_PATH)
+
+def database_snapshots():
+    """Yield (id, manifest) of the configured database's snapshots, newest first."""
+    source = database_source()
+    for snapshot_id in backup_store.list_snapshots():
+        try:
+            manifest = backup_store.load_manifest(snapshot_id)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Unreadable snapshot manifest {snapshot_id}: {str(e)}")
+            continue
+        if manifest.get('source', LEGACY_SOURCE) == source:
+            yield snapshot_id, manifest
+
+def restore_snapshot(snapshot_id, target_path):
+    """Rebuild a snapshot into target_path; returns True if the result verifies."""
+    try:
+        backup_store.restore_snapshot(snapshot_id, target_path)
+    except Exception as e:
+        logging.warning(f"Could not rebuild snapshot {snapshot_id}: {str(e)}")
+        return False
+    return verify_backup(target_path)
+
+def restore_from_backup(snapshot_id=None):
+    """Restore the database from the newest valid snapshot (or a given one)."""
     try:
+        if not DB_PATH:
+            logging.warning("The configured database is not a SQLite file, nothing to restore")
+            return False
+        
         # Check if database directory exists
-        if not os.path.exists('instance'):
-            os.makedirs('instance')
-            logging.info("Created instance directory")
+        db_dir = os.path.dirname(DB_PATH)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+            logging.info(f"Created database directory {db_dir}")
         
-        # Get the latest backup
-        latest_backup = get_latest_backup()
+        # Rebuild next to the database and swap it in atomically
+        temp_path = f"{DB_PATH}.restore"
+        candidates = [snapshot_id] if snapshot_id else [candidate for candidate, _ in database_snapshots()]
         
-        if not latest_backup:
+        restored_from = None
+        for candidate in candidates:
+            if restore_snapshot(candidate, temp_path):
+                restored_from = f"snapshot {candidate}"
+                break
+            logging.warning(f"Skipping snapshot that failed verification: {candidate}")
+        
+        # Fall back to full copies from before the page store (all of the default file)
+        if not restored_from and not snapshot_id and database_source() == LEGACY_SOURCE:
+            latest_backup = get_latest_backup()
+            if latest_backup:
+                shutil.copy2(latest_backup, temp_path)
+                restored_from = latest_backup
+        
+        if not restored_from:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
             logging.warning("No backup found to restore from")
             return False
         
-        # Copy the backup to the database location
-        shutil.copy2(latest_backup, DB_PATH)
-        logging.info(f"Database restored from backup: {latest_backup}")
+        # A leftover WAL from the lost database would be replayed onto the backup
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(DB_PATH + suffix):
+                os.remove(DB_PATH + suffix)
+        
+        os.replace(temp_path, DB_PATH)
+        logging.info(f"Database restored from {restored_from}")
         
         return True
     except Exception as e:
@@ -139,7 +300,7 @@ def restore_from_backup():
 
 def check_db_exists():
     """Check if the database exists and is valid."""
-    if not os.path.exists(DB_PATH):
+    if not DB_PATH or not os.path.exists(DB_PATH):
         return False
     
     try:
@@ -154,18 +315,44 @@ def run_backup_service():
     """Run the backup service in a loop."""
     logging.info("Starting database backup service")
     
+    # PRAGMA data_version on a long-lived connection changes whenever another
+    # connection commits, so unchanged intervals are skipped without a copy
+    monitor = None
+    backed_up_version = None
+    
     while True:
         try:
             # Check if database exists and create backup
             if check_db_exists():
-                create_backup()
+                if monitor is None:
+                    monitor = connect_sqlite(DB_PATH, check_same_thread=False)
+                data_version = monitor.execute('PRAGMA data_version').fetchone()[0]
+                
+                if data_version == backed_up_version:
+                    record_backup_decision('skipped', 'no commits since the last backup')
+                elif create_backup():
+                    backed_up_version = data_version
             
             # Sleep for the backup interval
             time.sleep(BACKUP_INTERVAL)
         except Exception as e:
             logging.error(f"Backup service error: {str(e)}")
+            if monitor is not None:
+                monitor.close()
+                monitor = None
+            backed_up_version = None
             time.sleep(60)  # Sleep for a minute on error
 
 if __name__ == "__main__":
-    run_backup_service()
+    import sys
+    command = sys.argv[1] if len(sys.argv) > 1 else 'service'
+    if command == 'list':
+        for snapshot_id, _ in database_snapshots():
+            print(snapshot_id)
+    elif command == 'restore':
+        restored = restore_from_backup(sys.argv[2] if len(sys.argv) > 2 else None)
+        print("Restore succeeded" if restored else "Restore failed")
+        sys.exit(0 if restored else 1)
+    else:
+        run_backup_service()
 
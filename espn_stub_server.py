@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm ESPN Stand-in Server
+Serves recorded ESPN scoreboard fixtures for local testing
+
+    python espn_stub_server.py serve [--port 8765] [--latency 0.5]
+    python espn_stub_server.py record WEEK [WEEK ...]
+    python espn_stub_server.py export WEEK [WEEK ...]
+
+serve answers the scoreboard API path with fixtures/espn/scoreboard_week_<N>.json
+and renders the same games as a minimal schedule page for the HTML provider.
+record saves the live ESPN responses as fixtures; export builds fixtures from
+the matches in the local database when ESPN is not reachable. Point the
+results providers at the stand-in with
+
+    PICKEM_ESPN_SCOREBOARD_URL=http://127.0.0.1:8765/apis/site/v2/sports/football/nfl/scoreboard
+    PICKEM_ESPN_SCHEDULE_URL=http://127.0.0.1:8765/nfl/schedule
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from email.utils import formatdate
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'espn')
+SCOREBOARD_PATH = '/apis/site/v2/sports/football/nfl/scoreboard'
+SCHEDULE_PATH = re.compile(r'^/nfl/schedule/_/week/(\d+)$')
+DEFAULT_PORT = 8765
+
+
+def fixture_path(week):
+    return os.path.join(FIXTURE_DIR, f"scoreboard_week_{week}.json")
+
+
+def load_fixture(week):
+    """Raw fixture bytes of a week, or None if none was recorded"""
+    try:
+        with open(fixture_path(week), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def fixture_modified(week):
+    return formatdate(os.path.getmtime(fixture_path(week)), usegmt=True)
+
+
+def render_schedule_page(document):
+    """Schedule page with one "AWY 21, HOM 17" game anchor per completed event"""
+    rows = []
+    for event in document.get('events', []):
+        competition = event['competitions'][0]
+        teams = {c['homeAway']: c for c in competition['competitors']}
+        if not event['status']['type'].get('completed'):
+            continue
+        away, home = teams['away'], teams['home']
+        text = f"{away['team']['abbreviation']} {away['score']}, {home['team']['abbreviation']} {home['score']}"
+        rows.append(f'<tr><td><a href="/nfl/game/_/gameId/{escape(event["id"])}">{escape(text)}</a></td></tr>')
+    return f"<html><body><table>{''.join(rows)}</table></body></html>".encode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0  # seconds added to every response, to mimic a remote server
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        if url.path == SCOREBOARD_PATH:
+            week = parse_qs(url.query).get('week', ['1'])[0]
+            body = load_fixture(week) if week.isdigit() else None
+            return self._send(body, 'application/json', week)
+
+        match = SCHEDULE_PATH.match(url.path)
+        if match:
+            body = load_fixture(match.group(1))
+            if body is not None:
+                body = render_schedule_page(json.loads(body))
+            return self._send(body, 'text/html; charset=utf-8', match.group(1))
+
+        self._send(None, 'text/plain')
+
+    def _send(self, body, content_type, week=None):
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        # Validators like ESPN's CDN, so conditional requests can be tested
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', fixture_modified(week))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"espn stub: {format % args}")
+
+
+def serve(port, latency=0.0):
+    StubHandler.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    print(f"ESPN stand-in listening on http://127.0.0.1:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _write_fixture(week, body):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with open(fixture_path(week), 'wb') as f:
+        f.write(body)
+    print(f"Wrote {fixture_path(week)} ({len(body)} bytes)")
+
+
+def record(weeks):
+    """Save the live ESPN scoreboard responses of the given weeks"""
+    import requests
+    from results_provider import ScoreboardJSONProvider
+
+    provider = ScoreboardJSONProvider(requests.Session())
+    for week in weeks:
+        response = provider.session.get(provider.week_url(week), timeout=30)
+        response.raise_for_status()
+        _write_fixture(week, response.content)
+
+
+def export(weeks):
+    """Build scoreboard fixtures from the matches in the local database"""
+    from app import app, Match
+    from team_registry import ESPN_TEAM_NAMES
+
+    espn_abbr = {name: abbr for abbr, name in ESPN_TEAM_NAMES.items()}
+    with app.app_context():
+        for week in weeks:
+            events = []
+            for match in Match.query.filter_by(week=week).order_by(Match.start_time, Match.id).all():
+                state = 'post' if match.is_completed else ('in' if match.status == 'in_progress' else 'pre')
+                competitors = []
+                for home_away, team, score in (
+                    ('home', match.home_team, match.home_score),
+                    ('away', match.away_team, match.away_score)
+                ):
+                    competitors.append({
+                        'id': str(team.id),
+                        'homeAway': home_away,
+                        'winner': bool(match.is_completed) and match.winner_team_id == team.id,
+                        'team': {
+                            'id': str(team.id),
+                            'abbreviation': espn_abbr.get(team.name, team.abbreviation),
+                            'displayName': team.name,
+                            'logo': team.logo_url
+                        },
+                        'score': str(score if score is not None and state != 'pre' else 0)
+                    })
+                events.append({
+                    'id': str(match.id),
+                    'date': match.start_time.strftime('%Y-%m-%dT%H:%MZ'),
+                    'name': f"{match.away_team.name} at {match.home_team.name}",
+                    'week': {'number': week},
+                    'competitions': [{'id': str(match.id), 'competitors': competitors}],
+                    'status': {'type': {'state': state, 'completed': state == 'post'}}
+                })
+            document = {'week': {'number': week}, 'events': events}
+            _write_fixture(week, json.dumps(document, indent=1).encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ESPN stand-in server and fixture recorder')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='serve the recorded fixtures')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    for name, help_text in (('record', 'record live ESPN responses'), ('export', 'build fixtures from the database')):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('weeks', type=int, nargs='+')
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args.port, args.latency)
+    elif args.command == 'record':
+        record(args.weeks)
+    else:
+        export(args.weeks)
+
+
+if __name__ == '__main__':
+    main()
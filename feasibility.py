@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Survivor Path Feasibility
+Checks whether a user can still make a legal pick in every remaining week
+
+The pick rules interact across weeks: a team picked as loser is eliminated
+as a winner afterwards, winners can be used twice, and every loser only
+once. The solver walks the open weeks in order (depth-first) and prunes
+with two bipartite matchings: the open weeks must be matchable to distinct
+unused losers and to winners with remaining capacity, and usage states
+already proven dead are remembered. Realistic seasons resolve in a few
+milliseconds; contrived schedules stop at a node and time budget and are
+reported as undecided instead of stalling a request.
+"""
+
+from collections import namedtuple
+import time
+from datetime import datetime
+from app import db, Match
+from pick_rules import MAX_WINNER_USES, load_season_state
+from team_registry import team_registry
+
+# Search nodes explored before giving up with an undecided result
+SOLVER_NODE_LIMIT = 20000
+SOLVER_TIME_LIMIT = 0.25  # seconds
+
+PathStep = namedtuple('PathStep', ['week', 'match_id', 'team_id', 'opponent_id'])
+
+
+class FeasibilityResult:
+    """Outcome of a feasibility check; feasible is None when the search budget ran out"""
+
+    def __init__(self, feasible, path, open_weeks, missed_weeks, reason=None):
+        self.feasible = feasible
+        self.path = path
+        self.open_weeks = open_weeks
+        self.missed_weeks = missed_weeks
+        self.reason = reason
+
+    def to_dict(self):
+        path = []
+        for step in self.path or []:
+            team = team_registry.get(step.team_id)
+            opponent = team_registry.get(step.opponent_id)
+            path.append({
+                'week': step.week,
+                'match_id': step.match_id,
+                'team_id': step.team_id,
+                'team': team.name if team else None,
+                'opponent_id': step.opponent_id,
+                'opponent': opponent.name if opponent else None
+            })
+        return {
+            'feasible': self.feasible,
+            'open_weeks': self.open_weeks,
+            'missed_weeks': self.missed_weeks,
+            'path': path,
+            'reason': self.reason
+        }
+
+
+def _has_matching(weeks, candidates, capacity=None):
+    """True if every week can be assigned a distinct candidate (Kuhn's augmenting paths).
+
+    candidates: {week: iterable of team ids}; capacity: {team_id: slots} (default 1)
+    """
+    assigned = {}  # team_id: [weeks]
+
+    def augment(week, seen):
+        for team_id in candidates[week]:
+            if team_id in seen:
+                continue
+            seen.add(team_id)
+            holders = assigned.setdefault(team_id, [])
+            if len(holders) < (capacity.get(team_id, 0) if capacity else 1):
+                holders.append(week)
+                return True
+            for index, holder in enumerate(holders):
+                if augment(holder, seen):
+                    holders[index] = week
+                    return True
+        return False
+
+    return all(augment(week, set()) for week in weeks)
+
+
+class _Search:
+    """Depth-first search over the open weeks with matching-based pruning"""
+
+    def __init__(self, options_by_week, winner_counts, loser_used, eliminated):
+        self.options_by_week = options_by_week  # week: [(match_id, winner, loser)]
+        self.winner_counts = dict(winner_counts)
+        self.loser_used = set(loser_used)
+        self.eliminated = set(eliminated)
+        self.nodes = 0
+        self.deadline = time.monotonic() + SOLVER_TIME_LIMIT
+        # Usage states already shown to have no completion, per number of weeks left
+        self.dead_ends = set()
+
+    def _valid(self, winner, loser):
+        return (winner not in self.eliminated
+                and self.winner_counts.get(winner, 0) < MAX_WINNER_USES
+                and loser not in self.loser_used)
+
+    def _bounded(self, weeks):
+        """Necessary condition: distinct losers and winners within capacity for all weeks"""
+        losers = {}
+        winners = {}
+        capacity = {}
+        for week in weeks:
+            valid = [(winner, loser) for _, winner, loser in self.options_by_week[week] if self._valid(winner, loser)]
+            if not valid:
+                return False
+            losers[week] = {loser for _, loser in valid}
+            winners[week] = {winner for winner, _ in valid}
+            for winner in winners[week]:
+                capacity[winner] = MAX_WINNER_USES - self.winner_counts.get(winner, 0)
+        return _has_matching(weeks, losers) and _has_matching(weeks, winners, capacity)
+
+    def _ordered_options(self, week, rest):
+        """Valid options of a week, least constraining first.
+
+        Prefer losers that could not be picked as winners later anyway, and
+        winners that are rarely available as losers in the remaining weeks.
+        """
+        future_winner = {}
+        future_loser = {}
+        for later in rest:
+            for _, winner, loser in self.options_by_week[later]:
+                future_winner[winner] = future_winner.get(winner, 0) + 1
+                future_loser[loser] = future_loser.get(loser, 0) + 1
+
+        options = []
+        for match_id, winner, loser in self.options_by_week[week]:
+            if not self._valid(winner, loser):
+                continue
+            loser_value = 0 if loser in self.eliminated else future_winner.get(loser, 0)
+            options.append((loser_value, future_loser.get(winner, 0), match_id, winner, loser))
+        options.sort()
+        return [option[2:] for option in options]
+
+    def _key(self, weeks):
+        return (
+            len(weeks),
+            frozenset(self.loser_used),
+            frozenset(self.eliminated),
+            frozenset(self.winner_counts.items())
+        )
+
+    def solve(self, weeks):
+        """Return a list of PathStep, [] if impossible, or None once the search budget runs out"""
+        if not weeks:
+            return []
+        if self.nodes >= SOLVER_NODE_LIMIT or time.monotonic() > self.deadline:
+            return None
+        self.nodes += 1
+        key = self._key(weeks)
+        if key in self.dead_ends or not self._bounded(weeks):
+            return []
+
+        week, rest = weeks[0], weeks[1:]
+        undecided = False
+        for match_id, winner, loser in self._ordered_options(week, rest):
+
+            # Apply the pick the way PickRuleEngine does
+            was_eliminated = (winner in self.eliminated, loser in self.eliminated)
+            self.winner_counts[winner] = self.winner_counts.get(winner, 0) + 1
+            self.loser_used.add(loser)
+            self.eliminated.add(loser)
+            if self.winner_counts[winner] >= MAX_WINNER_USES:
+                self.eliminated.add(winner)
+
+            path = self.solve(rest)
+
+            self.winner_counts[winner] -= 1
+            if not self.winner_counts[winner]:
+                del self.winner_counts[winner]
+            self.loser_used.discard(loser)
+            if not was_eliminated[0]:
+                self.eliminated.discard(winner)
+            if not was_eliminated[1]:
+                self.eliminated.discard(loser)
+
+            if path is None:
+                undecided = True
+                break
+            if path or not rest:
+                return [PathStep(week, match_id, winner, loser)] + path
+        if undecided:
+            return None
+        self.dead_ends.add(key)
+        return []
+
+
+def check_feasibility(state, matches):
+    """Check a pick_rules.SeasonState against the matches that can still be picked.
+
+    matches: (id, week, home_team_id, away_team_id) of every match that has
+    not started. Weeks that already have a pick are fixed; weeks without a
+    pick and without an open match are reported as missed.
+    """
+    picked_weeks = {week for (_, _, week) in state.picks.values()}
+
+    options_by_week = {}
+    for match_id, week, home_team_id, away_team_id in matches:
+        if week in picked_weeks:
+            continue
+        options = options_by_week.setdefault(week, [])
+        options.append((match_id, home_team_id, away_team_id))
+        options.append((match_id, away_team_id, home_team_id))
+
+    open_weeks = sorted(options_by_week)
+    missed_weeks = []
+    if open_weeks:
+        missed_weeks = [
+            week for week in range(1, open_weeks[-1])
+            if week not in picked_weeks and week not in options_by_week
+        ]
+
+    winner_counts = {team_id: usage_count for team_id, (_, usage_count) in state.winner_usage.items()}
+    loser_used = {team_id for team_id, _ in state.loser_usage}
+    search = _Search(options_by_week, winner_counts, loser_used, set(state.eliminated))
+    path = search.solve(open_weeks)
+
+    if path is None:
+        return FeasibilityResult(None, None, open_weeks, missed_weeks, 'Search budget exhausted before a path was found')
+    if open_weeks and not path:
+        return FeasibilityResult(False, [], open_weeks, missed_weeks,
+                                 'No legal pick sequence covers all remaining weeks')
+    return FeasibilityResult(True, path, open_weeks, missed_weeks)
+
+
+def load_open_matches(now=None):
+    """(id, week, home_team_id, away_team_id) of all matches that have not started, in one query"""
+    now = now or datetime.utcnow()
+    return db.session.query(
+        Match.id, Match.week, Match.home_team_id, Match.away_team_id
+    ).filter(
+        Match.start_time > now,
+        Match.is_completed.isnot(True)
+    ).order_by(Match.week, Match.start_time, Match.id).all()
+
+
+def check_user_feasibility(user_id, state=None):
+    """Feasibility for a user, reusing an already loaded SeasonState if given"""
+    if state is None:
+        state = load_season_state(user_id)
+    return check_feasibility(state, load_open_matches())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm HTTP Cache
+Conditional GETs backed by an on-disk response cache
+
+Every response is streamed into one file per URL under PICKEM_HTTP_CACHE_DIR
+(default instance/http_cache), named after the SHA-1 of the URL: a JSON line
+with the URL, ETag, Last-Modified and the SHA-1 of the body, followed by the
+body itself. Files are replaced atomically, so processes sharing the
+directory never see a body paired with another response's headers. The
+next request for the URL sends the validators back as If-None-Match /
+If-Modified-Since; a 304 answer costs a few hundred bytes and the body is
+read from disk. Network and HTTP errors are raised, never papered over
+with the stored copy.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+CACHE_DIR = os.environ.get(
+    'PICKEM_HTTP_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'http_cache')
+)
+
+# Bytes read from the network per chunk
+CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class FetchResult:
+    """An open response body; validator changes whenever the body does. Use as a context manager."""
+
+    def __init__(self, url, stream, not_modified, validator):
+        self.url = url
+        self.stream = stream
+        self.not_modified = not_modified
+        self.validator = validator
+
+    def read(self):
+        return self.stream.read()
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CachedFetcher:
+    """GET with revalidation against the on-disk copy of each URL"""
+
+    def __init__(self, session, cache_dir=None):
+        self.session = session
+        self.cache_dir = cache_dir or CACHE_DIR
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'not_modified': 0, 'bytes': 0}
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.cache")
+
+    def _open_cached(self, url):
+        """(metadata, file positioned at the body) stored for a URL, or (None, None)"""
+        try:
+            f = open(self._path(url), 'rb')
+        except OSError:
+            return None, None
+        try:
+            meta = json.loads(f.readline())
+            if meta.get('url') == url:
+                return meta, f
+        except ValueError:
+            pass
+        f.close()
+        return None, None
+
+    def _store(self, url, response):
+        """Stream a 200 response into the cache; returns (metadata, file positioned at the body)"""
+        digest = hashlib.sha1()
+        size = 0
+        with tempfile.TemporaryFile() as body:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                body.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+            with self._lock:
+                self.stats['bytes'] += size
+
+            meta = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'sha1': digest.hexdigest()
+            }
+            header = json.dumps(meta).encode('utf-8') + b'\n'
+
+            body.seek(0)
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                handle, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            except OSError as e:
+                logger.warning(f"Could not cache {url}: {e}")
+                copy = tempfile.TemporaryFile()
+                shutil.copyfileobj(body, copy)
+                copy.seek(0)
+                return meta, copy
+
+            with os.fdopen(handle, 'wb') as f:
+                f.write(header)
+                shutil.copyfileobj(body, f)
+            stored = open(tmp_path, 'rb')
+            stored.seek(len(header))
+            # The open handle stays valid even if another process replaces the file later
+            os.replace(tmp_path, self._path(url))
+            return meta, stored
+
+    def get(self, url, timeout=30):
+        """FetchResult of a URL; raises on connection and HTTP errors"""
+        meta, cached = self._open_cached(url)
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout, stream=True)
+            with self._lock:
+                self.stats['requests'] += 1
+
+            with response:
+                if response.status_code == 304 and cached:
+                    with self._lock:
+                        self.stats['not_modified'] += 1
+                    return FetchResult(url, cached, True, meta['sha1'])
+
+                response.raise_for_status()
+                meta, stored = self._store(url, response)
+        except BaseException:
+            if cached:
+                cached.close()
+            raise
+
+        if cached:
+            cached.close()
+        return FetchResult(url, stored, False, meta['sha1'])
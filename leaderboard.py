@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Leaderboard Service
+Computes scores, ranks and emoji flags for all users in a single query
+
+The leaderboard, rank and score endpoints all consume the same cached
+LeaderboardSnapshot, so a burst of dashboard reloads costs one query. The
+snapshot is tagged with the RESULTS data version it was built at and is
+rebuilt as soon as that version moves, including when another process (the
+scheduler, a resync) wrote the results. Users are added and renamed outside
+the app, so they show up when the snapshot expires; its digest of users and
+scores goes into the /api/leaderboard ETag so clients see them too.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from sqlalchemy import func
+from app import db, User, UserScore
+from data_version import RESULTS, get_data_versions
+
+# Seconds a snapshot is reused at an unchanged data version (covers new users)
+LEADERBOARD_CACHE_SECONDS = 30
+
+_cache_lock = threading.Lock()
+_cached_snapshot = None
+_cached_at = 0.0
+_cached_version = None
+
+
+class LeaderboardSnapshot:
+    """Immutable, ranked view of all user scores"""
+
+    def __init__(self, entries):
+        # entries: list of dicts with id, username, score, rank and optional emoji
+        self.entries = entries
+        self._by_user_id = {entry['id']: entry for entry in entries}
+        self.digest = hashlib.sha1(
+            json.dumps(self.to_list(), sort_keys=True).encode('utf-8')
+        ).hexdigest()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, user_id):
+        """Return the entry for a user or None"""
+        return self._by_user_id.get(user_id)
+
+    def rank_of(self, user_id):
+        """Return the rank of a user (ties share a rank: 1,1,1,4) or None"""
+        entry = self.get(user_id)
+        return entry['rank'] if entry else None
+
+    def score_of(self, user_id):
+        """Return the score of a user or None"""
+        entry = self.get(user_id)
+        return entry['score'] if entry else None
+
+    def by_user_id(self):
+        """Entries ordered by user id instead of by rank"""
+        return sorted(self.entries, key=lambda entry: entry['id'])
+
+    def to_list(self):
+        """Serialize as the /api/leaderboard payload (rank is not exposed there)"""
+        leaderboard = []
+        for entry in self.entries:
+            item = {
+                'id': entry['id'],
+                'username': entry['username'],
+                'score': entry['score']
+            }
+            if 'emoji' in entry:
+                item['emoji'] = entry['emoji']
+            leaderboard.append(item)
+        return leaderboard
+
+
+def compute_leaderboard():
+    """Build a LeaderboardSnapshot with one ranked query"""
+    score = func.coalesce(UserScore.score, 0)
+    rank = func.rank().over(order_by=score.desc())
+    tie_count = func.count().over(partition_by=score)
+
+    rows = db.session.query(
+        User.id, User.username, score, rank, tie_count
+    ).outerjoin(
+        UserScore, UserScore.user_id == User.id
+    ).order_by(score.desc(), User.id).all()
+
+    entries = []
+    for user_id, username, user_score, user_rank, ties in rows:
+        entries.append({
+            'id': user_id,
+            'username': username,
+            'score': user_score,
+            'rank': user_rank,
+            'tied': ties > 1
+        })
+
+    # Add emojis for first and last place (if not tied)
+    if len(entries) > 1:
+        if not entries[0]['tied']:
+            entries[0]['emoji'] = '💪'
+        if not entries[-1]['tied']:
+            entries[-1]['emoji'] = '💩'
+
+    return LeaderboardSnapshot(entries)
+
+
+def get_leaderboard_snapshot():
+    """Return the cached snapshot, recomputing it once the results changed or it is stale"""
+    global _cached_snapshot, _cached_at, _cached_version
+
+    version = get_data_versions([RESULTS])[RESULTS][0]
+    with _cache_lock:
+        if (_cached_snapshot is not None and _cached_version == version
+                and time.time() - _cached_at < LEADERBOARD_CACHE_SECONDS):
+            return _cached_snapshot
+
+        # Scores read here are at least as new as `version`
+        _cached_snapshot = compute_leaderboard()
+        _cached_at = time.time()
+        _cached_version = version
+        return _cached_snapshot
+
+
+def invalidate_leaderboard():
+    """Drop the cached snapshot (call after scores change)"""
+    global _cached_snapshot
+
+    with _cache_lock:
+        _cached_snapshot = None
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Live Poller
+Ingests scores while games are being played
+
+The weekly jobs only look at ESPN on Tuesday and Wednesday, so scores were
+stale all weekend. The live poller plans its next wake-up from
+Match.start_time instead of a fixed clock:
+
+    game in its window (kickoff .. kickoff + GAME_WINDOW)   every LIVE_POLL_SECONDS
+    game past its window but not final (delays, overtime)   every OVERTIME_POLL_SECONDS
+    nothing live                                            no requests; sleep until the
+                                                            next kickoff (at most IDLE_SLEEP_SECONDS)
+
+One scoreboard request per live week covers all of its games. Running games
+get home_score / away_score / status='in_progress', final games are
+completed and scored (see result_writer). Games that are still not final GAME_GIVE_UP after
+kickoff are left to the weekly job.
+
+    python live_poller.py          run the poller in the foreground
+    python live_poller.py plan     show what it would do now
+"""
+
+import logging
+import sys
+import threading
+from datetime import datetime, timedelta
+from app import app, db, Match
+from result_writer import write_week_results
+from results_provider import get_results_provider
+
+LIVE_POLL_SECONDS = 60
+OVERTIME_POLL_SECONDS = 300
+IDLE_SLEEP_SECONDS = 900
+
+# Kickoff to final whistle of a normal game, and when to stop waiting for one
+GAME_WINDOW = timedelta(hours=4)
+GAME_GIVE_UP = timedelta(hours=8)
+
+logger = logging.getLogger(__name__)
+
+
+class LivePlan:
+    """Weeks to poll now and seconds until the next wake-up"""
+
+    def __init__(self, weeks, sleep_seconds, reason):
+        self.weeks = weeks
+        self.sleep_seconds = sleep_seconds
+        self.reason = reason
+
+    def to_dict(self):
+        return {'weeks': self.weeks, 'sleep_seconds': self.sleep_seconds, 'reason': self.reason}
+
+
+def plan_polling(now=None):
+    """Decide from the schedule what to poll (requires an app context)"""
+    now = now or datetime.utcnow()
+    open_games = db.session.query(Match.week, Match.start_time).filter(
+        Match.is_completed.isnot(True),
+        Match.start_time <= now,
+        Match.start_time > now - GAME_GIVE_UP
+    ).all()
+
+    if open_games:
+        weeks = sorted({week for week, _ in open_games})
+        if any(start_time > now - GAME_WINDOW for _, start_time in open_games):
+            return LivePlan(weeks, LIVE_POLL_SECONDS, f"{len(open_games)} games in progress")
+        return LivePlan(weeks, OVERTIME_POLL_SECONDS, f"{len(open_games)} games past their window")
+
+    next_kickoff = db.session.query(db.func.min(Match.start_time)).filter(
+        Match.is_completed.isnot(True),
+        Match.start_time > now
+    ).scalar()
+    if next_kickoff is None:
+        return LivePlan([], IDLE_SLEEP_SECONDS, 'no upcoming games')
+
+    until_kickoff = max((next_kickoff - now).total_seconds(), 1)
+    return LivePlan([], min(until_kickoff, IDLE_SLEEP_SECONDS), f"next kickoff {next_kickoff.isoformat()}")
+
+
+class LivePoller:
+    """Background loop that follows the schedule"""
+
+    def __init__(self, provider=None):
+        self.provider = provider or get_results_provider()
+        self.is_running = False
+        self.last_plan = None
+        self.requests_made = 0
+        self._stop = threading.Event()
+
+    def poll_week(self, week):
+        """Fetch and store the live state of one week"""
+        try:
+            games = self.provider.fetch_week(week)
+        except Exception as e:
+            logger.error(f"Live poll of week {week} failed: {e}")
+            return 0, 0
+        finally:
+            self.requests_made += 1
+
+        try:
+            diff = write_week_results(week, games)
+        except Exception as e:
+            logger.error(f"Error writing live results of week {week}: {e}")
+            return 0, 0
+
+        if diff.updated:
+            logger.info(f"Live update week {week}: {diff.updated} matches changed, {diff.completed} final")
+        return diff.updated, diff.completed
+
+    def run_once(self, now=None):
+        """Poll whatever is live now; returns the seconds to sleep"""
+        with app.app_context():
+            plan = plan_polling(now)
+            self.last_plan = plan
+            with self.provider.update_cycle():
+                for week in plan.weeks:
+                    self.poll_week(week)
+            return plan.sleep_seconds
+
+    def run(self):
+        """Run until stop() is called"""
+        self.is_running = True
+        self._stop.clear()
+        logger.info("📡 Live poller started")
+        while not self._stop.is_set():
+            try:
+                sleep_seconds = self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Error in live poller: {e}")
+                sleep_seconds = OVERTIME_POLL_SECONDS
+            self._stop.wait(sleep_seconds)
+        self.is_running = False
+        logger.info("📡 Live poller stopped")
+
+    def start(self):
+        """Run in a daemon thread"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def get_status(self):
+        return {
+            'is_running': self.is_running,
+            'requests_made': self.requests_made,
+            'plan': self.last_plan.to_dict() if self.last_plan else None
+        }
+
+
+def main():
+    """Command line entry point"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    command = sys.argv[1] if len(sys.argv) > 1 else 'run'
+    if command == 'plan':
+        with app.app_context():
+            plan = plan_polling()
+        print(f"Poll weeks {plan.weeks or 'none'}, next wake-up in {plan.sleep_seconds:.0f}s ({plan.reason})")
+    elif command == 'run':
+        try:
+            LivePoller().run()
+        except KeyboardInterrupt:
+            pass
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python live_poller.py [run|plan]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Match Times
+Cached kickoff conversions and a per-request clock
+
+Match start times are stored as naive UTC datetimes. Converting one to
+Vienna time used to import pytz, build the zone, localize and convert on
+every access, twice per serialized match. Here the zone is built once,
+each distinct kickoff is converted once (kickoffs are shared by many
+matches, and a rescheduled match simply maps to a new key), and "now" is
+captured once per request so every match in a response agrees on which
+games have started.
+"""
+
+import calendar
+import time
+from datetime import timezone
+from functools import lru_cache
+import pytz
+from flask import g, has_request_context
+
+VIENNA = pytz.timezone('Europe/Vienna')
+
+
+def _as_utc(start_time):
+    """Naive values are UTC; aware values are converted"""
+    if start_time.tzinfo is None:
+        return start_time.replace(tzinfo=timezone.utc)
+    return start_time.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=4096)
+def start_epoch(start_time):
+    """Kickoff as integer seconds since the epoch"""
+    return calendar.timegm(_as_utc(start_time).timetuple())
+
+
+@lru_cache(maxsize=4096)
+def start_vienna(start_time):
+    """Kickoff as an aware Vienna datetime"""
+    return _as_utc(start_time).astimezone(VIENNA)
+
+
+@lru_cache(maxsize=4096)
+def start_vienna_iso(start_time):
+    """Kickoff as a Vienna ISO 8601 string (the start_time_vienna field)"""
+    return start_vienna(start_time).isoformat()
+
+
+def now_epoch():
+    """Current time in epoch seconds, fixed for the duration of a request"""
+    if not has_request_context():
+        return time.time()
+    if 'now_epoch' not in g:
+        g.now_epoch = time.time()
+    return g.now_epoch
+
+
+def is_started(start_time, now=None):
+    """True once the kickoff has passed (now: epoch seconds, default now_epoch())"""
+    return (now_epoch() if now is None else now) >= start_epoch(start_time)
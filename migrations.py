@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Schema Migrations
+Versioned schema changes for an existing SQLite database
+
+db.create_all() only creates missing tables, so indexes and constraints added
+to the models never reach a database that already exists. The migrations here
+are applied in order and tracked with PRAGMA user_version. The launcher runs
+them before the app starts:
+
+    python migrations.py migrate   # apply pending migrations, print query plans
+    python migrations.py status    # show the schema version
+    python migrations.py explain   # show the query plans of the hot queries
+"""
+
+import os
+import sqlite3
+import sys
+import logging
+from database import DATABASE_PATH, connect_sqlite
+
+# File of the configured database (None unless it is a SQLite file)
+DB_PATH = DATABASE_PATH
+
+# Tables derived from picks and matches, with the picks each one summarizes;
+# rebuilt after a migration and whenever they are missing or left empty
+_COMPLETED_PICKS = 'SELECT 1 FROM pick JOIN "match" ON "match".id = pick.match_id WHERE "match".is_completed = 1'
+_ANY_PICKS = 'SELECT 1 FROM pick'
+DERIVED_TABLES = {
+    'user_score': _COMPLETED_PICKS,
+    'user_week_score': _COMPLETED_PICKS,
+    'week_team_pick_count': _ANY_PICKS,
+    'week_user_pick': _ANY_PICKS,
+    'week_pick_agreement': None,  # empty when nobody shares a week, filled with week_team_pick_count
+}
+
+# Same as pick_rules.MAX_WINNER_USES (this module runs before the app is imported)
+MAX_WINNER_USES = 2
+
+logger = logging.getLogger(__name__)
+
+# (name, table, columns, unique) - keep in sync with __table_args__ in app.py
+HOT_PATH_INDEXES = [
+    ('uq_pick_user_match', 'pick', ('user_id', 'match_id'), True),
+    ('ix_pick_match', 'pick', ('match_id',), False),
+    ('ix_match_week_status', 'match', ('week', 'status'), False),
+    ('ix_match_status', 'match', ('status',), False),
+    ('ix_match_start_time', 'match', ('start_time',), False),
+    ('uq_eliminated_team_user_team', 'eliminated_team', ('user_id', 'team_id'), True),
+    ('ix_team_winner_usage_user_team', 'team_winner_usage', ('user_id', 'team_id'), False),
+    ('ix_team_loser_usage_user_team', 'team_loser_usage', ('user_id', 'team_id'), False),
+]
+
+# The queries behind the pick, match, scoring and usage endpoints
+HOT_QUERIES = [
+    ('pick by user and match', 'SELECT id FROM pick WHERE user_id = 1 AND match_id = 1'),
+    ('picks of a match (scoring)', 'SELECT user_id, chosen_team_id FROM pick WHERE match_id = 1'),
+    ('pick of a user in a week', 'SELECT pick.id FROM pick JOIN "match" ON "match".id = pick.match_id '
+                                 'WHERE pick.user_id = 1 AND "match".week = 1'),
+    ('matches of a week', 'SELECT id FROM "match" WHERE week = 1'),
+    ('completed matches of a week', 'SELECT id FROM "match" WHERE week = 1 AND status = \'completed\''),
+    ('completed match count', 'SELECT count(*) FROM "match" WHERE status = \'completed\''),
+    ('latest passed kickoff', 'SELECT max(start_time) FROM "match" WHERE start_time <= \'2025-01-01\''),
+    ('eliminated team', 'SELECT id FROM eliminated_team WHERE user_id = 1 AND team_id = 1'),
+    ('winner usage', 'SELECT id FROM team_winner_usage WHERE user_id = 1 AND team_id = 1'),
+    ('loser usage of a match', 'SELECT id FROM team_loser_usage WHERE user_id = 1 AND team_id = 1 AND match_id = 1'),
+]
+
+
+def _table_exists(conn, table):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def derived_tables_stale(db_path=DB_PATH):
+    """Whether a score or analytics table is missing, or empty although there are picks it summarizes.
+
+    db.create_all() creates missing derived tables empty, so this has to be
+    checked after it as well, not only after a migration.
+    """
+    if not db_path or not os.path.exists(db_path):
+        return False
+    conn = connect_sqlite(db_path)
+    try:
+        if not _table_exists(conn, 'pick'):
+            return False
+        for table, source in DERIVED_TABLES.items():
+            if not _table_exists(conn, table):
+                return True
+            if source and conn.execute(f'SELECT 1 FROM "{table}" LIMIT 1').fetchone() is None \
+                    and conn.execute(f'{source} LIMIT 1').fetchone() is not None:
+                return True
+        return False
+    finally:
+        conn.close()
+
+
+def _delete_duplicates(conn, table, columns):
+    """Keep the oldest row per key so a unique index can be created; returns the users of the removed rows"""
+    key = ', '.join(columns)
+    duplicates = f'SELECT id FROM "{table}" WHERE id NOT IN (SELECT min(id) FROM "{table}" GROUP BY {key})'
+    user_ids = {user_id for (user_id,) in conn.execute(
+        f'SELECT DISTINCT user_id FROM "{table}" WHERE id IN ({duplicates})'
+    )}
+    deleted = conn.execute(f'DELETE FROM "{table}" WHERE id IN ({duplicates})').rowcount
+    if deleted:
+        logger.warning(f"Removed {deleted} duplicate rows from {table} ({key}) of users {sorted(user_ids)}")
+    return user_ids
+
+
+def _rebuild_pick_usage(conn, user_ids):
+    """Recompute winner usage, loser usage and eliminations of some users from their picks.
+
+    Same rows as the pick rule engine writes: the chosen team's winner count,
+    the opponent as loser of the match, and as eliminated every loser plus
+    every team picked as winner MAX_WINNER_USES times.
+    """
+    users = ', '.join(str(int(user_id)) for user_id in sorted(user_ids))
+    for table in ('team_winner_usage', 'team_loser_usage', 'eliminated_team'):
+        conn.execute(f'DELETE FROM "{table}" WHERE user_id IN ({users})')
+    conn.execute(
+        f'INSERT INTO team_winner_usage (user_id, team_id, usage_count) '
+        f'SELECT user_id, chosen_team_id, count(*) FROM pick WHERE user_id IN ({users}) '
+        f'GROUP BY user_id, chosen_team_id'
+    )
+    conn.execute(
+        f'INSERT INTO team_loser_usage (user_id, team_id, week, match_id) '
+        f'SELECT pick.user_id, CASE WHEN pick.chosen_team_id = "match".home_team_id '
+        f'THEN "match".away_team_id ELSE "match".home_team_id END, "match".week, "match".id '
+        f'FROM pick JOIN "match" ON "match".id = pick.match_id WHERE pick.user_id IN ({users})'
+    )
+    conn.execute(
+        f'INSERT INTO eliminated_team (user_id, team_id) '
+        f'SELECT user_id, team_id FROM team_loser_usage WHERE user_id IN ({users}) '
+        f'UNION SELECT user_id, team_id FROM team_winner_usage '
+        f'WHERE user_id IN ({users}) AND usage_count >= {MAX_WINNER_USES}'
+    )
+    logger.warning(f"Recomputed team usage and eliminations of users {sorted(user_ids)} from their remaining picks")
+
+
+def add_hot_path_indexes(conn):
+    """Migration 1: indexes and unique constraints for the hot query paths"""
+    repicked_users = set()
+    for name, table, columns, unique in HOT_PATH_INDEXES:
+        # Tables that do not exist yet get the index from db.create_all()
+        if not _table_exists(conn, table):
+            continue
+        if unique:
+            user_ids = _delete_duplicates(conn, table, columns)
+            if table == 'pick':
+                repicked_users |= user_ids
+        conn.execute(
+            f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS {name} '
+            f'ON "{table}" ({", ".join(columns)})'
+        )
+    # Removed duplicate picks were counted in the usage tables
+    if repicked_users and all(_table_exists(conn, table) for table in
+                              ('team_winner_usage', 'team_loser_usage', 'eliminated_team')):
+        _rebuild_pick_usage(conn, repicked_users)
+
+
+# Applied in order; the position in this list is the schema version
+MIGRATIONS = [
+    add_hot_path_indexes,
+]
+
+
+def get_schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def explain_hot_queries(conn):
+    """Return {query name: [plan detail, ...]} for all hot queries on existing tables"""
+    plans = {}
+    for name, sql in HOT_QUERIES:
+        try:
+            rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall()
+        except sqlite3.OperationalError:
+            continue  # Table not created yet
+        plans[name] = [row[-1] for row in rows]
+    return plans
+
+
+def format_plan_report(before, after):
+    """Side-by-side text report of two explain_hot_queries() results"""
+    lines = []
+    for name, _ in HOT_QUERIES:
+        if name not in before and name not in after:
+            continue
+        lines.append(f"{name}:")
+        lines.append(f"  before: {'; '.join(before.get(name, [])) or '-'}")
+        lines.append(f"  after:  {'; '.join(after.get(name, [])) or '-'}")
+    return '\n'.join(lines)
+
+
+def migrate_database(db_path=DB_PATH):
+    """Apply pending migrations. Returns (old version, new version, plan report)."""
+    if not db_path or not os.path.exists(db_path):
+        # A new database gets the current schema from db.create_all()
+        return None, None, ''
+
+    # Autocommit mode so each migration runs in an explicit transaction, DDL included
+    conn = connect_sqlite(db_path, isolation_level=None)
+    try:
+        old_version = get_schema_version(conn)
+        if old_version >= len(MIGRATIONS):
+            return old_version, old_version, ''
+
+        before = explain_hot_queries(conn)
+        for version, migration in enumerate(MIGRATIONS[old_version:], start=old_version + 1):
+            conn.execute('BEGIN')
+            try:
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {version}')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            logger.info(f"Applied migration {version}: {migration.__name__}")
+        after = explain_hot_queries(conn)
+
+        return old_version, get_schema_version(conn), format_plan_report(before, after)
+    finally:
+        conn.close()
+
+
+def main():
+    """Command line entry point"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    command = sys.argv[1] if len(sys.argv) > 1 else 'migrate'
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DB_PATH
+
+    if command == 'migrate':
+        old_version, new_version, report = migrate_database(db_path)
+        if old_version is None:
+            print(f"No database at {db_path}; nothing to migrate")
+        elif old_version == new_version:
+            print(f"Schema is up to date (version {new_version})")
+        else:
+            print(f"Migrated schema from version {old_version} to {new_version}")
+            print(report)
+            print("Run \"python scoring.py rebuild\" and \"python analytics.py rebuild\" to refresh derived tables")
+    elif command == 'status':
+        conn = connect_sqlite(db_path)
+        print(f"Schema version {get_schema_version(conn)} of {len(MIGRATIONS)}")
+        conn.close()
+    elif command == 'explain':
+        conn = connect_sqlite(db_path)
+        for name, plan in explain_hot_queries(conn).items():
+            print(f"{name}: {'; '.join(plan)}")
+        conn.close()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python migrations.py [migrate|status|explain] [db_path]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Pick Matrix
+Every user's pick of every week as one compact grid
+
+The all-picks page needs all picks of all users. The grid is built from a
+single matches-left-join-picks query, and privacy is applied here rather
+than in the browser, so unrevealed picks never leave the server:
+
+    null            no pick
+    0               pick exists but is hidden
+    [team_id, r]    revealed pick; r is true / false, or null while pending
+
+A pick is hidden until its match has kicked off, and all picks of the
+current week stay hidden until the week is completed when hide_current is
+set (the "hide current picks" switch on the page). The consensus of each
+week comes from the WeekTeamPickCount summary (see analytics.py).
+"""
+
+from datetime import datetime
+from app import db, Match, Pick
+from analytics import revealed_consensus
+from leaderboard import get_leaderboard_snapshot
+from team_registry import team_registry
+
+HIDDEN = 0
+
+
+def build_pick_matrix(current_week, hide_current=True, now=None):
+    """Users x weeks grid (newest week first) with unrevealed picks withheld"""
+    now = now or datetime.utcnow()
+    users = get_leaderboard_snapshot().entries
+    user_index = {user['id']: index for index, user in enumerate(users)}
+
+    rows = db.session.query(
+        Match.week, Match.start_time, Match.is_completed, Match.winner_team_id,
+        Pick.user_id, Pick.chosen_team_id
+    ).outerjoin(Pick, Pick.match_id == Match.id).order_by(Match.week, Pick.id).all()
+
+    weeks = {}  # week: {'completed': bool, 'picks': [(user_id, team_id, start_time, result)]}
+    for week, start_time, is_completed, winner_team_id, user_id, chosen_team_id in rows:
+        info = weeks.setdefault(week, {'completed': True, 'picks': []})
+        info['completed'] = info['completed'] and bool(is_completed)
+        if user_id is None:
+            continue
+        result = (chosen_team_id == winner_team_id) if is_completed else None
+        info['picks'].append((user_id, chosen_team_id, start_time, result))
+
+    week_numbers = sorted(weeks, reverse=True)
+    grid = [[None] * len(week_numbers) for _ in users]
+    hidden_weeks = []
+    team_ids = set()
+    consensus = revealed_consensus(now)
+    for column, week in enumerate(week_numbers):
+        info = weeks[week]
+        withheld = hide_current and week == current_week and not info['completed']
+        if withheld:
+            hidden_weeks.append(week)
+            consensus.pop(week, None)
+
+        for user_id, team_id, start_time, result in info['picks']:
+            row = user_index.get(user_id)
+            # One pick per week; keep the first if legacy data has more
+            if row is None or grid[row][column] is not None:
+                continue
+            if withheld or start_time > now:
+                grid[row][column] = HIDDEN
+                continue
+            grid[row][column] = [team_id, result]
+            team_ids.add(team_id)
+
+    for week_consensus in consensus.values():
+        team_ids.update(week_consensus)
+
+    return {
+        'users': [{'id': user['id'], 'username': user['username']} for user in users],
+        'weeks': week_numbers,
+        'completed_weeks': [week for week in week_numbers if weeks[week]['completed']],
+        'hidden_weeks': hidden_weeks,
+        'teams': {team_id: team_registry.get(team_id).to_dict() for team_id in sorted(team_ids)},
+        'consensus': consensus,
+        'grid': grid
+    }
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Pick Rule Engine
+Validates picks against a user's whole season state held in memory
+
+PickRuleEngine.load() reads the user's picks, winner usage, loser usage and
+eliminations in a single UNION ALL query (load_season_states() does the same
+for many users at once). Picks are then evaluated against
+that in-memory SeasonState, and changes() diffs it against what was loaded
+to get the exact rows to insert, update and delete. A pick therefore costs a
+constant number of round trips no matter how far into the season it is.
+"""
+
+import copy
+from sqlalchemy import delete, literal, null, select, union_all, update
+from app import db, Match, Pick, EliminatedTeam, TeamWinnerUsage, TeamLoserUsage
+from team_registry import team_registry
+
+# A team may be picked as winner at most this many times per season
+MAX_WINNER_USES = 2
+
+
+class PickRejected(Exception):
+    """A pick that breaks a rule; carries the API error message and status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class SeasonState:
+    """Pick and usage rows of one user, keyed the way the rules look them up"""
+
+    def __init__(self):
+        self.picks = {}           # match_id: [row_id, chosen_team_id, week]
+        self.winner_usage = {}    # team_id: [row_id, usage_count]
+        self.loser_usage = {}     # (team_id, match_id): [row_id, week]
+        self.eliminated = {}      # team_id: row_id
+
+    def pick_for_week(self, week):
+        """(match_id, chosen_team_id) of the user's pick in a week, or None"""
+        for match_id, (_, chosen_team_id, pick_week) in self.picks.items():
+            if pick_week == week:
+                return match_id, chosen_team_id
+        return None
+
+    def winner_count(self, team_id):
+        usage = self.winner_usage.get(team_id)
+        return usage[1] if usage else 0
+
+    def loser_count(self, team_id):
+        return sum(1 for (loser_team_id, _) in self.loser_usage if loser_team_id == team_id)
+
+    def eliminate(self, team_id):
+        self.eliminated.setdefault(team_id, None)
+
+
+def load_season_states(user_ids):
+    """Load the SeasonState of several users with one query; returns {user_id: SeasonState}"""
+    user_ids = list(user_ids)
+    picks = select(
+        literal('pick'), Pick.user_id, Pick.id, Pick.chosen_team_id, Pick.match_id, Match.week, null()
+    ).join(Match, Pick.match_id == Match.id).where(Pick.user_id.in_(user_ids))
+    winners = select(
+        literal('winner'), TeamWinnerUsage.user_id, TeamWinnerUsage.id, TeamWinnerUsage.team_id, null(), null(),
+        TeamWinnerUsage.usage_count
+    ).where(TeamWinnerUsage.user_id.in_(user_ids))
+    losers = select(
+        literal('loser'), TeamLoserUsage.user_id, TeamLoserUsage.id, TeamLoserUsage.team_id, TeamLoserUsage.match_id,
+        TeamLoserUsage.week, null()
+    ).where(TeamLoserUsage.user_id.in_(user_ids))
+    eliminations = select(
+        literal('eliminated'), EliminatedTeam.user_id, EliminatedTeam.id, EliminatedTeam.team_id, null(), null(), null()
+    ).where(EliminatedTeam.user_id.in_(user_ids))
+
+    states = {user_id: SeasonState() for user_id in user_ids}
+    rows = db.session.execute(union_all(picks, winners, losers, eliminations)).all()
+    # Sorted by id so that duplicate legacy rows resolve to the oldest one, as .first() did
+    for kind, user_id, row_id, team_id, match_id, week, usage_count in sorted(rows, key=lambda row: row[2]):
+        state = states[user_id]
+        if kind == 'pick':
+            state.picks.setdefault(match_id, [row_id, team_id, week])
+        elif kind == 'winner':
+            state.winner_usage.setdefault(team_id, [row_id, usage_count or 0])
+        elif kind == 'loser':
+            state.loser_usage.setdefault((team_id, match_id), [row_id, week])
+        else:
+            state.eliminated.setdefault(team_id, row_id)
+    return states
+
+
+def load_season_state(user_id):
+    """Load a SeasonState for a user with one query"""
+    return load_season_states([user_id])[user_id]
+
+
+def _opponent(match, team_id):
+    return match.away_team_id if team_id == match.home_team_id else match.home_team_id
+
+
+class PickRuleEngine:
+    """Evaluates picks for one user and produces the resulting row changes"""
+
+    def __init__(self, user_id, state):
+        self.user_id = user_id
+        self.loaded = state
+        self.state = copy.deepcopy(state)
+
+    @classmethod
+    def load(cls, user_id):
+        return cls(user_id, load_season_state(user_id))
+
+    def evaluate(self, match, chosen_team_id):
+        """Check a pick against all rules and apply it to the in-memory state.
+
+        Raises PickRejected with the same messages as the original endpoint.
+        Returns True if an existing pick for the match was updated.
+        """
+        state = self.state
+
+        if not match:
+            raise PickRejected('Match not found', 404)
+        if match.is_game_started:
+            raise PickRejected('Game has already started. Picks are no longer allowed.')
+
+        team = team_registry.get(chosen_team_id)
+        if not team:
+            raise PickRejected('Team not found', 404)
+        if match.is_completed:
+            raise PickRejected('Cannot pick for completed match')
+        if team.id != match.home_team_id and team.id != match.away_team_id:
+            raise PickRejected('Team is not part of this match')
+
+        # Only one pick per week is allowed
+        week_pick = state.pick_for_week(match.week)
+        if week_pick and week_pick[0] != match.id:
+            raise PickRejected(f'You already have a pick for week {match.week}. Only one pick per week is allowed.')
+
+        if team.id in state.eliminated:
+            raise PickRejected('Team is already eliminated for this user')
+        if state.winner_count(team.id) >= MAX_WINNER_USES:
+            raise PickRejected('Team has already been picked as winner 2 times this season')
+
+        # A team can only be picked as loser once
+        opposing_team_id = _opponent(match, team.id)
+        if state.loser_count(opposing_team_id):
+            opposing_team = team_registry.get(opposing_team_id)
+            raise PickRejected(f'{opposing_team.name} has already been picked as loser this season and cannot be picked as loser again')
+
+        existing = state.picks.get(match.id)
+        if existing:
+            old_team_id = existing[1]
+            if old_team_id != team.id:
+                self._release(match, old_team_id)
+                self._use(match, team.id)
+            existing[1] = team.id
+            return True
+
+        state.picks[match.id] = [None, team.id, match.week]
+        self._use(match, team.id)
+        return False
+
+    def _use(self, match, team_id):
+        """Winner usage for the chosen team, loser usage and elimination for its opponent"""
+        state = self.state
+        opposing_team_id = _opponent(match, team_id)
+
+        usage = state.winner_usage.setdefault(team_id, [None, 0])
+        usage[1] += 1
+
+        state.loser_usage.setdefault((opposing_team_id, match.id), [None, match.week])
+        state.eliminate(opposing_team_id)
+
+        # A team picked as winner twice is eliminated as well
+        if usage[1] >= MAX_WINNER_USES:
+            state.eliminate(team_id)
+
+    def _release(self, match, old_team_id):
+        """Undo _use() for the previously chosen team of a match"""
+        state = self.state
+        old_opposing_team_id = _opponent(match, old_team_id)
+
+        usage = state.winner_usage.get(old_team_id)
+        if usage and usage[1] > 0:
+            usage[1] -= 1
+            if usage[1] == 0:
+                del state.winner_usage[old_team_id]
+
+        if state.loser_usage.pop((old_opposing_team_id, match.id), None) is not None:
+            # The elimination stays if the team was picked as loser elsewhere
+            if not state.loser_count(old_opposing_team_id):
+                state.eliminated.pop(old_opposing_team_id, None)
+
+    def changes(self):
+        """Row changes between the loaded and evaluated state as (action, model, row_id, values)"""
+        changes = []
+        loaded, state = self.loaded, self.state
+        user_id = self.user_id
+
+        for match_id, (row_id, chosen_team_id, _) in state.picks.items():
+            if row_id is None:
+                changes.append(('insert', Pick, None, {'user_id': user_id, 'match_id': match_id, 'chosen_team_id': chosen_team_id}))
+            elif loaded.picks[match_id][1] != chosen_team_id:
+                changes.append(('update', Pick, row_id, {'chosen_team_id': chosen_team_id}))
+
+        for team_id, (row_id, usage_count) in loaded.winner_usage.items():
+            if team_id not in state.winner_usage:
+                changes.append(('delete', TeamWinnerUsage, row_id, None))
+        for team_id, (row_id, usage_count) in state.winner_usage.items():
+            if row_id is None:
+                changes.append(('insert', TeamWinnerUsage, None, {'user_id': user_id, 'team_id': team_id, 'usage_count': usage_count}))
+            elif loaded.winner_usage[team_id][1] != usage_count:
+                changes.append(('update', TeamWinnerUsage, row_id, {'usage_count': usage_count}))
+
+        for key, (row_id, _) in loaded.loser_usage.items():
+            if key not in state.loser_usage:
+                changes.append(('delete', TeamLoserUsage, row_id, None))
+        for (team_id, match_id), (row_id, week) in state.loser_usage.items():
+            if row_id is None:
+                changes.append(('insert', TeamLoserUsage, None, {'user_id': user_id, 'team_id': team_id, 'week': week, 'match_id': match_id}))
+
+        for team_id, row_id in loaded.eliminated.items():
+            if team_id not in state.eliminated:
+                changes.append(('delete', EliminatedTeam, row_id, None))
+        for team_id, row_id in state.eliminated.items():
+            if row_id is None:
+                changes.append(('insert', EliminatedTeam, None, {'user_id': user_id, 'team_id': team_id}))
+
+        return changes
+
+    def apply(self):
+        """Execute changes() in the current transaction (the caller commits)"""
+        changes = self.changes()
+
+        deletes = {}
+        inserts = {}
+        for action, model, row_id, values in changes:
+            if action == 'delete':
+                deletes.setdefault(model, []).append(row_id)
+            elif action == 'insert':
+                inserts.setdefault(model, []).append(values)
+            else:
+                db.session.execute(update(model).where(model.id == row_id).values(**values))
+
+        # Deletes first so re-inserted unique keys do not collide
+        for model, row_ids in deletes.items():
+            db.session.execute(delete(model).where(model.id.in_(row_ids)))
+        for model, rows in inserts.items():
+            db.session.add_all([model(**values) for values in rows])
+        db.session.flush()
+        return changes
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Result Writer
+Writes a week of game results in one transaction and reports what changed
+
+All result ingestion (weekly jobs, live polling, resyncs) ends here. Team
+ids come from the in-memory team registry, the week's matches are loaded
+with one query and keyed by (away_team_id, home_team_id), and every change
+of the week is scored and committed together, so a week is either fully
+written or not at all and the write lock is held only once.
+
+Ties: a game ESPN reports as final with equal scores completes its match
+without a winner. Every pick on it, for either team, is scored as incorrect
+(there are no half points), and the simulation counts it as a tie for both
+teams. Leaving tied matches open instead would keep their week from ever
+being scored.
+"""
+
+import logging
+from collections import namedtuple
+from datetime import datetime
+from app import db, Match
+from results_provider import LIVE_STATUSES
+from scoring import apply_match_result, snapshot_result
+from team_registry import team_registry
+
+# Match columns a result can change, in diff order
+RESULT_FIELDS = ('away_score', 'home_score', 'status', 'is_completed', 'winner_team_id')
+
+logger = logging.getLogger(__name__)
+
+
+class MatchChange(namedtuple('MatchChange', ['match_id', 'week', 'matchup', 'before', 'after'])):
+    """Old and new RESULT_FIELDS of one match"""
+    __slots__ = ()
+
+    @property
+    def completed(self):
+        return self.after['is_completed'] and not self.before['is_completed']
+
+    @property
+    def tied(self):
+        """Completed without a winner (see the module docstring)"""
+        return self.after['is_completed'] and self.after['winner_team_id'] is None
+
+    def to_dict(self):
+        return {
+            'match_id': self.match_id,
+            'week': self.week,
+            'matchup': self.matchup,
+            'tied': self.tied,
+            'changes': {
+                field: [self.before[field], self.after[field]]
+                for field in RESULT_FIELDS
+                if self.before[field] != self.after[field]
+            }
+        }
+
+
+class ResultDiff:
+    """Changes made by one or more write_week_results calls"""
+
+    def __init__(self):
+        self.changes = []
+        self.unmatched = []  # "AWY @ HOM (week N)" of games not in our schedule
+
+    @property
+    def updated(self):
+        return len(self.changes)
+
+    @property
+    def completed(self):
+        return sum(1 for change in self.changes if change.completed)
+
+    @property
+    def tied(self):
+        return sum(1 for change in self.changes if change.completed and change.tied)
+
+    def extend(self, other):
+        self.changes.extend(other.changes)
+        self.unmatched.extend(other.unmatched)
+        return self
+
+    def to_dict(self):
+        return {
+            'updated': self.updated,
+            'completed': self.completed,
+            'tied': self.tied,
+            'changes': [change.to_dict() for change in self.changes],
+            'unmatched': self.unmatched
+        }
+
+
+def _result_state(match):
+    return {
+        'away_score': match.away_score,
+        'home_score': match.home_score,
+        'status': match.status,
+        'is_completed': bool(match.is_completed),
+        'winner_team_id': match.winner_team_id
+    }
+
+
+def write_week_results(week, games, overwrite_completed=False, commit=True, now=None):
+    """Apply GameResults of one week and return a ResultDiff.
+
+    Scheduled, postponed and canceled games are ignored. Running games
+    update scores and status of open matches; final games complete them,
+    ties without a winner (see the module docstring). Completed matches are left alone
+    unless overwrite_completed is set, so manual corrections survive the
+    routine jobs. With commit=False the caller commits, e.g. to write
+    several weeks at once. Requires an app context.
+    """
+    now = now or datetime.utcnow()
+    matches = {
+        (match.away_team_id, match.home_team_id): match
+        for match in Match.query.filter_by(week=week).all()
+    }
+
+    diff = ResultDiff()
+    try:
+        for game in games:
+            if game.status not in LIVE_STATUSES or game.away_score is None or game.home_score is None:
+                continue
+            matchup = f"{game.away_abbr} @ {game.home_abbr}"
+            away_team = team_registry.by_espn_abbreviation(game.away_abbr)
+            home_team = team_registry.by_espn_abbreviation(game.home_abbr)
+            match = matches.get((away_team.id, home_team.id)) if away_team and home_team else None
+            if not match:
+                logger.warning(f"Game not in the schedule: {matchup} (week {week})")
+                diff.unmatched.append(f"{matchup} (week {week})")
+                continue
+            if match.is_completed and not (overwrite_completed and game.is_completed):
+                continue
+
+            before = _result_state(match)
+            after = dict(before, away_score=game.away_score, home_score=game.home_score, status=game.status)
+            if game.is_completed:
+                # winner_abbr is None for a tie: final, and no pick on it is correct
+                winner = team_registry.by_espn_abbreviation(game.winner_abbr) if game.winner_abbr else None
+                after['winner_team_id'] = winner.id if winner else None
+                after['is_completed'] = True
+            if after == before:
+                continue
+
+            previous_result = snapshot_result(match)
+            for field in RESULT_FIELDS:
+                setattr(match, field, after[field])
+            match.updated_at = now
+            apply_match_result(match, previous_result)
+            diff.changes.append(MatchChange(match.id, week, matchup, before, after))
+
+        if diff.changes and commit:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return diff
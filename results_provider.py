@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Results Providers
+Pluggable sources for game results
+
+    ScoreboardJSONProvider  ESPN scoreboard API (default)
+    ScheduleHTMLProvider    ESPN schedule page, the original regex scraper
+    FallbackProvider        first provider that answers wins
+
+The JSON adapter reads only the handful of fields we need (teams, scores,
+game state). Downloads go through http_cache, which streams each response
+into its cache file; with ijson installed the fields are then streamed out
+of that file without building the whole document, otherwise it is decoded
+with json. An unchanged week costs a 304, and a body that has not changed
+is not parsed again. Inside
+
+    with provider.update_cycle():
+
+each week is fetched at most once, however many checks ask for it.
+Both ESPN URLs can be pointed at espn_stub_server.py for local testing:
+
+    PICKEM_ESPN_SCOREBOARD_URL  scoreboard API endpoint
+    PICKEM_ESPN_SCHEDULE_URL    schedule page base URL
+    PICKEM_SEASON               season year (default 2025)
+    PICKEM_RESULTS_PROVIDER     json, html or auto (default: json, then html)
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+import requests
+from http_cache import CachedFetcher
+
+try:
+    import ijson
+except ImportError:  # Optional; the whole document is parsed with json instead
+    ijson = None
+
+SCOREBOARD_URL = os.environ.get(
+    'PICKEM_ESPN_SCOREBOARD_URL', 'https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard'
+)
+SCHEDULE_URL = os.environ.get('PICKEM_ESPN_SCHEDULE_URL', 'https://www.espn.com/nfl/schedule')
+SEASON = os.environ.get('PICKEM_SEASON', '2025')
+REGULAR_SEASON = 2
+REQUEST_TIMEOUT = 30
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# ESPN game states mapped to Match.status. Only the event's completed flag
+# makes a game final: postponed and canceled games are reported as 'post'
+# without it and must not be scored.
+GAME_STATES = {'pre': 'scheduled', 'in': 'in_progress', 'post': 'postponed'}
+
+# Statuses whose scores are meaningful
+LIVE_STATUSES = ('in_progress', 'completed')
+
+logger = logging.getLogger(__name__)
+
+
+class GameResult(namedtuple('GameResult', [
+    'week', 'event_id', 'away_abbr', 'home_abbr', 'away_score', 'home_score', 'status', 'start_time'
+])):
+    """One game as reported by a provider; abbreviations are ESPN's"""
+    __slots__ = ()
+
+    @property
+    def is_completed(self):
+        return self.status == 'completed'
+
+    @property
+    def winner_abbr(self):
+        """Abbreviation of the winner of a completed game, None for ties and open games"""
+        if not self.is_completed or self.home_score is None or self.away_score is None:
+            return None
+        if self.home_score > self.away_score:
+            return self.home_abbr
+        if self.away_score > self.home_score:
+            return self.away_abbr
+        return None
+
+
+class ResultsProvider:
+    """Interface: fetch_week returns all GameResults of a week, or raises on failure"""
+
+    name = 'base'
+
+    def __init__(self, session=None):
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', USER_AGENT)
+        self.fetcher = CachedFetcher(self.session)
+        self._parsed = {}  # url: (validator, results)
+        self._cycle = threading.local()
+
+    def week_url(self, week):
+        raise NotImplementedError
+
+    def parse(self, stream, week):
+        """GameResults from a binary file object holding the response body"""
+        raise NotImplementedError
+
+    def fetch_week(self, week):
+        cycle = getattr(self._cycle, 'results', None)
+        if cycle is not None and week in cycle:
+            return cycle[week]
+
+        with self.fetcher.get(self.week_url(week), timeout=REQUEST_TIMEOUT) as response:
+            cached = self._parsed.get(response.url)
+            if cached and cached[0] == response.validator:
+                results = cached[1]
+            else:
+                results = self.parse(response.stream, week)
+                self._parsed[response.url] = (response.validator, results)
+
+        if cycle is not None:
+            cycle[week] = results
+        return results
+
+    def completed_games(self, week):
+        return [game for game in self.fetch_week(week) if game.is_completed]
+
+    @contextmanager
+    def update_cycle(self):
+        """Reuse each week's results until the block ends (per thread, nestable)"""
+        if getattr(self._cycle, 'results', None) is not None:
+            yield self
+            return
+        self._cycle.results = {}
+        try:
+            yield self
+        finally:
+            self._cycle.results = None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_start(value):
+    """ESPN dates look like 2025-09-05T00:20Z; returned as naive UTC"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.rstrip('Z'), '%Y-%m-%dT%H:%M')
+    except ValueError:
+        return None
+
+
+class _EventBuilder:
+    """Collects the fields of one scoreboard event"""
+
+    def __init__(self):
+        self.event_id = None
+        self.date = None
+        self.state = None
+        self.completed = False
+        self.competitors = []  # [homeAway, abbreviation, score]
+
+    def result(self, week):
+        teams = {home_away: (abbreviation, _to_int(score)) for home_away, abbreviation, score in self.competitors}
+        if 'home' not in teams or 'away' not in teams:
+            return None
+        status = 'completed' if self.completed else GAME_STATES.get(self.state, 'scheduled')
+        return GameResult(
+            week=week,
+            event_id=self.event_id,
+            away_abbr=teams['away'][0],
+            home_abbr=teams['home'][0],
+            away_score=teams['away'][1] if status in LIVE_STATUSES else None,
+            home_score=teams['home'][1] if status in LIVE_STATUSES else None,
+            status=status,
+            start_time=_parse_start(self.date)
+        )
+
+
+def parse_scoreboard_stream(stream, week):
+    """GameResults from a scoreboard response body, streamed with ijson"""
+    event_prefix = 'events.item'
+    competitor_prefix = 'events.item.competitions.item.competitors.item'
+    results = []
+    event = None
+    competitor = None
+
+    for prefix, kind, value in ijson.parse(stream):
+        if prefix == event_prefix:
+            if kind == 'start_map':
+                event = _EventBuilder()
+            elif kind == 'end_map' and event:
+                result = event.result(week)
+                if result:
+                    results.append(result)
+                event = None
+        elif event is None:
+            continue
+        elif prefix == competitor_prefix:
+            if kind == 'start_map':
+                competitor = [None, None, None]
+            elif kind == 'end_map' and competitor:
+                event.competitors.append(competitor)
+                competitor = None
+        elif competitor is not None and prefix.startswith(competitor_prefix + '.'):
+            field = prefix[len(competitor_prefix) + 1:]
+            if field == 'homeAway':
+                competitor[0] = value
+            elif field == 'team.abbreviation':
+                competitor[1] = value
+            elif field == 'score':
+                competitor[2] = value
+        elif prefix == 'events.item.id':
+            event.event_id = value
+        elif prefix == 'events.item.date':
+            event.date = value
+        elif prefix == 'events.item.status.type.state':
+            event.state = value
+        elif prefix == 'events.item.status.type.completed':
+            event.completed = bool(value)
+    return results
+
+
+def parse_scoreboard_document(document, week):
+    """GameResults from an already decoded scoreboard document"""
+    results = []
+    for item in document.get('events') or []:
+        event = _EventBuilder()
+        event.event_id = item.get('id')
+        event.date = item.get('date')
+        state = (item.get('status') or {}).get('type') or {}
+        event.state = state.get('state')
+        event.completed = bool(state.get('completed'))
+        for competition in (item.get('competitions') or [])[:1]:
+            for competitor in competition.get('competitors') or []:
+                event.competitors.append([
+                    competitor.get('homeAway'),
+                    (competitor.get('team') or {}).get('abbreviation'),
+                    competitor.get('score')
+                ])
+        result = event.result(week)
+        if result:
+            results.append(result)
+    return results
+
+
+class ScoreboardJSONProvider(ResultsProvider):
+    """ESPN scoreboard API for one regular-season week"""
+
+    name = 'json'
+
+    def week_url(self, week):
+        return f"{SCOREBOARD_URL}?week={week}&seasontype={REGULAR_SEASON}&dates={SEASON}"
+
+    def parse(self, stream, week):
+        if ijson is not None:
+            return parse_scoreboard_stream(stream, week)
+        return parse_scoreboard_document(json.load(stream), week)
+
+
+def parse_schedule_html(content, week):
+    """Completed GameResults from the ESPN schedule page ("ABC 21, XYZ 17" anchors)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    score_pattern = re.compile(r'([A-Z]{2,4})\s+(\d+),\s+([A-Z]{2,4})\s+(\d+)')
+    results = []
+    for element in soup.find_all('a', href=re.compile(r'/nfl/game/')):
+        match = score_pattern.search(element.get_text(strip=True))
+        if match:
+            results.append(GameResult(
+                week=week,
+                event_id=None,
+                away_abbr=match.group(1),
+                home_abbr=match.group(3),
+                away_score=int(match.group(2)),
+                home_score=int(match.group(4)),
+                status='completed',
+                start_time=None
+            ))
+    return results
+
+
+class ScheduleHTMLProvider(ResultsProvider):
+    """ESPN schedule page; only reports completed games"""
+
+    name = 'html'
+
+    def week_url(self, week):
+        return f"{SCHEDULE_URL}/_/week/{week}"
+
+    def parse(self, stream, week):
+        return parse_schedule_html(stream.read(), week)
+
+
+class FallbackProvider(ResultsProvider):
+    """Asks each provider in turn and returns the first non-empty answer"""
+
+    name = 'auto'
+
+    def __init__(self, providers):
+        self.providers = providers
+
+    @contextmanager
+    def update_cycle(self):
+        with ExitStack() as stack:
+            for provider in self.providers:
+                stack.enter_context(provider.update_cycle())
+            yield self
+
+    def fetch_week(self, week):
+        last_error = None
+        for provider in self.providers:
+            try:
+                results = provider.fetch_week(week)
+            except Exception as e:
+                logger.warning(f"{provider.name} results provider failed for week {week}: {e}")
+                last_error = e
+                continue
+            if results:
+                return results
+        if last_error:
+            raise last_error
+        return []
+
+
+def get_results_provider(session=None):
+    """Provider selected by PICKEM_RESULTS_PROVIDER"""
+    choice = os.environ.get('PICKEM_RESULTS_PROVIDER', 'auto').lower()
+    session = session or requests.Session()
+    if choice == 'json':
+        return ScoreboardJSONProvider(session)
+    if choice == 'html':
+        return ScheduleHTMLProvider(session)
+    return FallbackProvider([ScoreboardJSONProvider(session), ScheduleHTMLProvider(session)])
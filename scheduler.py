@@ -2,6 +2,7 @@
 """
 NFL PickEm Scheduler
 Automatically runs weekly updates every Tuesday after Monday Night Football
+and polls live scores while games are in progress
 """
 
 import schedule
@@ -9,6 +10,9 @@ import time
 import logging
 from datetime import datetime, timedelta
 from espn_integration import ESPNIntegration
+from live_poller import LivePoller
+from app import app
+from week_calendar import week_calendar
 import threading
 import sys
 import os
@@ -27,30 +31,41 @@ logger = logging.getLogger(__name__)
 class NFLPickEmScheduler:
     def __init__(self):
         self.espn = ESPNIntegration()
-        self.current_week = 2  # Start with Week 2
-        self.max_week = 18     # Regular season ends at Week 18
+        self.live_poller = LivePoller(self.espn.provider)
         self.is_running = False
         
+    @property
+    def current_week(self):
+        """Week to update, resolved from the schedule so a restart cannot reset it"""
+        with app.app_context():
+            return week_calendar.week_to_score() or 1
+    
+    @property
+    def max_week(self):
+        """Last week of the regular season"""
+        with app.app_context():
+            return week_calendar.max_week() or 18
+        
     def weekly_update_job(self):
         """Job that runs every Tuesday to check for completed weeks"""
         logger.info("=== WEEKLY UPDATE JOB STARTED ===")
         
         try:
             # Check if current week is completed
-            if self.current_week <= self.max_week:
-                logger.info(f"Checking Week {self.current_week} for completion...")
+            week = self.current_week
+            if week <= self.max_week:
+                logger.info(f"Checking Week {week} for completion...")
                 
-                success = self.espn.process_weekly_update(self.current_week)
+                success = self.espn.process_weekly_update(week)
                 
                 if success:
-                    logger.info(f"✅ Week {self.current_week} successfully updated!")
-                    self.current_week += 1
-                    logger.info(f"📅 Moving to Week {self.current_week} for next update")
+                    logger.info(f"✅ Week {week} successfully updated!")
+                    logger.info(f"📅 Next update: Week {self.current_week}")
                     
                     # Send notification (placeholder for now)
-                    self.send_update_notification(self.current_week - 1)
+                    self.send_update_notification(week)
                 else:
-                    logger.info(f"⏳ Week {self.current_week} not yet completed, will check again next week")
+                    logger.info(f"⏳ Week {week} not yet completed, will check again next week")
             else:
                 logger.info("🏁 Regular season completed! No more updates needed.")
                 
@@ -111,6 +126,9 @@ class NFLPickEmScheduler:
         scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
         scheduler_thread.start()
         
+        # Live scores on game days; the weekly jobs remain as a backstop
+        self.live_poller.start()
+        
         logger.info("✅ Scheduler started successfully!")
         return scheduler_thread
     
@@ -118,6 +136,7 @@ class NFLPickEmScheduler:
         """Stop the scheduler"""
         logger.info("🛑 Stopping NFL PickEm Scheduler...")
         self.is_running = False
+        self.live_poller.stop()
         schedule.clear()
         logger.info("✅ Scheduler stopped")
     
@@ -128,6 +147,7 @@ class NFLPickEmScheduler:
             'current_week': self.current_week,
             'max_week': self.max_week,
             'next_jobs': [str(job) for job in schedule.jobs],
+            'live_polling': self.live_poller.get_status(),
             'last_run': datetime.now().isoformat()
         }
         return status
@@ -138,9 +158,8 @@ class NFLPickEmScheduler:
         
         try:
             # Test with Week 1 (should be completed)
-            soup = self.espn.get_week_schedule(1)
-            if soup:
-                completed_games = self.espn.parse_game_results(soup, 1)
+            completed_games = self.espn.get_week_results(1)
+            if completed_games is not None:
                 logger.info(f"✅ ESPN connection successful! Found {len(completed_games)} completed games in Week 1")
                 return True
             else:
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Score Materialization
+Keeps the UserScore / UserWeekScore tables in sync with match results
+
+Scores are adjusted incrementally whenever a match result is written and can
+be rebuilt from scratch with:
+
+    python scoring.py rebuild
+"""
+
+import sys
+from datetime import datetime
+from sqlalchemy import and_, case, func, inspect, or_
+from app import app, db, User, Match, Pick, UserScore, UserWeekScore
+from leaderboard import compute_leaderboard, invalidate_leaderboard
+from data_version import RESULTS, bump_data_version
+
+# Match columns that are part of the result payloads
+RESULT_COLUMNS = ('away_score', 'home_score', 'status', 'is_completed', 'winner_team_id')
+
+
+def pick_outcome(is_completed, winner_team_id, chosen_team_id):
+    """Return the (correct, incorrect) contribution of a single pick (ties have no winner: incorrect)"""
+    if not is_completed:
+        return 0, 0
+    if chosen_team_id == winner_team_id:
+        return 1, 0
+    return 0, 1
+
+
+def snapshot_result(match):
+    """Capture the scoring-relevant state of a match before it is changed"""
+    return bool(match.is_completed), match.winner_team_id
+
+
+def _adjust_user(user_id, week, correct_delta, incorrect_delta):
+    """Apply a delta to the season and week score rows of a user"""
+    user_score = db.session.get(UserScore, user_id)
+    if not user_score:
+        user_score = UserScore(user_id=user_id, score=0, correct_picks=0, incorrect_picks=0)
+        db.session.add(user_score)
+    user_score.correct_picks += correct_delta
+    user_score.incorrect_picks += incorrect_delta
+    user_score.score = user_score.correct_picks
+    user_score.updated_at = datetime.utcnow()
+
+    week_score = db.session.get(UserWeekScore, (user_id, week))
+    if not week_score:
+        week_score = UserWeekScore(user_id=user_id, week=week, correct_picks=0, incorrect_picks=0)
+        db.session.add(week_score)
+    week_score.correct_picks += correct_delta
+    week_score.incorrect_picks += incorrect_delta
+
+
+def result_changed(match):
+    """Whether any result column of a match has unflushed changes"""
+    attributes = inspect(match).attrs
+    return any(attributes[column].history.has_changes() for column in RESULT_COLUMNS)
+
+
+def apply_match_result(match, previous):
+    """Update materialized scores after a match result changed.
+
+    `previous` is the value returned by snapshot_result() before the match
+    was modified. The caller is responsible for committing the session.
+    Returns the number of users whose score changed.
+    """
+    # Checked before anything flushes the session
+    if not result_changed(match):
+        return 0
+    # Scores and status are part of the match payloads even when no pick changes
+    bump_data_version(RESULTS, match.updated_at)
+
+    old_completed, old_winner_team_id = previous
+    new_completed, new_winner_team_id = snapshot_result(match)
+    if (old_completed, old_winner_team_id) == (new_completed, new_winner_team_id):
+        return 0
+
+    picks = db.session.query(Pick.user_id, Pick.chosen_team_id).filter(Pick.match_id == match.id).all()
+
+    changed = 0
+    for user_id, chosen_team_id in picks:
+        old_correct, old_incorrect = pick_outcome(old_completed, old_winner_team_id, chosen_team_id)
+        new_correct, new_incorrect = pick_outcome(new_completed, new_winner_team_id, chosen_team_id)
+        if (old_correct, old_incorrect) == (new_correct, new_incorrect):
+            continue
+        _adjust_user(user_id, match.week, new_correct - old_correct, new_incorrect - old_incorrect)
+        changed += 1
+
+    # Cached leaderboards follow the RESULTS version once this commits
+    return changed
+
+
+def aggregate_week_scores():
+    """Compute (user_id, week, correct, incorrect) for all picks in one GROUP BY query"""
+    completed = Match.is_completed == True  # noqa: E712 (SQL expression)
+    correct = and_(completed, Pick.chosen_team_id == Match.winner_team_id)
+    incorrect = and_(completed, or_(Match.winner_team_id.is_(None), Pick.chosen_team_id != Match.winner_team_id))
+
+    return db.session.query(
+        Pick.user_id,
+        Match.week,
+        func.sum(case((correct, 1), else_=0)),
+        func.sum(case((incorrect, 1), else_=0))
+    ).join(Match, Pick.match_id == Match.id).group_by(Pick.user_id, Match.week).all()
+
+
+def rebuild_user_scores():
+    """Recompute all materialized scores from the pick and match tables"""
+    rows = aggregate_week_scores()
+
+    UserWeekScore.query.delete()
+    UserScore.query.delete()
+
+    now = datetime.utcnow()
+    totals = {user_id: [0, 0] for (user_id,) in db.session.query(User.id).all()}
+    for user_id, week, correct, incorrect in rows:
+        correct = int(correct or 0)
+        incorrect = int(incorrect or 0)
+        db.session.add(UserWeekScore(user_id=user_id, week=week, correct_picks=correct, incorrect_picks=incorrect))
+        total = totals.setdefault(user_id, [0, 0])
+        total[0] += correct
+        total[1] += incorrect
+
+    for user_id, (correct, incorrect) in totals.items():
+        db.session.add(UserScore(
+            user_id=user_id,
+            score=correct,
+            correct_picks=correct,
+            incorrect_picks=incorrect,
+            updated_at=now
+        ))
+
+    bump_data_version(RESULTS, now)
+    db.session.commit()
+    invalidate_leaderboard()
+    return len(totals)
+
+
+def main():
+    """Command line entry point"""
+    command = sys.argv[1] if len(sys.argv) > 1 else 'rebuild'
+    if command != 'rebuild':
+        print(f"Unknown command: {command}")
+        print("Usage: python scoring.py rebuild")
+        sys.exit(1)
+
+    with app.app_context():
+        users = rebuild_user_scores()
+        print(f"Rebuilt scores for {users} users")
+        for entry in compute_leaderboard().entries:
+            print(f"  {entry['rank']}. {entry['username']}: {entry['score']}")
+
+
+if __name__ == "__main__":
+    main()
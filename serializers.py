@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Serializers
+Builds team / match / pick JSON payloads without per-row lazy loading
+
+Model.to_dict() methods resolve every relationship lazily, which turns a
+list of picks into hundreds of queries. The helpers here load everything
+up front (teams from the registry, eager-loaded matches and users) and produce
+exactly the same dictionaries as the to_dict() methods.
+"""
+
+from sqlalchemy.orm import joinedload, selectinload
+from app import db, Pick, UserScore
+from match_times import is_started, now_epoch, start_vienna_iso
+from team_registry import team_registry
+
+
+def load_team_map():
+    """Return {team_id: team_dict} from the process-wide team registry"""
+    return team_registry.team_map()
+
+
+def serialize_match(match, teams, now=None):
+    """Same payload as Match.to_dict(), using a preloaded team map.
+
+    `now` (epoch seconds) defaults to the request clock of match_times.
+    """
+    winner_team = teams.get(match.winner_team_id) if match.winner_team_id else None
+    return {
+        'id': match.id,
+        'week': match.week,
+        'home_team': teams[match.home_team_id],
+        'away_team': teams[match.away_team_id],
+        'start_time': match.start_time.isoformat(),
+        'start_time_vienna': start_vienna_iso(match.start_time),
+        'is_completed': match.is_completed,
+        'is_game_started': is_started(match.start_time, now),
+        'home_score': match.home_score,
+        'away_score': match.away_score,
+        'status': match.status,
+        'winner': winner_team['name'] if winner_team else None,
+        'updated_at': match.updated_at.isoformat() if match.updated_at else None,
+        'winner_team': winner_team
+    }
+
+
+def serialize_matches(matches, teams=None):
+    """Serialize a list of matches using the cached team map"""
+    if teams is None:
+        teams = load_team_map()
+    now = now_epoch()
+    return [serialize_match(match, teams, now) for match in matches]
+
+
+def serialize_user(user, scores, include_score=True):
+    """Same payload as User.to_dict(), using preloaded scores"""
+    data = {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'is_admin': user.is_admin
+    }
+    if include_score:
+        data['score'] = scores.get(user.id, 0)
+    return data
+
+
+def _is_correct(pick):
+    if not pick.match.is_completed:
+        return False
+    return pick.chosen_team_id == pick.match.winner_team_id
+
+
+def serialize_picks(picks, teams=None, include_user_score=True):
+    """Serialize picks loaded with pick_query() (same payload as Pick.to_dict())"""
+    if teams is None:
+        teams = load_team_map()
+
+    scores = {}
+    if include_user_score:
+        user_ids = {pick.user_id for pick in picks}
+        if user_ids:
+            scores = dict(db.session.query(UserScore.user_id, UserScore.score).filter(
+                UserScore.user_id.in_(user_ids)
+            ).all())
+
+    users = {}
+    matches = {}
+    payload = []
+    now = now_epoch()
+    for pick in picks:
+        if pick.user_id not in users:
+            users[pick.user_id] = serialize_user(pick.user, scores, include_user_score)
+        if pick.match_id not in matches:
+            matches[pick.match_id] = serialize_match(pick.match, teams, now)
+        payload.append({
+            'id': pick.id,
+            'user': users[pick.user_id],
+            'match': matches[pick.match_id],
+            'chosen_team': teams[pick.chosen_team_id],
+            'is_correct': _is_correct(pick)
+        })
+    return payload
+
+
+def serialize_pick(pick, teams=None, include_user_score=True):
+    """Serialize a single pick"""
+    return serialize_picks([pick], teams, include_user_score)[0]
+
+
+def pick_query():
+    """Pick query with match and user eagerly loaded"""
+    return Pick.query.options(joinedload(Pick.match), selectinload(Pick.user))
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Season Simulator
+Monte Carlo estimate of every player's final standing
+
+All matches that are not completed and carry a pick (an existing one or one
+made by the pick policy) are drawn at once for a batch of simulated seasons
+as a (runs x matches) boolean matrix. Home and away pick matrices turn that
+into final scores for every user with two matrix products, and finishing
+positions are counted with one sort per batch, so 100k seasons for 50 users
+take well under a second.
+
+Results are cached per policy and recomputed when the picks or results
+data versions change. The simulation runs outside the cache lock; requests
+arriving meanwhile for the same policy and versions wait for that run
+instead of starting their own:
+
+    python simulation.py [favorite|path] [runs]
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+import numpy as np
+from app import app, db, Match, Pick
+from data_version import PICKS, RESULTS, get_data_versions
+from feasibility import check_feasibility, load_open_matches
+from leaderboard import compute_leaderboard
+from pick_rules import MAX_WINNER_USES, load_season_states
+
+SIMULATION_RUNS = 100000
+# Seasons simulated per matrix batch (bounds memory to a few MB per batch)
+SIMULATION_BATCH = 20000
+# Added to the home team's win probability
+HOME_FIELD_EDGE = 0.06
+# Pseudo-games at .500 mixed into every team's record
+PRIOR_GAMES = 4
+POLICIES = ('favorite', 'path')
+DEFAULT_POLICY = 'favorite'
+
+_cache_lock = threading.Lock()
+_cache = {}  # policy: (data versions, Future of the SimulationResult)
+
+
+class SimulationResult:
+    """Finishing-position distribution per user"""
+
+    def __init__(self, policy, runs, entries, simulated_matches, elapsed):
+        # entries: dicts with id, username, score, expected_score and positions
+        self.policy = policy
+        self.runs = runs
+        self.entries = entries
+        self.simulated_matches = simulated_matches
+        self.elapsed = elapsed
+        self.generated_at = datetime.utcnow()
+
+    def to_dict(self):
+        return {
+            'policy': self.policy,
+            'runs': self.runs,
+            'simulated_matches': self.simulated_matches,
+            'generated_at': self.generated_at.isoformat(),
+            'elapsed_ms': round(self.elapsed * 1000),
+            'standings': self.entries
+        }
+
+
+def team_strengths():
+    """Smoothed win rate of every team from the completed matches, in one query"""
+    records = {}
+    rows = db.session.query(Match.home_team_id, Match.away_team_id, Match.winner_team_id).filter(
+        Match.is_completed == True  # noqa: E712 (SQL expression)
+    ).all()
+    for home_team_id, away_team_id, winner_team_id in rows:
+        for team_id in (home_team_id, away_team_id):
+            record = records.setdefault(team_id, [0.0, 0])
+            record[1] += 1
+            if winner_team_id == team_id:
+                record[0] += 1
+            elif winner_team_id is None:
+                record[0] += 0.5
+    return {
+        team_id: (wins + PRIOR_GAMES / 2) / (games + PRIOR_GAMES)
+        for team_id, (wins, games) in records.items()
+    }
+
+
+def home_win_probability(strengths, home_team_id, away_team_id):
+    """Log5 estimate from both teams' win rates plus home field"""
+    home = strengths.get(home_team_id, 0.5)
+    away = strengths.get(away_team_id, 0.5)
+    probability = home * (1 - away) / (home * (1 - away) + away * (1 - home))
+    return min(0.95, max(0.05, probability + HOME_FIELD_EDGE))
+
+
+def favorite_path(state, open_matches, probabilities):
+    """Greedy policy: each open week, the legal pick with the best win probability.
+
+    Returns [(match_id, team_id)]; weeks without a legal pick are skipped.
+    """
+    picked_weeks = {week for (_, _, week) in state.picks.values()}
+    winner_counts = {team_id: usage_count for team_id, (_, usage_count) in state.winner_usage.items()}
+    loser_used = {team_id for team_id, _ in state.loser_usage}
+    eliminated = set(state.eliminated)
+
+    by_week = {}
+    for match_id, week, home_team_id, away_team_id in open_matches:
+        if week not in picked_weeks:
+            by_week.setdefault(week, []).append((match_id, home_team_id, away_team_id))
+
+    path = []
+    for week in sorted(by_week):
+        best = None
+        for match_id, home_team_id, away_team_id in by_week[week]:
+            home_probability = probabilities[match_id]
+            for winner, loser, probability in ((home_team_id, away_team_id, home_probability),
+                                               (away_team_id, home_team_id, 1 - home_probability)):
+                if (winner in eliminated or loser in loser_used
+                        or winner_counts.get(winner, 0) >= MAX_WINNER_USES):
+                    continue
+                if best is None or probability > best[0]:
+                    best = (probability, match_id, winner, loser)
+        if best is None:
+            continue
+
+        _, match_id, winner, loser = best
+        path.append((match_id, winner))
+        winner_counts[winner] = winner_counts.get(winner, 0) + 1
+        loser_used.add(loser)
+        eliminated.add(loser)
+        if winner_counts[winner] >= MAX_WINNER_USES:
+            eliminated.add(winner)
+    return path
+
+
+def policy_path(policy, state, open_matches, probabilities):
+    """Future picks of a user under a pick policy as [(match_id, team_id)]"""
+    if policy == 'path':
+        # A legal path through every open week; greedy if none was found
+        result = check_feasibility(state, open_matches)
+        if result.feasible:
+            return [(step.match_id, step.team_id) for step in result.path]
+    return favorite_path(state, open_matches, probabilities)
+
+
+def finishing_positions(scores):
+    """Position of every user in every run (1 + users with a strictly higher score).
+
+    scores: (runs x users) integer array. Rows are offset so that one sort
+    and one searchsorted over the flattened array rank all runs at once.
+    """
+    runs, users = scores.shape
+    span = int(scores.max()) + 1 if scores.size else 1
+    offset = (np.arange(runs, dtype=np.int64) * span)[:, None]
+    flat = (scores + offset).ravel()
+    ordered = np.sort(flat)
+    not_higher = np.searchsorted(ordered, flat, side='right').reshape(runs, users) - offset // span * users
+    return users - not_higher + 1
+
+
+def simulate_standings(policy=DEFAULT_POLICY, runs=SIMULATION_RUNS, seed=None):
+    """Run the Monte Carlo simulation and return a SimulationResult"""
+    started = time.perf_counter()
+    standings = compute_leaderboard().entries
+    users = [entry['id'] for entry in standings]
+    user_index = {user_id: index for index, user_id in enumerate(users)}
+
+    remaining = db.session.query(Match.id, Match.home_team_id, Match.away_team_id).filter(
+        Match.is_completed.isnot(True)
+    ).all()
+    strengths = team_strengths()
+    probabilities = {
+        match_id: home_win_probability(strengths, home_team_id, away_team_id)
+        for match_id, home_team_id, away_team_id in remaining
+    }
+    home_teams = {match_id: home_team_id for match_id, home_team_id, _ in remaining}
+
+    # Existing picks on matches that are still to be decided
+    picks = db.session.query(Pick.user_id, Pick.match_id, Pick.chosen_team_id).join(
+        Match, Pick.match_id == Match.id
+    ).filter(Match.is_completed.isnot(True)).all()
+    planned = [(user_id, match_id, team_id) for user_id, match_id, team_id in picks if user_id in user_index]
+
+    open_matches = load_open_matches()
+    states = load_season_states(users)
+    for user_id in users:
+        for match_id, team_id in policy_path(policy, states[user_id], open_matches, probabilities):
+            planned.append((user_id, match_id, team_id))
+
+    # Only matches somebody picked can change a score
+    columns = {}
+    for _, match_id, _ in planned:
+        columns.setdefault(match_id, len(columns))
+    home_picks = np.zeros((len(columns), len(users)), dtype=np.float32)
+    away_picks = np.zeros((len(columns), len(users)), dtype=np.float32)
+    for user_id, match_id, team_id in planned:
+        target = home_picks if team_id == home_teams[match_id] else away_picks
+        target[columns[match_id], user_index[user_id]] = 1
+    match_probabilities = np.array(
+        [probabilities[match_id] for match_id in columns], dtype=np.float32
+    )
+    base_scores = np.array([entry['score'] or 0 for entry in standings], dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    position_counts = np.zeros((len(users), len(users) + 1), dtype=np.int64)
+    score_sum = np.zeros(len(users), dtype=np.float64)
+    done = 0
+    while done < runs and users:
+        batch = min(SIMULATION_BATCH, runs - done)
+        home_wins = (rng.random((batch, len(columns)), dtype=np.float32) < match_probabilities).astype(np.float32)
+        gained = home_wins @ home_picks + (1 - home_wins) @ away_picks
+        scores = base_scores + np.rint(gained).astype(np.int64)
+        positions = finishing_positions(scores)
+
+        flat_index = (np.arange(len(users))[None, :] * (len(users) + 1) + positions).ravel()
+        position_counts += np.bincount(flat_index, minlength=position_counts.size).reshape(position_counts.shape)
+        score_sum += scores.sum(axis=0)
+        done += batch
+
+    entries = []
+    for index, entry in enumerate(standings):
+        distribution = position_counts[index, 1:] / runs if runs else position_counts[index, 1:]
+        entries.append({
+            'id': entry['id'],
+            'username': entry['username'],
+            'score': entry['score'],
+            'expected_score': round(score_sum[index] / runs, 2) if runs else entry['score'],
+            'first_place_probability': round(float(distribution[0]), 4) if users else 0.0,
+            'positions': [round(float(share), 4) for share in distribution]
+        })
+    entries.sort(key=lambda item: (-item['first_place_probability'], -item['expected_score'], item['id']))
+
+    return SimulationResult(policy, runs, entries, len(columns), time.perf_counter() - started)
+
+
+def get_simulated_standings(policy=DEFAULT_POLICY):
+    """Cached SimulationResult for a policy, recomputed once picks or results change"""
+    versions = get_data_versions([PICKS, RESULTS])
+    key = tuple(sorted((scope, version) for scope, (version, _) in versions.items()))
+
+    with _cache_lock:
+        cached = _cache.get(policy)
+        shared = cached is not None and cached[0] == key
+        if shared:
+            future = cached[1]
+        else:
+            future = Future()
+            _cache[policy] = (key, future)
+    if shared:
+        return future.result()
+
+    try:
+        # Seeded from the data versions so unchanged data gives identical numbers
+        result = simulate_standings(policy, seed=sum(version for _, version in key))
+    except Exception as e:
+        future.set_exception(e)
+        with _cache_lock:
+            if _cache.get(policy, (None, None))[1] is future:
+                del _cache[policy]
+        raise
+    future.set_result(result)
+    return result
+
+
+def main():
+    """Command line entry point"""
+    policy = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_POLICY
+    if policy not in POLICIES:
+        print(f"Unknown policy: {policy}")
+        print(f"Usage: python simulation.py [{'|'.join(POLICIES)}] [runs]")
+        sys.exit(1)
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else SIMULATION_RUNS
+
+    with app.app_context():
+        result = simulate_standings(policy, runs)
+        print(f"{result.runs} seasons, {result.simulated_matches} matches, {result.elapsed:.2f}s")
+        for entry in result.entries:
+            print(f"  {entry['username']}: {entry['first_place_probability']:.1%} first, "
+                  f"expected score {entry['expected_score']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,15 @@ from flask import Flask, render_template, jsonify, request, session, redirect, u
 from flask_cors import CORS
 import os
 import json
+import sys
 import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 import pytz
 
+# week_calendar.py lives in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from week_calendar import WeekCalendar
+
 app = Flask(__name__, static_folder='static')
 CORS(app)
 app.secret_key = 'nfl_pickem_secret_key'
@@ -214,10 +219,20 @@ def get_user_score(user_id):
     picks = get_picks_by_user(user_id)
     return sum(1 for pick in picks if pick.get('is_correct', False))
 
-def get_current_week():
-    # In a real app, this would be determined by the current date
-    # For now, we'll hardcode it to week 2
-    return 2
+def load_schedule():
+    """(week, first kickoff, last kickoff) of every week in db.json"""
+    kickoffs = {}
+    for match in get_db()['matches']:
+        start_time = datetime.datetime.fromisoformat(match['start_time'])
+        first, last = kickoffs.get(match['week'], (start_time, start_time))
+        kickoffs[match['week']] = (min(first, start_time), max(last, start_time))
+    return [(week, first, last) for week, (first, last) in kickoffs.items()]
+
+# Same calendar as the main app, fed from db.json
+week_calendar = WeekCalendar(load_schedule)
+
+def get_current_week(now=None):
+    return week_calendar.current_week(now) or 1
 
 def convert_to_vienna_time(utc_time_str):
     # Parse the UTC time string
@@ -3,7 +3,7 @@ const API_BASE = '';
 
 // Global variables
 let currentUser = null;
-let currentWeek = 2; // Default to week 2
+let currentWeek = 1; // Replaced by the server's current week on startup
 
 // Initialize the app
 document.addEventListener('DOMContentLoaded', function() {
@@ -16,8 +16,12 @@ async function initializeApp() {
     setupModal();
     setupLoginForm();
     await checkAuthStatus();
-    await getCurrentWeek();
-    loadDashboardData();
+    
+    // Logged-in users get the current week with the dashboard payload
+    if (!currentUser) {
+        await getCurrentWeek();
+    }
+    await loadDashboardData();
 }
 
 // Set up navigation
@@ -281,113 +285,96 @@ async function loadDashboardData() {
     }
     
     try {
-        // Get user score
-        const scoreResponse = await fetch(`${API_BASE}/api/picks/score?user_id=${currentUser.id}`);
+        // Score, rank, recent picks and eliminated teams in one request
+        const response = await fetch(`${API_BASE}/api/dashboard?user_id=${currentUser.id}`);
         
-        if (scoreResponse.ok) {
-            const scoreData = await scoreResponse.json();
-            
-            // Update user score
-            document.getElementById('user-score').textContent = scoreData.user.score;
-            
-            // Update opponent scores
-            let opponentHtml = '';
-            
-            if (scoreData.opponents.length > 0) {
-                scoreData.opponents.forEach(opponent => {
-                    opponentHtml += `
-                        <div class="opponent-score">
-                            <span class="opponent-name">${opponent.username}:</span>
-                            <span class="opponent-points">${opponent.score} Punkte</span>
-                        </div>
-                    `;
-                });
-            } else {
-                opponentHtml = 'Keine Gegenspieler gefunden';
-            }
-            
-            document.getElementById('opponent-scores').innerHTML = opponentHtml;
-        } else {
+        if (!response.ok) {
+            document.getElementById('user-rank').textContent = '-';
             document.getElementById('opponent-scores').innerHTML = 'Fehler beim Laden der Punkte';
+            document.getElementById('recent-picks').innerHTML = 'Fehler beim Laden der Picks';
+            document.getElementById('eliminated-teams').innerHTML = 'Fehler beim Laden der eliminierten Teams';
+            return;
         }
         
-        // Get user rank
-        const rankResponse = await fetch(`${API_BASE}/api/user/rank?user_id=${currentUser.id}`);
+        const data = await response.json();
+        
+        // Update current week
+        currentWeek = data.current_week;
+        document.getElementById('current-week').textContent = currentWeek;
+        
+        // Update user score and rank
+        document.getElementById('user-score').textContent = data.user.score;
+        document.getElementById('user-rank').textContent = `Du bist aktuell auf Platz ${data.user.rank}`;
         
-        if (rankResponse.ok) {
-            const rankData = await rankResponse.json();
-            document.getElementById('user-rank').textContent = `Du bist aktuell auf Platz ${rankData.rank}`;
+        // Update opponent scores
+        let opponentHtml = '';
+        
+        if (data.opponents.length > 0) {
+            data.opponents.forEach(opponent => {
+                opponentHtml += `
+                    <div class="opponent-score">
+                        <span class="opponent-name">${opponent.username}:</span>
+                        <span class="opponent-points">${opponent.score} Punkte</span>
+                    </div>
+                `;
+            });
         } else {
-            document.getElementById('user-rank').textContent = '-';
+            opponentHtml = 'Keine Gegenspieler gefunden';
         }
         
-        // Get recent picks
-        const picksResponse = await fetch(`${API_BASE}/api/picks/recent?user_id=${currentUser.id}`);
+        document.getElementById('opponent-scores').innerHTML = opponentHtml;
         
-        if (picksResponse.ok) {
-            const picksData = await picksResponse.json();
+        // Update recent picks
+        if (data.recent_picks.length > 0) {
+            let picksHtml = '';
             
-            if (picksData.picks && picksData.picks.length > 0) {
-                let picksHtml = '';
+            data.recent_picks.forEach(pick => {
+                let resultText = 'Ausstehend';
+                let resultClass = 'pending';
                 
-                picksData.picks.forEach(pick => {
-                    let resultText = 'Ausstehend';
-                    let resultClass = 'pending';
-                    
-                    if (pick.is_completed) {
-                        if (pick.is_correct) {
-                            resultText = 'Richtig';
-                            resultClass = 'correct';
-                        } else {
-                            resultText = 'Falsch';
-                            resultClass = 'incorrect';
-                        }
+                if (pick.is_completed) {
+                    if (pick.is_correct) {
+                        resultText = 'Richtig';
+                        resultClass = 'correct';
+                    } else {
+                        resultText = 'Falsch';
+                        resultClass = 'incorrect';
                     }
-                    
-                    picksHtml += `
-                        <div class="recent-pick">
-                            <img src="${pick.team_logo}" alt="${pick.team}" class="team-logo-small">
-                            <div class="recent-pick-info">
-                                <div class="recent-pick-week">Woche ${pick.week}</div>
-                                <div class="recent-pick-team">${pick.team}</div>
-                            </div>
-                            <div class="recent-pick-result ${resultClass}">${resultText}</div>
-                        </div>
-                    `;
-                });
+                }
                 
-                document.getElementById('recent-picks').innerHTML = picksHtml;
-            } else {
-                document.getElementById('recent-picks').innerHTML = 'Noch keine Picks gemacht';
-            }
+                picksHtml += `
+                    <div class="recent-pick">
+                        <img src="${pick.team_logo}" alt="${pick.team}" class="team-logo-small">
+                        <div class="recent-pick-info">
+                            <div class="recent-pick-week">Woche ${pick.week}</div>
+                            <div class="recent-pick-team">${pick.team}</div>
+                        </div>
+                        <div class="recent-pick-result ${resultClass}">${resultText}</div>
+                    </div>
+                `;
+            });
+            
+            document.getElementById('recent-picks').innerHTML = picksHtml;
         } else {
-            document.getElementById('recent-picks').innerHTML = 'Fehler beim Laden der Picks';
+            document.getElementById('recent-picks').innerHTML = 'Noch keine Picks gemacht';
         }
         
-        // Get eliminated teams
-        const eliminatedResponse = await fetch(`${API_BASE}/api/picks/eliminated?user_id=${currentUser.id}`);
-        
-        if (eliminatedResponse.ok) {
-            const eliminatedData = await eliminatedResponse.json();
+        // Update eliminated teams
+        if (data.eliminated_teams.length > 0) {
+            let eliminatedHtml = '';
             
-            if (eliminatedData.eliminated_teams && eliminatedData.eliminated_teams.length > 0) {
-                let eliminatedHtml = '';
-                
-                eliminatedData.eliminated_teams.forEach(team => {
-                    eliminatedHtml += `
-                        <div class="eliminated-team">
-                            <img src="${team.logo_url}" alt="${team.name}" class="eliminated-team-logo team-logo-small">
-                            <div class="eliminated-team-name">${team.name}</div>
-                        </div>
-                    `;
-                });
-                
-                document.getElementById('eliminated-teams').innerHTML = eliminatedHtml;
-            } else {
-                document.getElementById('eliminated-teams').innerHTML = 'Keine eliminierten Teams';
-            }
+            data.eliminated_teams.forEach(team => {
+                eliminatedHtml += `
+                    <div class="eliminated-team">
+                        <img src="${team.logo_url}" alt="${team.name}" class="eliminated-team-logo team-logo-small">
+                        <div class="eliminated-team-name">${team.name}</div>
+                    </div>
+                `;
+            });
+            
+            document.getElementById('eliminated-teams').innerHTML = eliminatedHtml;
         } else {
-            document.getElementById('eliminated-teams').innerHTML = 'Fehler beim Laden der eliminierten Teams';
+            document.getElementById('eliminated-teams').innerHTML = 'Keine eliminierten Teams';
         }
     } catch (error) {
         console.error('Error loading dashboard data:', error);
@@ -482,40 +469,22 @@ async function loadMatchesForWeek(week) {
         const hasWeekPick = picksData.picks.length > 0;
         const weekPickMatch = hasWeekPick ? picksData.picks[0].match : null;
         
-        // Get eliminated teams
-        const eliminatedResponse = await fetch(`${API_BASE}/api/picks/eliminated?user_id=${currentUser.id}`);
-        
-        if (!eliminatedResponse.ok) {
-            document.getElementById('matches-container').innerHTML = 'Fehler beim Laden der eliminierten Teams';
-            hideLoading();
-            return;
-        }
-        
-        const eliminatedData = await eliminatedResponse.json();
-        const eliminatedTeamIds = eliminatedData.eliminated_teams.map(team => team.id);
-        
-        // Get team winner usage
-        const teamUsageResponse = await fetch(`${API_BASE}/api/picks/team-usage?user_id=${currentUser.id}`);
+        // Get eliminated teams, winner usage and loser usage in one request
+        const availabilityResponse = await fetch(`${API_BASE}/api/picks/availability?user_id=${currentUser.id}`);
         
-        if (!teamUsageResponse.ok) {
+        if (!availabilityResponse.ok) {
             document.getElementById('matches-container').innerHTML = 'Fehler beim Laden der Team-Nutzung';
             hideLoading();
             return;
         }
         
-        const teamUsageData = await teamUsageResponse.json();
+        const availabilityData = await availabilityResponse.json();
+        const eliminatedTeamIds = availabilityData.eliminated_teams.map(team => team.id);
         const teamUsageMap = {};
-        teamUsageData.team_usage.forEach(usage => {
+        availabilityData.team_usage.forEach(usage => {
             teamUsageMap[usage.team.id] = usage;
         });
-        
-        // Get team loser usage (NEW)
-        const loserUsageResponse = await fetch(`${API_BASE}/api/picks/loser-usage?user_id=${currentUser.id}`);
-        let loserUsageTeamIds = [];
-        if (loserUsageResponse.ok) {
-            const loserUsageData = await loserUsageResponse.json();
-            loserUsageTeamIds = loserUsageData.loser_teams.map(team => team.id);
-        }
+        const loserUsageTeamIds = availabilityData.loser_teams.map(team => team.id);
         
         // Create HTML for matches
         let matchesHtml = '';
@@ -800,67 +769,24 @@ async function loadAllPicksData() {
     try {
         showLoading();
         
-        // Get all users
-        const usersResponse = await fetch(`${API_BASE}/api/leaderboard`);
-        
-        if (!usersResponse.ok) {
-            document.getElementById('all-picks-container').innerHTML = 'Fehler beim Laden der Spieler';
-            hideLoading();
-            return;
-        }
-        
-        const usersData = await usersResponse.json();
-        const users = usersData.leaderboard;
-        
-        // Get all matches
-        const matchesResponse = await fetch(`${API_BASE}/api/matches`);
+        // Privacy is applied on the server; hidden picks are never sent
+        const hideCurrentPicks = document.getElementById('hide-current-picks').checked;
+        const response = await fetch(`${API_BASE}/api/picks/matrix?hide_current=${hideCurrentPicks ? 1 : 0}`);
         
-        if (!matchesResponse.ok) {
-            document.getElementById('all-picks-container').innerHTML = 'Fehler beim Laden der Matches';
+        if (!response.ok) {
+            document.getElementById('all-picks-container').innerHTML = 'Fehler beim Laden der Picks';
             hideLoading();
             return;
         }
         
-        const matchesData = await matchesResponse.json();
-        
-        // Group matches by week
-        const matchesByWeek = {};
-        matchesData.matches.forEach(match => {
-            if (!matchesByWeek[match.week]) {
-                matchesByWeek[match.week] = [];
-            }
-            matchesByWeek[match.week].push(match);
-        });
-        
-        // Get picks for all users
-        const allPicks = {};
-        
-        for (const user of users) {
-            const picksResponse = await fetch(`${API_BASE}/api/picks?user_id=${user.id}`);
-            
-            if (picksResponse.ok) {
-                const picksData = await picksResponse.json();
-                allPicks[user.id] = picksData.picks;
-            }
-        }
+        const data = await response.json();
         
         // Create HTML for all picks
         let allPicksHtml = '';
         
-        // Check privacy setting
-        const hideCurrentPicks = document.getElementById('hide-current-picks').checked;
-        const currentWeek = 2; // Current active week
-        
-        // Sort weeks in descending order
-        const weeks = Object.keys(matchesByWeek).sort((a, b) => b - a);
-        
-        for (const week of weeks) {
-            const weekNum = parseInt(week);
-            const isCurrentWeek = weekNum === currentWeek;
-            const weekCompleted = matchesByWeek[week].every(match => match.is_completed);
-            
-            // Skip current week if privacy is enabled and week is not completed
-            if (hideCurrentPicks && isCurrentWeek && !weekCompleted) {
+        // Weeks arrive in descending order; grid columns follow data.weeks
+        data.weeks.forEach((week, column) => {
+            if (data.hidden_weeks.includes(week)) {
                 allPicksHtml += `
                     <div class="all-picks-week">
                         <h3>Woche ${week}</h3>
@@ -870,12 +796,24 @@ async function loadAllPicksData() {
                         </div>
                     </div>
                 `;
-                continue;
+                return;
+            }
+            
+            let consensusHtml = '';
+            if (data.consensus[week]) {
+                const consensusNames = data.consensus[week].map(teamId => data.teams[teamId].name).join(', ');
+                consensusHtml = `
+                    <div class="privacy-notice">
+                        <i class="fas fa-users"></i>
+                        Konsens: ${consensusNames}
+                    </div>
+                `;
             }
             
             allPicksHtml += `
                 <div class="all-picks-week">
                     <h3>Woche ${week}</h3>
+                    ${consensusHtml}
                     <table class="all-picks-table">
                         <thead>
                             <tr>
@@ -887,35 +825,40 @@ async function loadAllPicksData() {
                         <tbody>
             `;
             
-            for (const user of users) {
-                const userPicks = allPicks[user.id] || [];
-                const weekPicks = userPicks.filter(pick => pick.match.week === parseInt(week));
+            data.users.forEach((user, row) => {
+                const cell = data.grid[row][column];
                 
-                if (weekPicks.length > 0) {
-                    const pick = weekPicks[0];
+                if (Array.isArray(cell)) {
+                    const team = data.teams[cell[0]];
                     let resultText = 'Ausstehend';
                     let resultClass = 'pending';
                     
-                    if (pick.match.is_completed) {
-                        if (pick.is_correct) {
-                            resultText = 'Richtig';
-                            resultClass = 'correct';
-                        } else {
-                            resultText = 'Falsch';
-                            resultClass = 'incorrect';
-                        }
+                    if (cell[1] === true) {
+                        resultText = 'Richtig';
+                        resultClass = 'correct';
+                    } else if (cell[1] === false) {
+                        resultText = 'Falsch';
+                        resultClass = 'incorrect';
                     }
                     
                     allPicksHtml += `
                         <tr>
                             <td>${user.username}</td>
                             <td>
-                                <img src="${pick.chosen_team.logo_url}" alt="${pick.chosen_team.name}" class="all-picks-logo team-logo-small">
-                                ${pick.chosen_team.name}
+                                <img src="${team.logo_url}" alt="${team.name}" class="all-picks-logo team-logo-small">
+                                ${team.name}
                             </td>
                             <td class="${resultClass}">${resultText}</td>
                         </tr>
                     `;
+                } else if (cell === 0) {
+                    allPicksHtml += `
+                        <tr>
+                            <td>${user.username}</td>
+                            <td><i class="fas fa-eye-slash"></i> Verborgen</td>
+                            <td>-</td>
+                        </tr>
+                    `;
                 } else {
                     allPicksHtml += `
                         <tr>
@@ -925,14 +868,14 @@ async function loadAllPicksData() {
                         </tr>
                     `;
                 }
-            }
+            });
             
             allPicksHtml += `
                         </tbody>
                     </table>
                 </div>
             `;
-        }
+        });
         
         document.getElementById('all-picks-container').innerHTML = allPicksHtml;
     } catch (error) {
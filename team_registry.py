@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Team Registry
+Process-wide, read-only cache of the 32 NFL teams
+
+Teams never change during a season, so they are loaded once and looked up
+by id, name, our abbreviation or ESPN abbreviation without touching the
+database. The cache lives in each process, so a running web server picks
+up a re-initialized team table (init_db_*.py) on restart.
+"""
+
+import hashlib
+import json
+import threading
+from collections import namedtuple
+from app import Team
+
+# ESPN abbreviations mapped to our team names
+ESPN_TEAM_NAMES = {
+    'ARI': 'Arizona Cardinals',
+    'ATL': 'Atlanta Falcons',
+    'BAL': 'Baltimore Ravens',
+    'BUF': 'Buffalo Bills',
+    'CAR': 'Carolina Panthers',
+    'CHI': 'Chicago Bears',
+    'CIN': 'Cincinnati Bengals',
+    'CLE': 'Cleveland Browns',
+    'DAL': 'Dallas Cowboys',
+    'DEN': 'Denver Broncos',
+    'DET': 'Detroit Lions',
+    'GB': 'Green Bay Packers',
+    'HOU': 'Houston Texans',
+    'IND': 'Indianapolis Colts',
+    'JAX': 'Jacksonville Jaguars',
+    'KC': 'Kansas City Chiefs',
+    'LV': 'Las Vegas Raiders',
+    'LAC': 'Los Angeles Chargers',
+    'LAR': 'Los Angeles Rams',
+    'MIA': 'Miami Dolphins',
+    'MIN': 'Minnesota Vikings',
+    'NE': 'New England Patriots',
+    'NO': 'New Orleans Saints',
+    'NYG': 'New York Giants',
+    'NYJ': 'New York Jets',
+    'PHI': 'Philadelphia Eagles',
+    'PIT': 'Pittsburgh Steelers',
+    'SF': 'San Francisco 49ers',
+    'SEA': 'Seattle Seahawks',
+    'TB': 'Tampa Bay Buccaneers',
+    'TEN': 'Tennessee Titans',
+    'WSH': 'Washington Commanders'
+}
+
+
+class TeamInfo(namedtuple('TeamInfo', ['id', 'name', 'abbreviation', 'logo_url'])):
+    """Detached, immutable copy of a Team row"""
+    __slots__ = ()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'abbreviation': self.abbreviation,
+            'logo_url': self.logo_url
+        }
+
+
+class TeamRegistry:
+    """Lazily loaded, thread-safe team lookup tables"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._by_id = {}
+        self._by_name = {}
+        self._by_abbreviation = {}
+        self._by_espn_abbreviation = {}
+        self._dicts = {}
+        self._bits = {}
+        self._payload = b''
+        self._etag = ''
+
+    def load(self):
+        """Load all teams (requires an app context)"""
+        teams = [
+            TeamInfo(team.id, team.name, team.abbreviation, team.logo_url)
+            for team in Team.query.order_by(Team.id).all()
+        ]
+        by_name = {team.name: team for team in teams}
+
+        payload = json.dumps({'teams': [team.to_dict() for team in teams]}, separators=(',', ':')).encode('utf-8')
+
+        with self._lock:
+            self._by_id = {team.id: team for team in teams}
+            self._by_name = by_name
+            self._by_abbreviation = {team.abbreviation: team for team in teams}
+            self._by_espn_abbreviation = {
+                espn_abbr: by_name[name]
+                for espn_abbr, name in ESPN_TEAM_NAMES.items()
+                if name in by_name
+            }
+            self._dicts = {team.id: team.to_dict() for team in teams}
+            self._bits = {team.id: 1 << index for index, team in enumerate(teams)}
+            self._payload = payload
+            self._etag = hashlib.sha1(payload).hexdigest()
+            self._loaded = True
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def invalidate(self):
+        """Forget all cached teams; the next lookup reloads them"""
+        with self._lock:
+            self._loaded = False
+
+    def all(self):
+        """All teams ordered by id"""
+        self._ensure_loaded()
+        return list(self._by_id.values())
+
+    def get(self, team_id):
+        self._ensure_loaded()
+        return self._by_id.get(team_id)
+
+    def by_name(self, name):
+        self._ensure_loaded()
+        return self._by_name.get(name)
+
+    def by_abbreviation(self, abbreviation):
+        self._ensure_loaded()
+        return self._by_abbreviation.get(abbreviation)
+
+    def by_espn_abbreviation(self, espn_abbr):
+        self._ensure_loaded()
+        return self._by_espn_abbreviation.get(espn_abbr)
+
+    def id_for_name(self, name):
+        team = self.by_name(name)
+        return team.id if team else None
+
+    def team_map(self):
+        """{team_id: team_dict}, shared between callers - do not mutate"""
+        self._ensure_loaded()
+        return self._dicts
+
+    def bit(self, team_id):
+        """Single-bit mask of a team for availability bitsets (0 for unknown teams)"""
+        self._ensure_loaded()
+        return self._bits.get(team_id, 0)
+
+    def teams_in(self, mask):
+        """Teams whose bit is set in a mask, ordered by id"""
+        self._ensure_loaded()
+        return [self._by_id[team_id] for team_id, bit in self._bits.items() if mask & bit]
+
+    def payload(self):
+        """Pre-serialized /api/teams body and its strong ETag"""
+        self._ensure_loaded()
+        return self._payload, self._etag
+
+
+team_registry = TeamRegistry()
+
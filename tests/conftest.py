@@ -0,0 +1,13 @@
+"""
+Test setup: the modules live at the repository root and import the app,
+so the app is pointed at a throwaway SQLite file before anything imports it.
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ['PICKEM_DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='pickem-test-'), 'test.db')
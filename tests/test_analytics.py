@@ -0,0 +1,70 @@
+"""
+Pick analytics: the endpoints read the summary tables
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+NOW = datetime(2025, 9, 20, 12, 0)
+
+
+@pytest.fixture
+def week_picks():
+    """Three users picking in week 1 (two games played, one still to come); returns (user ids, team ids)"""
+    from app import (app, db, User, Team, Match, Pick, WeekTeamPickCount, WeekUserPick, WeekPickAgreement,
+                     DataVersion)
+    from analytics import rebuild_analytics
+    from leaderboard import invalidate_leaderboard
+    from team_registry import team_registry
+
+    with app.app_context():
+        db.create_all()
+        teams = [Team(name=f'Team {index}', abbreviation=f'T{index}', logo_url='') for index in range(6)]
+        users = [User(username=name, password_hash='x') for name in ('ann', 'bob', 'cid')]
+        db.session.add_all(teams + users)
+        db.session.flush()
+        played = Match(week=1, home_team_id=teams[0].id, away_team_id=teams[1].id, start_time=NOW - timedelta(days=1),
+                       status='completed', is_completed=True, winner_team_id=teams[0].id)
+        early = Match(week=1, home_team_id=teams[2].id, away_team_id=teams[3].id, start_time=NOW - timedelta(hours=2),
+                      status='in_progress')
+        later = Match(week=1, home_team_id=teams[4].id, away_team_id=teams[5].id, start_time=NOW + timedelta(days=1),
+                      status='scheduled')
+        db.session.add_all([played, early, later])
+        db.session.flush()
+        db.session.add_all([
+            Pick(user_id=users[0].id, match_id=played.id, chosen_team_id=teams[0].id),
+            Pick(user_id=users[1].id, match_id=early.id, chosen_team_id=teams[3].id),
+            Pick(user_id=users[2].id, match_id=later.id, chosen_team_id=teams[4].id),
+        ])
+        db.session.commit()
+        rebuild_analytics()
+        team_registry.invalidate()
+        invalidate_leaderboard()
+        yield [user.id for user in users], [team.id for team in teams]
+
+        db.session.rollback()
+        for model in (WeekTeamPickCount, WeekUserPick, WeekPickAgreement, Pick, Match, User, Team, DataVersion):
+            model.query.delete()
+        db.session.commit()
+        team_registry.invalidate()
+        invalidate_leaderboard()
+
+
+def test_week_analytics_from_summary_tables(week_picks):
+    from app import app, db, Pick
+    from analytics import week_analytics
+
+    user_ids, team_ids = week_picks
+    with app.app_context():
+        # Removed behind the summary tables' back: the payload must not change
+        Pick.query.delete()
+        db.session.commit()
+
+        data = week_analytics(1, now=NOW)
+        assert (data['picks'], data['hidden_picks']) == (2, 1)
+        users = {entry['user_id']: entry for entry in data['users']}
+        assert (users[user_ids[0]]['team_id'], users[user_ids[0]]['result']) == (team_ids[0], 'correct')
+        assert (users[user_ids[1]]['team_id'], users[user_ids[1]]['result']) == (team_ids[3], 'pending')
+        # Not revealed before its kickoff
+        assert users[user_ids[2]]['team_id'] is None
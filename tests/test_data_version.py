@@ -0,0 +1,26 @@
+"""
+Data version counters
+"""
+
+
+def test_bump_creates_and_increments_scope():
+    from app import app, db, DataVersion
+    from data_version import PICKS, RESULTS, bump_data_version, get_data_versions
+
+    with app.app_context():
+        db.create_all()
+        DataVersion.query.delete()
+        db.session.commit()
+
+        bump_data_version(PICKS)
+        db.session.commit()
+        bump_data_version(PICKS)
+        bump_data_version(PICKS)
+        db.session.commit()
+
+        versions = get_data_versions([PICKS, RESULTS])
+        assert versions[PICKS][0] == 3
+        assert versions[RESULTS] == (0, None)
+
+        DataVersion.query.delete()
+        db.session.commit()
@@ -0,0 +1,44 @@
+"""
+Leaderboard: revalidation of /api/leaderboard
+"""
+
+import pytest
+
+
+@pytest.fixture
+def users():
+    from app import app, db, User, DataVersion
+    from leaderboard import invalidate_leaderboard
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([User(username='first', password_hash='x'), User(username='second', password_hash='x')])
+        db.session.commit()
+        invalidate_leaderboard()
+        yield app.test_client()
+
+        db.session.rollback()
+        for model in (User, DataVersion):
+            model.query.delete()
+        db.session.commit()
+        invalidate_leaderboard()
+
+
+def test_new_and_renamed_users_reach_revalidating_clients(users, monkeypatch):
+    import leaderboard
+    from app import app, db, User
+
+    monkeypatch.setattr(leaderboard, 'LEADERBOARD_CACHE_SECONDS', 0)
+    response = users.get('/api/leaderboard')
+    etag = response.headers['ETag']
+    assert users.get('/api/leaderboard', headers={'If-None-Match': etag}).status_code == 304
+
+    # No results change: only the users differ
+    with app.app_context():
+        db.session.add(User(username='third', password_hash='x'))
+        User.query.filter_by(username='first').one().username = 'renamed'
+        db.session.commit()
+
+    response = users.get('/api/leaderboard', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert sorted(entry['username'] for entry in response.get_json()['leaderboard']) == ['renamed', 'second', 'third']
@@ -0,0 +1,93 @@
+"""
+Schema migrations and derived table checks on plain SQLite files
+"""
+
+import sqlite3
+
+from migrations import DERIVED_TABLES, derived_tables_stale
+
+
+def make_database(path, derived=True):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE "match" (id INTEGER PRIMARY KEY, is_completed BOOLEAN)')
+    conn.execute('CREATE TABLE pick (id INTEGER PRIMARY KEY, match_id INTEGER)')
+    if derived:
+        for table in DERIVED_TABLES:
+            conn.execute(f'CREATE TABLE "{table}" (id INTEGER PRIMARY KEY)')
+    conn.commit()
+    return conn
+
+
+def test_missing_tables_are_stale(tmp_path):
+    path = str(tmp_path / 'pickem.db')
+    make_database(path, derived=False).close()
+    assert derived_tables_stale(path)
+
+
+def test_empty_tables_are_stale_once_picks_are_completed(tmp_path):
+    path = str(tmp_path / 'pickem.db')
+    conn = make_database(path)
+    assert not derived_tables_stale(path)
+
+    conn.execute('INSERT INTO "match" (id, is_completed) VALUES (1, 0)')
+    conn.execute('INSERT INTO pick (match_id) VALUES (1)')
+    conn.commit()
+    # Pick counts summarize every pick, scores only completed ones
+    assert derived_tables_stale(path)
+    conn.execute('INSERT INTO week_team_pick_count (id) VALUES (1)')
+    conn.commit()
+    assert derived_tables_stale(path)
+    conn.execute('INSERT INTO week_user_pick (id) VALUES (1)')
+    conn.commit()
+    assert not derived_tables_stale(path)
+
+    conn.execute('UPDATE "match" SET is_completed = 1')
+    conn.commit()
+    assert derived_tables_stale(path)
+    conn.execute('INSERT INTO user_score (id) VALUES (1)')
+    conn.execute('INSERT INTO user_week_score (id) VALUES (1)')
+    conn.commit()
+    assert not derived_tables_stale(path)
+    conn.close()
+
+
+def test_no_database_is_not_stale(tmp_path):
+    assert not derived_tables_stale(str(tmp_path / 'missing.db'))
+    assert not derived_tables_stale(None)
+
+
+def test_duplicate_picks_are_removed_from_the_usage_tables(tmp_path):
+    from migrations import migrate_database
+
+    path = str(tmp_path / 'pickem.db')
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE "match" (id INTEGER PRIMARY KEY, week INTEGER, home_team_id INTEGER, away_team_id INTEGER,
+                              status TEXT, start_time DATETIME, is_completed BOOLEAN);
+        CREATE TABLE pick (id INTEGER PRIMARY KEY, user_id INTEGER, match_id INTEGER, chosen_team_id INTEGER);
+        CREATE TABLE team_winner_usage (id INTEGER PRIMARY KEY, user_id INTEGER, team_id INTEGER, usage_count INTEGER);
+        CREATE TABLE team_loser_usage (id INTEGER PRIMARY KEY, user_id INTEGER, team_id INTEGER, week INTEGER,
+                                       match_id INTEGER);
+        CREATE TABLE eliminated_team (id INTEGER PRIMARY KEY, user_id INTEGER, team_id INTEGER);
+
+        INSERT INTO "match" (id, week, home_team_id, away_team_id) VALUES (1, 1, 10, 20), (2, 2, 30, 10);
+        -- User 1 picked match 1 twice (home team, then away team), user 2 once
+        INSERT INTO pick (user_id, match_id, chosen_team_id) VALUES (1, 1, 10), (1, 2, 10), (1, 1, 20), (2, 1, 20);
+        INSERT INTO team_winner_usage (user_id, team_id, usage_count) VALUES (1, 10, 2), (1, 20, 1), (2, 20, 1);
+        INSERT INTO team_loser_usage (user_id, team_id, week, match_id)
+            VALUES (1, 20, 1, 1), (1, 30, 2, 2), (1, 10, 1, 1), (2, 10, 1, 1);
+        INSERT INTO eliminated_team (user_id, team_id) VALUES (1, 20), (1, 30), (1, 10), (2, 10);
+    ''')
+    conn.commit()
+
+    migrate_database(path)
+
+    assert conn.execute('SELECT user_id, match_id, chosen_team_id FROM pick ORDER BY id').fetchall() == \
+        [(1, 1, 10), (1, 2, 10), (2, 1, 20)]
+    assert sorted(conn.execute('SELECT user_id, team_id, usage_count FROM team_winner_usage')) == \
+        [(1, 10, 2), (2, 20, 1)]
+    assert sorted(conn.execute('SELECT user_id, team_id, week, match_id FROM team_loser_usage')) == \
+        [(1, 20, 1, 1), (1, 30, 2, 2), (2, 10, 1, 1)]
+    # Team 10 stays eliminated for user 1: picked as winner twice
+    assert sorted(conn.execute('SELECT user_id, team_id FROM eliminated_team')) == [(1, 10), (1, 20), (1, 30), (2, 10)]
+    conn.close()
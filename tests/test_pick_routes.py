@@ -0,0 +1,110 @@
+"""
+Pick routes: request validation before the pick rules run
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def client():
+    """Logged in test client with one future match; returns (client, match id, home team id)"""
+    from app import (app, db, User, Team, Match, Pick, TeamWinnerUsage, TeamLoserUsage,
+                     WeekTeamPickCount, WeekUserPick, WeekPickAgreement, DataVersion)
+    from team_registry import team_registry
+
+    with app.app_context():
+        db.create_all()
+        home = Team(name='Home Team', abbreviation='HOM', logo_url='')
+        away = Team(name='Away Team', abbreviation='AWY', logo_url='')
+        user = User(username='picker', password_hash='x')
+        db.session.add_all([home, away, user])
+        db.session.flush()
+        match = Match(week=1, home_team_id=home.id, away_team_id=away.id,
+                      start_time=datetime.utcnow() + timedelta(days=3), status='scheduled')
+        db.session.add(match)
+        db.session.commit()
+        team_registry.invalidate()
+
+        test_client = app.test_client()
+        with test_client.session_transaction() as flask_session:
+            flask_session['user_id'] = user.id
+        yield test_client, match.id, home.id
+
+        db.session.rollback()
+        for model in (Pick, TeamWinnerUsage, TeamLoserUsage, WeekTeamPickCount, WeekUserPick, WeekPickAgreement,
+                      Match, User, Team, DataVersion):
+            model.query.delete()
+        db.session.commit()
+        team_registry.invalidate()
+
+
+@pytest.mark.parametrize('entry', [
+    {'match_id': [1], 'chosen_team_id': 1},
+    {'match_id': 1, 'chosen_team_id': {'id': 1}},
+    {'match_id': 1.5, 'chosen_team_id': 1},
+    {'match_id': True, 'chosen_team_id': 1},
+])
+def test_batch_rejects_ids_that_are_not_integers(client, entry):
+    test_client, match_id, team_id = client
+    response = test_client.post('/api/picks/batch', json={'picks': [
+        {'match_id': match_id, 'chosen_team_id': team_id}, entry
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['index'] == 1
+
+
+def test_batch_accepts_numeric_strings(client):
+    test_client, match_id, team_id = client
+    response = test_client.post('/api/picks/batch', json={'picks': [
+        {'match_id': str(match_id), 'chosen_team_id': str(team_id)}
+    ]})
+    assert response.status_code == 200
+    assert [pick['chosen_team']['id'] for pick in response.get_json()['picks']] == [team_id]
+
+
+def test_pick_accepts_numeric_strings(client):
+    test_client, match_id, team_id = client
+    response = test_client.post('/api/picks', json={'match_id': str(match_id), 'chosen_team_id': str(team_id)})
+    assert response.status_code == 201
+    assert response.get_json()['pick']['chosen_team']['id'] == team_id
+
+
+def test_pick_rejects_ids_that_are_not_integers(client):
+    test_client, match_id, team_id = client
+    response = test_client.post('/api/picks', json={'match_id': match_id, 'chosen_team_id': 'HOM'})
+    assert response.status_code == 400
+
+
+def test_availability_is_only_reloaded_by_the_users_own_picks(client, monkeypatch):
+    import availability
+    from app import app, db, User
+
+    test_client, match_id, team_id = client
+    with test_client.session_transaction() as flask_session:
+        user_id = flask_session['user_id']
+    with app.app_context():
+        other = User(username='other picker', password_hash='x')
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+
+    loads = []
+    load_season_state = availability.load_season_state
+    monkeypatch.setattr(availability, 'load_season_state', lambda uid: loads.append(uid) or load_season_state(uid))
+    availability.invalidate_availability()
+
+    test_client.get(f'/api/picks/availability?user_id={user_id}')
+    other_client = app.test_client()
+    with other_client.session_transaction() as flask_session:
+        flask_session['user_id'] = other_id
+    assert other_client.post('/api/picks', json={'match_id': match_id, 'chosen_team_id': team_id}).status_code == 201
+    test_client.get(f'/api/picks/availability?user_id={user_id}')
+    assert loads == [user_id]
+
+    # The user's own pick refreshes the cached masks
+    assert test_client.post('/api/picks', json={'match_id': match_id, 'chosen_team_id': team_id}).status_code == 201
+    response = test_client.get(f'/api/picks/availability?user_id={user_id}').get_json()
+    assert loads == [user_id]
+    assert [usage['usage_count'] for usage in response['team_usage'] if usage['team']['id'] == team_id] == [1]
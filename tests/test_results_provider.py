@@ -0,0 +1,199 @@
+"""
+Results parsing and writing against ESPN scoreboard fixtures
+
+scoreboard_edge_cases.json is written by hand in the shape of the ESPN
+scoreboard API (not exported from our database) and covers a final, a tie
+after overtime, a running game, a postponed and a canceled game (state
+'post' without the completed flag) and a scheduled one.
+"""
+
+import io
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'espn')
+EDGE_CASES = 'scoreboard_edge_cases.json'
+WEEK = 4
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def fixture_names():
+    return sorted(name for name in os.listdir(FIXTURE_DIR) if name.endswith('.json'))
+
+
+def edge_case_games():
+    from results_provider import parse_scoreboard_document
+
+    document = json.loads(load_fixture(EDGE_CASES))
+    return {f"{game.away_abbr}@{game.home_abbr}": game for game in parse_scoreboard_document(document, WEEK)}
+
+
+@pytest.mark.parametrize('name', fixture_names())
+def test_stream_parser_matches_document_parser(name):
+    pytest.importorskip('ijson')
+    from results_provider import parse_scoreboard_document, parse_scoreboard_stream
+
+    body = load_fixture(name)
+    streamed = parse_scoreboard_stream(io.BytesIO(body), WEEK)
+    assert streamed
+    assert streamed == parse_scoreboard_document(json.loads(body), WEEK)
+
+
+def test_game_states():
+    games = edge_case_games()
+
+    final = games['SEA@ARI']
+    assert (final.status, final.away_score, final.home_score) == ('completed', 23, 20)
+    assert final.is_completed and final.winner_abbr == 'SEA'
+    assert final.start_time == datetime(2025, 9, 26, 0, 15)
+
+    tie = games['GB@DAL']
+    assert (tie.status, tie.away_score, tie.home_score) == ('completed', 40, 40)
+    assert tie.is_completed and tie.winner_abbr is None
+
+    running = games['CHI@LV']
+    assert (running.status, running.away_score, running.home_score) == ('in_progress', 14, 10)
+    assert not running.is_completed and running.winner_abbr is None
+
+    for matchup in ('NO@BUF', 'CIN@DEN'):
+        postponed = games[matchup]
+        assert postponed.status == 'postponed'
+        assert (postponed.away_score, postponed.home_score) == (None, None)
+        assert not postponed.is_completed
+
+    scheduled = games['NYJ@MIA']
+    assert scheduled.status == 'scheduled'
+    assert (scheduled.away_score, scheduled.home_score) == (None, None)
+
+
+def test_schedule_page_lists_completed_games():
+    pytest.importorskip('bs4')
+    from espn_stub_server import render_schedule_page
+    from results_provider import parse_schedule_html
+
+    page = render_schedule_page(json.loads(load_fixture(EDGE_CASES)))
+    scraped = parse_schedule_html(page, WEEK)
+
+    completed = [game for game in edge_case_games().values() if game.is_completed]
+    key = lambda game: (game.away_abbr, game.home_abbr, game.away_score, game.home_score)
+    assert sorted(map(key, scraped)) == sorted(map(key, completed))
+    assert all(game.is_completed for game in scraped)
+    assert [game.winner_abbr for game in scraped if game.home_abbr == 'DAL'] == [None]
+
+
+@pytest.fixture
+def week_matches():
+    """Teams, a user and the fixture's week 4 schedule in the test database"""
+    from app import (app, db, User, Team, Match, Pick, EliminatedTeam, TeamWinnerUsage, TeamLoserUsage,
+                     UserScore, UserWeekScore, DataVersion)
+    from team_registry import ESPN_TEAM_NAMES, team_registry
+
+    with app.app_context():
+        db.create_all()
+        teams = {}
+        for abbreviation, name in ESPN_TEAM_NAMES.items():
+            team = Team(name=name, abbreviation=abbreviation, logo_url=f'/static/logos/{abbreviation}.png')
+            db.session.add(team)
+            teams[abbreviation] = team
+        user = User(username='tester', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+
+        matches = {}
+        for matchup, game in edge_case_games().items():
+            match = Match(
+                week=WEEK,
+                away_team_id=teams[game.away_abbr].id,
+                home_team_id=teams[game.home_abbr].id,
+                start_time=game.start_time,
+                status='scheduled'
+            )
+            db.session.add(match)
+            matches[matchup] = match
+        db.session.flush()
+        # One correct, one tied and one still open pick
+        for matchup, abbreviation in (('SEA@ARI', 'SEA'), ('GB@DAL', 'GB'), ('CHI@LV', 'CHI')):
+            db.session.add(Pick(user_id=user.id, match_id=matches[matchup].id, chosen_team_id=teams[abbreviation].id))
+        db.session.commit()
+        team_registry.invalidate()
+
+        yield {matchup: match.id for matchup, match in matches.items()}, user.id, teams
+
+        db.session.rollback()
+        for model in (Pick, EliminatedTeam, TeamWinnerUsage, TeamLoserUsage, UserWeekScore, UserScore,
+                      Match, User, Team, DataVersion):
+            model.query.delete()
+        db.session.commit()
+        team_registry.invalidate()
+
+
+def test_write_week_results(week_matches):
+    from app import app, db, Match, UserScore
+    from data_version import RESULTS, get_data_versions
+    from result_writer import write_week_results
+
+    match_ids, user_id, teams = week_matches
+    games = list(edge_case_games().values())
+
+    with app.app_context():
+        diff = write_week_results(WEEK, games)
+        assert sorted(change.matchup for change in diff.changes) == ['CHI @ LV', 'GB @ DAL', 'SEA @ ARI']
+        assert diff.completed == 2
+        assert diff.unmatched == []
+        # One results version per changed match
+        assert get_data_versions([RESULTS])[RESULTS][0] == 3
+
+        final = db.session.get(Match, match_ids['SEA@ARI'])
+        assert (final.status, final.is_completed, final.away_score, final.home_score) == ('completed', True, 23, 20)
+        assert final.winner_team_id == teams['SEA'].id
+
+        tie = db.session.get(Match, match_ids['GB@DAL'])
+        assert (tie.status, tie.is_completed, tie.winner_team_id) == ('completed', True, None)
+
+        running = db.session.get(Match, match_ids['CHI@LV'])
+        assert (running.status, running.is_completed, running.away_score) == ('in_progress', False, 14)
+
+        for matchup in ('NO@BUF', 'CIN@DEN', 'NYJ@MIA'):
+            untouched = db.session.get(Match, match_ids[matchup])
+            assert (untouched.status, untouched.is_completed, untouched.home_score) == ('scheduled', False, None)
+
+        score = db.session.get(UserScore, user_id)
+        assert (score.correct_picks, score.incorrect_picks) == (1, 1)
+
+        # Writing the same results again changes nothing
+        version = get_data_versions([RESULTS])[RESULTS][0]
+        assert write_week_results(WEEK, games).updated == 0
+        assert get_data_versions([RESULTS])[RESULTS][0] == version
+
+
+def test_tie_completes_without_winner(week_matches):
+    from app import app, db, Match, Pick, User, UserScore
+    from result_writer import write_week_results
+
+    match_ids, user_id, teams = week_matches
+    tie = edge_case_games()['GB@DAL']
+
+    with app.app_context():
+        other = User(username='other', password_hash='x')
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(Pick(user_id=other.id, match_id=match_ids['GB@DAL'], chosen_team_id=teams['DAL'].id))
+        db.session.commit()
+
+        diff = write_week_results(WEEK, [tie])
+        assert (diff.completed, diff.tied) == (1, 1)
+        assert diff.to_dict()['changes'][0]['tied'] is True
+
+        match = db.session.get(Match, match_ids['GB@DAL'])
+        assert (match.is_completed, match.status, match.winner_team_id) == (True, 'completed', None)
+        # Picks on either team of a tie are incorrect
+        for picker in (user_id, other.id):
+            score = db.session.get(UserScore, picker)
+            assert (score.score, score.correct_picks, score.incorrect_picks) == (0, 0, 1)
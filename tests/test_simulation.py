@@ -0,0 +1,90 @@
+"""
+Season simulation: state loading and the per-policy result cache
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+
+
+@pytest.fixture
+def season():
+    """Two users with picks, usage rows and an elimination; returns the user ids"""
+    from datetime import datetime, timedelta
+    from app import (app, db, User, Team, Match, Pick, EliminatedTeam, TeamWinnerUsage, TeamLoserUsage,
+                     DataVersion)
+
+    with app.app_context():
+        db.create_all()
+        teams = [Team(name=f'Team {index}', abbreviation=f'T{index}', logo_url='') for index in range(4)]
+        users = [User(username='alpha', password_hash='x'), User(username='beta', password_hash='x')]
+        db.session.add_all(teams + users)
+        db.session.flush()
+        kickoff = datetime.utcnow() + timedelta(days=2)
+        matches = [Match(week=week, home_team_id=teams[0].id, away_team_id=teams[week].id, start_time=kickoff,
+                         status='scheduled') for week in (1, 2)]
+        db.session.add_all(matches)
+        db.session.flush()
+        for user, match in zip(users, matches):
+            db.session.add(Pick(user_id=user.id, match_id=match.id, chosen_team_id=teams[0].id))
+            db.session.add(TeamWinnerUsage(user_id=user.id, team_id=teams[0].id, usage_count=1))
+            db.session.add(TeamLoserUsage(user_id=user.id, team_id=match.away_team_id, match_id=match.id,
+                                          week=match.week))
+        db.session.add(EliminatedTeam(user_id=users[1].id, team_id=teams[3].id))
+        db.session.commit()
+        yield [user.id for user in users]
+
+        db.session.rollback()
+        for model in (Pick, TeamWinnerUsage, TeamLoserUsage, EliminatedTeam, Match, User, Team, DataVersion):
+            model.query.delete()
+        db.session.commit()
+
+
+def test_season_states_match_single_user_loads(season):
+    from app import app
+    from pick_rules import load_season_state, load_season_states
+
+    with app.app_context():
+        states = load_season_states(season)
+        for user_id in season:
+            single = load_season_state(user_id)
+            batched = states[user_id]
+            assert (batched.picks, batched.winner_usage, batched.loser_usage, batched.eliminated) == \
+                (single.picks, single.winner_usage, single.loser_usage, single.eliminated)
+        assert states[season[1]].eliminated and not states[season[0]].eliminated
+
+
+def test_concurrent_requests_share_one_run_per_policy(season, monkeypatch):
+    import simulation
+    from app import app
+
+    calls = []
+
+    def slow_simulation(policy, seed=None):
+        calls.append(policy)
+        time.sleep(0.3)
+        return policy
+
+    monkeypatch.setattr(simulation, 'simulate_standings', slow_simulation)
+    monkeypatch.setattr(simulation, '_cache', {})
+
+    results = []
+
+    def request(policy):
+        with app.app_context():
+            results.append(simulation.get_simulated_standings(policy))
+
+    threads = [threading.Thread(target=request, args=(policy,)) for policy in ('favorite', 'favorite', 'path')]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(calls) == ['favorite', 'path']
+    assert sorted(results) == ['favorite', 'favorite', 'path']
+    # The two policies did not wait for each other
+    assert time.perf_counter() - started < 0.55
@@ -0,0 +1,83 @@
+"""
+Week calendar: current week and the week the scorers work on
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from week_calendar import WeekCalendar
+
+KICKOFF = datetime(2025, 9, 7, 17, 0)
+
+
+def schedule(weeks):
+    """Schedule loader for weeks of one Sunday each, a week apart"""
+    return lambda: [(week, KICKOFF + timedelta(weeks=week - 1), KICKOFF + timedelta(weeks=week - 1, hours=3))
+                    for week in weeks]
+
+
+def test_current_week_rolls_over_after_the_last_kickoff():
+    calendar = WeekCalendar(schedule([1, 2, 3]))
+    assert calendar.current_week(KICKOFF - timedelta(days=30)) == 1
+    assert calendar.current_week(KICKOFF + timedelta(hours=14)) == 1
+    assert calendar.current_week(KICKOFF + timedelta(hours=16)) == 2
+    assert calendar.current_week(KICKOFF + timedelta(weeks=5)) == 3
+    assert calendar.max_week() == 3
+
+
+@pytest.fixture
+def season():
+    """Weeks 1-3 with a Sunday and a Monday game each; returns {week: [match ids]}"""
+    from app import app, db, Team, Match
+
+    with app.app_context():
+        db.create_all()
+        teams = [Team(name=f'Team {index}', abbreviation=f'T{index}', logo_url='') for index in range(4)]
+        db.session.add_all(teams)
+        db.session.flush()
+        matches = {}
+        for week in (1, 2, 3):
+            for day, (home, away) in enumerate(((0, 1), (2, 3))):
+                match = Match(week=week, home_team_id=teams[home].id, away_team_id=teams[away].id,
+                              start_time=KICKOFF + timedelta(weeks=week - 1, days=day), status='scheduled')
+                db.session.add(match)
+                matches.setdefault(week, []).append(match)
+        db.session.commit()
+        yield {week: [match.id for match in week_matches] for week, week_matches in matches.items()}
+
+        Match.query.delete()
+        Team.query.delete()
+        db.session.commit()
+
+
+def complete(match_ids):
+    from app import db, Match
+
+    for match_id in match_ids:
+        match = db.session.get(Match, match_id)
+        match.is_completed = True
+        match.status = 'completed'
+    db.session.commit()
+
+
+def test_week_to_score_is_not_pinned_by_games_that_were_not_played(season):
+    from app import app, db, Match
+
+    calendar = WeekCalendar()
+    week_two = KICKOFF + timedelta(weeks=1, hours=2)
+    with app.app_context():
+        complete(season[1][:1])
+        assert calendar.week_to_score(week_two) == 1
+
+        # Marked postponed: skipped right away
+        db.session.get(Match, season[1][1]).status = 'postponed'
+        db.session.commit()
+        assert calendar.week_to_score(week_two) == 2
+
+        # Left scheduled (results are not written for postponed games): skipped after the lookback
+        db.session.get(Match, season[1][1]).status = 'scheduled'
+        db.session.commit()
+        complete(season[2])
+        assert calendar.week_to_score(week_two) == 1
+        assert calendar.week_to_score(KICKOFF + timedelta(weeks=2, days=2)) == 3
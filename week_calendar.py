@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+NFL PickEm Week Calendar
+Resolves the current week from the match schedule
+
+Week boundaries are derived from Match.start_time with one GROUP BY query
+and kept as sorted lists, so "which week is it" is a binary search instead
+of a hard-coded number or a per-request scan. Week N becomes current
+WEEK_ROLLOVER after the last kickoff of week N-1 (the Monday night game
+is over and picks for the next week open). The API, the auto scorer and
+the scheduler all share the process-wide week_calendar, so restarting a
+process no longer resets it to a stale week. Other schedules (the JSON
+file of src/main.py) get their own WeekCalendar with a schedule loader;
+the app is only imported by the default loader.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+# Time after a week's last kickoff at which the next week becomes current
+WEEK_ROLLOVER = timedelta(hours=12)
+
+# How far back week_to_score looks for unfinished games. A postponed or
+# canceled game keeps its original kickoff and never completes, so it must
+# not hold the scorers on its week for the rest of the season.
+SCORING_LOOKBACK = timedelta(days=7)
+
+# Match statuses that will not produce a result at their kickoff
+NOT_PLAYED_STATUSES = ('postponed', 'canceled')
+
+# Seconds the boundaries are trusted before they are reloaded (schedule edits)
+WEEK_CALENDAR_RELOAD_SECONDS = 3600
+
+
+def load_match_schedule():
+    """(week, first kickoff, last kickoff) of every week from the match table (requires an app context)"""
+    from sqlalchemy import func
+    from app import db, Match
+
+    return db.session.query(
+        Match.week, func.min(Match.start_time), func.max(Match.start_time)
+    ).group_by(Match.week).all()
+
+
+class WeekCalendar:
+    """Lazily loaded, thread-safe week boundaries"""
+
+    def __init__(self, load_schedule=load_match_schedule):
+        self._load_schedule = load_schedule
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._weeks = []         # week numbers, ordered by first kickoff
+        self._first_kickoffs = []
+        self._rollovers = []     # moment each week becomes current (first week: datetime.min)
+
+    def load(self):
+        """Load the week boundaries (the default loader requires an app context)"""
+        rows = sorted(self._load_schedule(), key=lambda row: (row[1], row[0]))
+
+        weeks = []
+        first_kickoffs = []
+        rollovers = []
+        previous_last_kickoff = None
+        for week, first_kickoff, last_kickoff in rows:
+            weeks.append(week)
+            first_kickoffs.append(first_kickoff)
+            rollovers.append(previous_last_kickoff + WEEK_ROLLOVER if previous_last_kickoff else datetime.min)
+            previous_last_kickoff = last_kickoff
+
+        with self._lock:
+            self._weeks = weeks
+            self._first_kickoffs = first_kickoffs
+            self._rollovers = rollovers
+            self._loaded_at = time.time()
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.time() - self._loaded_at >= WEEK_CALENDAR_RELOAD_SECONDS:
+            self.load()
+
+    def invalidate(self):
+        """Forget the boundaries; the next lookup reloads them"""
+        with self._lock:
+            self._loaded_at = None
+
+    def weeks(self):
+        """All week numbers in schedule order"""
+        self._ensure_loaded()
+        return list(self._weeks)
+
+    def max_week(self):
+        self._ensure_loaded()
+        return self._weeks[-1] if self._weeks else None
+
+    def current_week(self, now=None):
+        """Week picks are being made for at a naive UTC time (default: now)"""
+        self._ensure_loaded()
+        if not self._weeks:
+            return None
+        index = bisect_right(self._rollovers, now or datetime.utcnow()) - 1
+        return self._weeks[max(index, 0)]
+
+    def last_started_week(self, now=None):
+        """Latest week whose first game has kicked off, or None before the season"""
+        self._ensure_loaded()
+        index = bisect_right(self._first_kickoffs, now or datetime.utcnow()) - 1
+        return self._weeks[index] if index >= 0 else None
+
+    def week_to_score(self, now=None):
+        """Earliest week with unfinished matches that kicked off within SCORING_LOOKBACK,
+        else the latest started week (requires an app context)"""
+        from sqlalchemy import func, or_
+        from app import db, Match
+
+        now = now or datetime.utcnow()
+        pending = db.session.query(func.min(Match.week)).filter(
+            Match.start_time <= now,
+            Match.start_time > now - SCORING_LOOKBACK,
+            Match.is_completed.isnot(True),
+            or_(Match.status.is_(None), Match.status.notin_(NOT_PLAYED_STATUSES))
+        ).scalar()
+        return pending if pending is not None else self.last_started_week(now)
+
+
+week_calendar = WeekCalendar()
+
+
+def invalidate_week_calendar():
+    """Hook for scripts after they change match start times"""
+    week_calendar.invalidate()